@@ -0,0 +1,58 @@
+"""
+Measures the per-request overhead of the capture_test_key before_request hook with many test namespaces,
+comparing the precomputed endpoint set with rebuilding the endpoint list on every request.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/before_request_overhead.py
+"""
+import timeit
+from flask import request
+from flask_restx import Namespace, Resource
+import app as confirmatron
+
+NAMESPACES = 500
+REQUESTS = 2000
+
+
+def _make_namespace(index: int) -> Namespace:
+    namespace = Namespace(f"bench{index}", description=f"Benchmark namespace {index}")
+
+    @namespace.route("/test", methods=["POST"])
+    class BenchResource(Resource):
+        def post(self):
+            return "", 201
+
+    return namespace
+
+
+def _rebuild_endpoints():
+    # The previous implementation: rebuild the endpoint list on every request
+    valid_endpoints = []
+    for ns in confirmatron.test_namespaces:
+        valid_endpoints.extend([resource.resource.endpoint for resource in ns.resources])
+    return request.endpoint in valid_endpoints
+
+
+def _lookup_endpoint():
+    return request.endpoint in confirmatron.test_endpoints
+
+
+def _time(check) -> float:
+    # An admin request, which is not a test endpoint and so is the worst case for the list scan
+    with confirmatron.app.test_request_context("/testAdmin/metrics"):
+        assert request.endpoint == "testAdmin_get_metrics"
+        return timeit.timeit(check, number=REQUESTS) / REQUESTS
+
+
+if __name__ == "__main__":
+    for i in range(NAMESPACES):
+        confirmatron.register_test_namespace(_make_namespace(i))
+
+    print(f"{len(confirmatron.test_namespaces)} test namespaces, {len(confirmatron.test_endpoints)} test endpoints")
+    print(f"rebuild endpoint list per request  {_time(_rebuild_endpoints) * 1e6:>8.2f} us/request")
+    print(f"precomputed endpoint set           {_time(_lookup_endpoint) * 1e6:>8.2f} us/request")
+
+    with confirmatron.app.test_request_context("/testAdmin/metrics"):
+        full = timeit.timeit(confirmatron.app.preprocess_request, number=REQUESTS) / REQUESTS
+    print(f"full before_request chain          {full * 1e6:>8.2f} us/request")
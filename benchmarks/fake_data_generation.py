@@ -0,0 +1,81 @@
+"""
+Measures payloads per second of generate_fake_data against a compiled PayloadGenerator, for the
+request body of api1 (Api1ModelSchema) and for a deeper nesting of the same shape.
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/fake_data_generation.py
+"""
+import time
+from modules import fake_data_generator
+from modules.fake_data_generator import PayloadGenerator, generate_fake_data
+
+# JSON schema of Api1ModelSchema
+ADDRESS_INFO = {
+    "type": "object",
+    "properties": {"street": {"type": "string"}, "city": {"type": "string"}, "zip_code": {"type": "string"}},
+    "required": ["street", "city", "zip_code"],
+}
+ADDRESS = {
+    "type": "object",
+    "properties": {"type": {"type": "string"}, "info": ADDRESS_INFO},
+    "required": ["type", "info"],
+}
+API1_MODEL = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "addresses": {"type": "array", "items": ADDRESS},
+    },
+    "required": ["name", "age", "addresses"],
+}
+
+# Api1ModelSchema with every address holding a list of contacts, each with scores and flags
+DEEP_MODEL = {
+    "type": "object",
+    "properties": {
+        **API1_MODEL["properties"],
+        "addresses": {"type": "array", "items": {
+            "type": "object",
+            "properties": {
+                **ADDRESS["properties"],
+                "contacts": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "scores": {"type": "array", "items": {"type": "number"}},
+                        "verified": {"type": "boolean"},
+                    },
+                }},
+            },
+        }},
+    },
+}
+
+PAYLOADS = 20000
+BATCH_SIZE = 1000
+
+
+def _rate(generate, count: int) -> float:
+    start = time.perf_counter()
+    generate(count)
+    return count / (time.perf_counter() - start)
+
+
+def _run(label: str, schema):
+    recursive = _rate(lambda count: [generate_fake_data(schema) for _ in range(count)], PAYLOADS // 10)
+
+    start = time.perf_counter()
+    generator = PayloadGenerator(schema, seed=42)
+    generator.generate(1)
+    compile_time = time.perf_counter() - start
+    compiled = _rate(lambda count: [generator.generate(BATCH_SIZE) for _ in range(count // BATCH_SIZE)], PAYLOADS)
+
+    print(f"{label:<6} generate_fake_data {recursive:>9.0f}/s  PayloadGenerator {compiled:>9.0f}/s "
+          f"({compiled / recursive:.0f}x, compiled in {compile_time * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    print(f"numpy {'available' if fake_data_generator.numpy is not None else 'not installed'}")
+    _run("api1", API1_MODEL)
+    _run("deep", DEEP_MODEL)
@@ -0,0 +1,59 @@
+"""
+Measures records per second of JsonUtility with each installed JSON backend, over result records as
+store_result writes them: api1 payloads (Api1ModelSchema) sent, the response received and a context.
+Reads are measured from strings and from the raw bytes Redis returns. Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/json_backends.py
+"""
+import time
+from modules import json_utility
+from modules.constants import TestStatus
+from modules.fake_data_generator import PayloadGenerator
+from modules.json_utility import JsonUtility
+from fake_data_generation import API1_MODEL
+
+RECORDS = 20000
+ROUNDS = 3
+
+
+def _records(count: int):
+    payloads = PayloadGenerator(API1_MODEL, seed=42).generate(count)
+    return [
+        {
+            "status": (TestStatus.PASS if i % 5 else TestStatus.FAIL).value,
+            "payload_sent": payload,
+            "payload_received": {"status_code": 201 if i % 5 else 422, "id": i, "echo": payload},
+            "context": "" if i % 5 else f"Expected 201, got 422 for case {i}",
+        }
+        for i, payload in enumerate(payloads)
+    ]
+
+
+def _rate(function, values) -> float:
+    # Best of ROUNDS, so a stray pause does not skew a backend
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for value in values:
+            function(value)
+        best = min(best, time.perf_counter() - start)
+    return len(values) / best
+
+
+if __name__ == "__main__":
+    records = _records(RECORDS)
+    stored = [JsonUtility.serialize(record) for record in records]
+    stored_bytes = [value.encode("utf-8") for value in stored]
+    print(f"{RECORDS} records, {sum(map(len, stored_bytes)) / RECORDS:.0f} bytes each, "
+          f"selected backend {json_utility.BACKEND}")
+
+    for backend in ("json", "ujson", "orjson"):
+        if getattr(json_utility, backend) is None:
+            print(f"{backend:<6} not installed")
+            continue
+        loads_str = _rate(lambda value: JsonUtility.deserialize(value, backend=backend), stored)
+        loads_bytes = _rate(lambda value: JsonUtility.deserialize(value, backend=backend), stored_bytes)
+        dumps_str = _rate(lambda value: JsonUtility.serialize(value, backend=backend), records)
+        dumps_bytes = _rate(lambda value: JsonUtility.serialize_bytes(value, backend=backend), records)
+        print(f"{backend:<6} deserialize str {loads_str:>9.0f}/s  bytes {loads_bytes:>9.0f}/s  "
+              f"serialize str {dumps_str:>9.0f}/s  bytes {dumps_bytes:>9.0f}/s")
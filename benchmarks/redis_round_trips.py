@@ -0,0 +1,133 @@
+"""
+Counts Redis round trips and commands per stored result against an in-process fake Redis.
+
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/redis_round_trips.py
+"""
+import time
+from modules.constants import TestStatus
+from modules.redis_client import RedisClient
+
+RESULTS = 1000
+BATCH_SIZE = 100
+
+
+class _FakePipeline:
+    def __init__(self, fake):
+        self._fake = fake
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        # The whole pipeline is sent to the server in one round trip
+        self._fake.round_trips += 1
+        self._fake.commands += len(self._commands)
+        return [getattr(self._fake, f"_{name}")(*args, **kwargs) for name, args, kwargs in self._commands]
+
+
+class _FakeRedis:
+    """
+    Minimal in-memory stand-in for StrictRedis that counts network round trips.
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+        self.commands = 0
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def __getattr__(self, name):
+        # Commands sent directly (outside a pipeline) cost one round trip each
+        if name.startswith("_"):
+            raise AttributeError(f"{type(self).__name__} does not implement {name[1:]}")
+        apply = getattr(self, f"_{name}")
+
+        def command(*args, **kwargs):
+            self.round_trips += 1
+            self.commands += 1
+            return apply(*args, **kwargs)
+        return command
+
+    def _hset(self, key, field=None, value=None, mapping=None):
+        fields = dict(mapping or {})
+        if field is not None:
+            fields[field] = value
+        self.hashes.setdefault(key, {}).update(fields)
+        return len(fields)
+
+    def _hsetnx(self, key, field, value):
+        bucket = self.hashes.setdefault(key, {})
+        if field in bucket:
+            return 0
+        bucket[field] = value
+        return 1
+
+    def _hdel(self, key, *fields):
+        bucket = self.hashes.get(key, {})
+        return sum(bucket.pop(field, None) is not None for field in fields)
+
+    def _hincrby(self, key, field, amount=1):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    def _expire(self, key, seconds):
+        return True
+
+
+def _fake_client() -> RedisClient:
+    client = RedisClient()
+    client.redis_client = _FakeRedis()
+    return client
+
+
+def _run(label, store):
+    client = _fake_client()
+    fake = client.redis_client
+    start = time.perf_counter()
+    store(client)
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<28} {fake.round_trips / RESULTS:>6.3f} RTT/result  {fake.commands / RESULTS:>6.3f} cmd/result  "
+          f"{elapsed * 1e6 / RESULTS:>8.1f} us/result")
+
+
+def _results(count):
+    for i in range(count):
+        status = TestStatus.PASS if i % 3 else TestStatus.FAIL
+        yield f"test-{i}", status, {"id": i}, {"ok": True}, ""
+
+
+def _store_unpipelined(client):
+    # Reproduces the previous behaviour: every command is its own round trip
+    fake = client.redis_client
+    for field, status, sent, received, context in _results(RESULTS):
+        fake.hset("bench:key", field, "{}")
+        fake.expire("bench:key", client.expire_seconds)
+        fake.hincrby("bench:key", "total_tests", 1)
+        fake.hincrby("bench:key", "total_pass" if status == TestStatus.PASS else "total_fail", 1)
+
+
+def _store_one_by_one(client):
+    for result in _results(RESULTS):
+        client.store_result("bench:key", *result)
+
+
+def _store_batched(client):
+    results = list(_results(RESULTS))
+    for i in range(0, RESULTS, BATCH_SIZE):
+        client.store_results("bench:key", results[i:i + BATCH_SIZE])
+
+
+if __name__ == "__main__":
+    _run("separate commands", _store_unpipelined)
+    _run("store_result (pipelined)", _store_one_by_one)
+    _run(f"store_results (batch={BATCH_SIZE})", _store_batched)
@@ -0,0 +1,48 @@
+"""
+Compares the size and encode/decode time of result records in each JsonUtility encoding.
+
+Records are built like ResultStore.serialize_results builds them, with small payloads and with
+large payloads of repeated values, which is what fuzzed request bodies mostly look like.
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/result_encoding.py
+"""
+import time
+from modules.json_utility import JsonUtility
+
+RECORDS = 2000
+
+
+def _record(i: int, items: int):
+    payload = {
+        "id": i,
+        "name": f"user-{i}",
+        "items": [{"sku": f"SKU-{n % 10}", "quantity": n % 5, "price": 9.99, "tags": ["a", "b"]}
+                  for n in range(items)],
+    }
+    return {"status": "pass", "payload_sent": payload, "payload_received": {"ok": True}, "context": ""}
+
+
+def _run(label: str, records, encoding: str, compress_threshold: int):
+    start = time.perf_counter()
+    encoded = [JsonUtility.encode(record, encoding=encoding, compress_threshold=compress_threshold)
+               for record in records]
+    encode_time = (time.perf_counter() - start) / len(records)
+
+    start = time.perf_counter()
+    for value in encoded:
+        JsonUtility.deserialize(value)
+    decode_time = (time.perf_counter() - start) / len(records)
+
+    size = sum(len(value.encode("utf-8") if isinstance(value, str) else value) for value in encoded) / len(records)
+    print(f"{label:<14} {size:>9.0f} bytes/result  encode {encode_time * 1e6:>7.1f} us  "
+          f"decode {decode_time * 1e6:>7.1f} us")
+
+
+if __name__ == "__main__":
+    for name, items in (("small", 1), ("large", 200)):
+        records = [_record(i, items) for i in range(RECORDS)]
+        print(f"{name} payloads")
+        _run("json", records, "json", 0)
+        _run("msgpack", records, "msgpack", 2 ** 31)
+        _run("msgpack+zlib", records, "msgpack", 1024)
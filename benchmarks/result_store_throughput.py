@@ -0,0 +1,71 @@
+"""
+Measures write and read throughput of every ResultStore backend.
+
+Redis is included when it is reachable at REDIS_HOST:REDIS_PORT.
+Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/result_store_throughput.py
+"""
+import os
+import tempfile
+import time
+import redis
+from modules.constants import TestStatus
+from modules.memory_result_store import MemoryResultStore
+from modules.redis_client import RedisClient
+from modules.result_store import ResultStore
+from modules.sqlite_result_store import SQLiteResultStore
+
+RESULTS = 10000
+BATCH_SIZE = 100
+
+
+def _results(count):
+    for i in range(count):
+        status = TestStatus.PASS if i % 3 else TestStatus.FAIL
+        yield f"test-{i}", status, {"id": i, "name": f"user-{i}"}, {"ok": True}, ""
+
+
+def _run(label: str, store: ResultStore):
+    key = store.create_key("benchmark-api")
+    store.initialize_test_suite(key)
+    results = list(_results(RESULTS))
+
+    start = time.perf_counter()
+    for result in results[:RESULTS // 10]:
+        store.store_result(key, *result)
+    single = (time.perf_counter() - start) / (RESULTS // 10)
+
+    start = time.perf_counter()
+    for i in range(0, RESULTS, BATCH_SIZE):
+        store.store_results(key, results[i:i + BATCH_SIZE])
+    batched = (time.perf_counter() - start) / RESULTS
+
+    start = time.perf_counter()
+    read = sum(1 for _ in store.iter_results(key))
+    scanned = (time.perf_counter() - start) / read
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        store.get_totals(key)
+    totals = (time.perf_counter() - start) / 1000
+
+    print(f"{label:<8} store_result {1 / single:>9.0f}/s  store_results {1 / batched:>9.0f}/s  "
+          f"iter_results {1 / scanned:>9.0f}/s  get_totals {totals * 1e6:>7.1f} us")
+
+
+def _redis_available() -> bool:
+    try:
+        return RedisClient().redis_client.ping()
+    except redis.exceptions.RedisError:
+        return False
+
+
+if __name__ == "__main__":
+    _run("memory", MemoryResultStore())
+    with tempfile.TemporaryDirectory() as directory:
+        _run("sqlite", SQLiteResultStore(os.path.join(directory, "results.sqlite3")))
+    if _redis_available():
+        _run("redis", RedisClient())
+    else:
+        print("redis    skipped, not reachable")
@@ -0,0 +1,35 @@
+"""
+Measures microseconds per request body of loading api1 payloads (Api1ModelSchema) with a schema
+instantiated per request, as the controllers used to, against the shared schema and its compiled
+fast path. Run from the repository root:
+
+    PYTHONPATH=src python benchmarks/schema_validation.py
+"""
+import time
+from modules.fake_data_generator import PayloadGenerator
+from modules.validation import CompiledSchema
+from test_suite.api1.schemas import Api1ModelSchema
+from fake_data_generation import API1_MODEL
+
+PAYLOADS = 5000
+
+
+def _per_payload(load, payloads) -> float:
+    start = time.perf_counter()
+    for payload in payloads:
+        load(payload)
+    return (time.perf_counter() - start) / len(payloads) * 1e6
+
+
+if __name__ == "__main__":
+    payloads = PayloadGenerator(API1_MODEL, seed=42).generate(PAYLOADS)
+    shared = Api1ModelSchema()
+    compiled = CompiledSchema(Api1ModelSchema())
+
+    per_request = _per_payload(lambda payload: Api1ModelSchema().load(payload), payloads)
+    cached = _per_payload(shared.load, payloads)
+    fast = _per_payload(compiled.load, payloads)
+
+    print(f"schema per request {per_request:>7.1f} us/payload")
+    print(f"shared schema      {cached:>7.1f} us/payload ({per_request / cached:.1f}x)")
+    print(f"compiled fast path {fast:>7.1f} us/payload ({per_request / fast:.1f}x)")
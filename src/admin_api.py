@@ -1,8 +1,17 @@
-from flask import jsonify, make_response, request
+from typing import Any, Iterable, Iterator, Optional, Tuple
+from flask import Response, current_app, g, jsonify, make_response, request
 from flask_restx import Namespace, Resource
 from marshmallow_dataclass import dataclass
 from modules.redis_client import RedisClient
+from modules.result_store import get_result_store
 from modules.json_utility import JsonUtility
+from modules.result_sink import get_result_sink
+from modules.auth_0_handler import TokenManager
+from modules.constants import TestStatus
+from modules.results import Results
+from modules.suite_runner import get_suite_runner
+from modules.decorators import load_body
+from modules.validation import get_compiled_schema
 
 # Create the Namespace
 admin_ns = Namespace("testAdmin", description="Confirmatron Admin")
@@ -14,24 +23,23 @@ class TestKeyPayload:
     api_name: str
 
 
-# Convert the dataclass into a Marshmallow schema
-TestKeyPayloadSchema = TestKeyPayload.Schema()
+# Convert the dataclass into a Marshmallow schema, instantiated once and shared by every request
+TestKeyPayloadSchema = get_compiled_schema(TestKeyPayload.Schema).schema
 
 
 # Create the route for /api1/test
 @admin_ns.route("/createKey", methods=["POST"])
 class CreateTestKey(Resource):
-    @admin_ns.expect(TestKeyPayloadSchema, validate=True)
+    @admin_ns.expect(TestKeyPayloadSchema)
+    @load_body(TestKeyPayload.Schema)
     def post(self):
-        request_data = admin_ns.payload
-
-        # Deserialize the payload using the Marshmallow schema
-        payload_object = TestKeyPayloadSchema.load(request_data)
+        # The payload was validated and deserialized once by load_body
+        payload_object = g.payload
 
         # Now you can access the payload attributes like a class
         api_name = payload_object.api_name
 
-        r = RedisClient()
+        r = get_result_store()
         redis_key = r.create_key(api_name)
         r.initialize_test_suite(redis_key)
 
@@ -40,33 +48,123 @@ class CreateTestKey(Resource):
         return make_response(jsonify(response), 201)
 
 
+def _parse_results(raw_results: Iterable[Tuple[str, str]], status: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Parse the raw fields of a test suite one at a time.
+
+    :param raw_results: The (field, value) pairs of the test suite hash.
+    :param status: When given, only results with this status are returned, leaving out the counters.
+    :return: The (field, parsed value) pairs.
+    """
+    # Loop through each item in the raw results
+    for field, data_point in raw_results:
+        # If the data point is not an empty string, try to parse it as JSON
+        if data_point:
+            data_point = JsonUtility.deserialize(data_point)
+        else:
+            # Empty values are read as b"" when the store returns raw bytes
+            data_point = ""
+
+        if status is not None and not (isinstance(data_point, dict) and data_point.get("status") == status):
+            continue
+
+        # Yield the data point if it's not None
+        if data_point is not None:
+            yield field, data_point
+
+
 @admin_ns.route("/testResults/<string:test_key>", methods=["GET"])
 class GetTestResultsByTestKey(Resource):
     def get(self, test_key):
-        r = RedisClient()
+        # Optional status filter, HSCAN pagination and NDJSON streaming
+        status = request.args.get("status")
+        cursor = request.args.get("cursor", type=int)
+        limit = request.args.get("limit", type=int)
+        stream = (request.args.get("format") == "ndjson"
+                  or request.accept_mimetypes.best == "application/x-ndjson")
+
+        if status is not None and status not in {s.value for s in TestStatus}:
+            return make_response(jsonify({"error": f"Unknown status {status}"}), 400)
+
+        r = get_result_store()
+        not_found = make_response(jsonify({"error": f"Test Results not found for {test_key}"}), 404)
+
+        if stream:
+            if not r.exists(test_key):
+                return not_found
 
-        raw_results = r.retrieve_results(test_key)
+            # Yield one result per line as it is decoded, so memory stays flat regardless of suite size
+            def generate():
+                for field, data_point in _parse_results(r.iter_results(test_key, raw=True), status):
+                    yield JsonUtility.serialize_bytes({"field": field, "result": data_point}) + b"\n"
+
+            return Response(generate(), mimetype="application/x-ndjson")
+
+        if cursor is not None or limit is not None:
+            next_cursor, raw_results = r.scan_results(test_key, cursor=cursor or 0, count=limit or 100, raw=True)
+            if not raw_results and not cursor and not r.exists(test_key):
+                return not_found
+
+            # Return the page, with the cursor of the next page in a header
+            response = Response(JsonUtility.serialize_bytes(dict(_parse_results(raw_results.items(), status))),
+                                mimetype="application/json")
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+            return response
+
+        raw_results = r.retrieve_results(test_key, raw=True)
 
         if not raw_results:
+            return not_found
+
+        # Return the serialized results as a JSON response, serialized with the fastest JSON backend
+        return Response(JsonUtility.serialize_bytes(dict(_parse_results(raw_results.items(), status))),
+                        mimetype="application/json")
+
+
+@admin_ns.route("/testResults/<string:test_key>/summary", methods=["GET"])
+class GetTestSummaryByTestKey(Resource):
+    def get(self, test_key):
+        # Reads only the counters and timestamps, so it is cheap enough to poll
+        summary = Results().get_summary(test_key)
+
+        if summary is None:
             return make_response(jsonify({
                 "error": f"Test Results not found for {test_key}"
             }), 404)
 
-        # Prepare an empty dictionary for the parsed results
-        results = {}
+        return make_response(jsonify(summary), 200)
 
-        # Loop through each item in the raw results
-        for field, data_point in raw_results.items():
-            # If the data point is not an empty string, try to parse it as JSON
-            if data_point:
-                data_point = JsonUtility.deserialize(data_point)
 
-            # Add the data point to the results dictionary if it's not None
-            if data_point is not None:
-                results[field] = data_point
+@admin_ns.route("/testResults/<string:test_key>/payloads", methods=["GET"])
+class GetTestPayloadsByTestKey(Resource):
+    def get(self, test_key):
+        # How much storage deduplicating identical payloads saves this suite
+        r = get_result_store()
+
+        if not r.exists(test_key):
+            return make_response(jsonify({
+                "error": f"Test Results not found for {test_key}"
+            }), 404)
 
-        # Return the serialized results as a JSON response
-        return results
+        stats = r.get_payload_stats(test_key)
+        if stats is None:
+            return make_response(jsonify({"test_key": test_key, "deduplicated": False}), 200)
+
+        return make_response(jsonify({"test_key": test_key, "deduplicated": True, **stats}), 200)
+
+
+@admin_ns.route("/runs/<string:run_id>", methods=["GET"])
+class GetSuiteRun(Resource):
+    def get(self, run_id):
+        # Progress is kept by the worker process that accepted the run, and only for a while after it finishes
+        run = get_suite_runner().get_run(run_id)
+
+        if run is None:
+            return make_response(jsonify({
+                "error": f"Run {run_id} not found"
+            }), 404)
+
+        return make_response(jsonify(run.to_dict()), 200)
 
 
 @admin_ns.route("/testKeys", methods=["GET"])
@@ -76,9 +174,46 @@ class ListKeysByApiName(Resource):
         if not api_name:
             return
 
-        r = RedisClient()
+        # Optional paging through the per-API index and creation time filters (epoch seconds)
+        cursor = request.args.get("cursor", 0, type=int)
+        limit = request.args.get("limit", type=int)
+        start = request.args.get("start", type=float)
+        end = request.args.get("end", type=float)
+
+        r = get_result_store()
 
-        keys = r.get_redis_keys(api_name)
+        if limit is None:
+            keys = r.get_redis_keys(api_name, start=start, end=end)
+            next_cursor = 0
+        else:
+            keys, next_cursor = r.page_redis_keys(api_name, cursor=cursor, limit=limit, start=start, end=end)
 
-        # Return the serialized keys as a JSON response
-        return make_response(jsonify(keys), 200)
+        # Return the serialized keys as a JSON response, with the cursor of the next page in a header
+        response = make_response(jsonify(keys), 200)
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        return response
+
+
+@admin_ns.route("/metrics", methods=["GET"])
+class GetMetrics(Resource):
+    def get(self):
+        metrics = {
+            "result_store": type(get_result_store()).__name__,
+            "redis_pool": RedisClient.pool_stats(),
+            "result_sink": get_result_sink().stats(),
+            "auth0_tokens": TokenManager().stats(),
+            "secrets_cache": current_app.config['secrets_manager'].cache_stats(),
+            "api_configs": {
+                "registered": sorted(current_app.config['config'].test_apis.apis),
+                "load_times": current_app.config['config'].test_apis.apis.load_times,
+            },
+        }
+
+        return make_response(jsonify(metrics), 200)
+
+
+@admin_ns.route("/configIndex", methods=["GET"])
+class GetConfigIndex(Resource):
+    def get(self):
+        # Secrets are listed by the name they are looked up under, never by value
+        return make_response(jsonify(current_app.config['config'].path_index().dump()), 200)
@@ -1,19 +1,26 @@
 from flask import Flask, request, jsonify, g
+from flask.logging import default_handler
 from werkzeug.exceptions import HTTPException
 from flask_cors import CORS
-from flask_restx import Api
+from flask_restx import Api, Namespace
 import os
-import importlib.util
+import time
 from dotenv import load_dotenv
 from test_suite.api1.controllers import api1_ns
 from admin_api import admin_ns
-from config.config import Config
+from config.config import Config, logger as config_logger
+from config.apis import API_CONFIG_MODULES
 from modules.secrets_manager import SecretsManager
 
 
 app = Flask(__name__)
 CORS(app)
 
+# API configs report their load times at INFO, which the default WARNING level would hide. Lazily loaded
+# configs report after startup, so the logger is set up here rather than around the registration.
+config_logger.setLevel(os.getenv("API_CONFIG_LOG_LEVEL", "INFO").upper())
+config_logger.addHandler(default_handler)
+
 # Create the Flask-RESTx API instance
 api = Api(version='1.0', title='Confirmatron', description='API Testing Framework')
 api.init_app(app)
@@ -25,46 +32,70 @@ test_namespaces = [
     api1_ns,
 ]
 
+# Endpoints of the resources in test namespaces, which require a test-key header.
+# Filled in by register_test_namespace once each namespace's resources are registered.
+test_endpoints = set()
 
-def _call_setup_on_all_api_config_files(config: Config, directory: str = "src/config/apis"):
-    """
-    This function dynamically imports all Python modules in the specified directory and calls a setup function from each one.
 
-    :param directory: The directory that contains the Python modules. Defaults to "config/apis".
+def _register_api_config_modules(config: Config, preload: bool = False):
     """
+    This function registers every API config module listed in the config.apis manifest. Modules are
+    imported and their setup function called the first time their API is used, which logs their load times.
 
-    for filename in os.listdir(directory):
-        if filename.endswith(".py") and filename != "__init__.py":
-            module_name = filename[:-3]  # remove .py extension
-            spec = importlib.util.spec_from_file_location(module_name, os.path.join(directory, filename))
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+    :param config: The Config to register the APIs on.
+    :param preload: Load every API now instead of on first use, e.g. in the gunicorn master with --preload.
+    """
+    start = time.perf_counter()
+    for api_name, module_name in API_CONFIG_MODULES.items():
+        config.test_apis.register_api_module(api_name, module_name)
 
-            api_name = module.name
-            api_instance = module.setup()  # call setup function from the module
+    if preload:
+        config.test_apis.apis.load_all()
 
-            config.test_apis.add_api(api_name, api_instance)
+    config_logger.info(f"Registered {len(API_CONFIG_MODULES)} API configs in {(time.perf_counter() - start) * 1000:.1f}ms")
 
 #
 # SETUP
 #
 # Call the function on application startup
 config = Config()
-_call_setup_on_all_api_config_files(config)
+_register_api_config_modules(config, preload=os.getenv("API_CONFIG_PRELOAD", "false").lower() == "true")
 app.config['config'] = config
 
 # Create the SecretsManager instance
 secrets_manager = SecretsManager()
 app.config['secrets_manager'] = secrets_manager
 
+# Fetch the secrets referenced by the config in batches now, rather than one by one on first use
+try:
+    secrets_manager.prefetch(config)
+except Exception as e:
+    app.logger.warning(f"Failed to prefetch secrets, they will be fetched on first use: {e}")
+
+
+def register_test_namespace(namespace: Namespace):
+    """
+    Add a test namespace to the API and record the endpoints of its resources, so capture_test_key
+    can check whether a request targets a test endpoint with a single set lookup.
+    Can be called at any time to add test namespaces dynamically. A namespace whose name is already
+    registered is skipped, so reloading a registry does not add its routes a second time.
+
+    :param namespace: The test namespace to add.
+    """
+    if any(registered.name == namespace.name for registered in api.namespaces):
+        return
+
+    if namespace not in test_namespaces:
+        test_namespaces.append(namespace)
+
+    # Resources get their endpoint name when the namespace is added to the API
+    api.add_namespace(namespace)
+    test_endpoints.update(resource.resource.endpoint for resource in namespace.resources)
+
 
 @app.before_request
 def capture_test_key():
-    valid_endpoints = []
-    for ns in test_namespaces:
-        valid_endpoints.extend([resource.resource.endpoint for resource in ns.resources])
-
-    if request.endpoint in valid_endpoints:
+    if request.endpoint in test_endpoints:
         test_key = request.headers.get('test-key')
         if not test_key:
             return jsonify({
@@ -96,8 +127,8 @@ def handle_exception(e):
 
 # Add the API1 namespace to the API app
 api.add_namespace(admin_ns)
-for namespace in test_namespaces:
-    api.add_namespace(namespace)
+for namespace in list(test_namespaces):
+    register_test_namespace(namespace)
 
 if __name__ == '__main__':
     app.run(debug=True)
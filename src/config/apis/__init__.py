@@ -0,0 +1,6 @@
+# Manifest of the API config modules, keyed by API name.
+# Each module defines `name` and a `setup()` function returning its Api; modules are only imported
+# the first time their API is used.
+API_CONFIG_MODULES = {
+    "apiOne": "config.apis.api_one",
+}
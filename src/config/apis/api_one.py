@@ -13,6 +13,7 @@ def setup() -> Api:
     api_one.base_url.beta = 'http://fakeurl.beta.com'
     api_one.base_url.prod = 'http://fakeurl.prod.com'
     api_one.teams_channel_link = 'http://faketeamslink.com'
+    api_one.openapi_spec = 'http://192.168.1.59/api/openapi.json'
 
     # Setup controllers_under_test details for api_one
     api_one.controllers_under_test.test = ['', '']
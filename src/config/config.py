@@ -1,3 +1,21 @@
+import importlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+# How a config value is resolved: used as is, read from the environment, or fetched from AWS Parameter Store
+LITERAL = "literal"
+ENV = "env"
+SSM = "ssm"
+
+# Reports how long each API config module takes to load. app.py makes sure INFO messages are emitted.
+logger = logging.getLogger(__name__)
+
+
 class AuthZeroEnv:
     def __init__(self, auth_url: str, audience: str, grant_type: str, client_id: str, client_secret: str):
         self.auth_url = auth_url
@@ -65,18 +83,238 @@ class Api:
         self.base_url = _BaseUrl()
         self.teams_channel_link = ""
         self.controllers_under_test = _ControllersUnderTest()
+        # Path or URL of the OpenAPI spec of the API, for generated test cases
+        self.openapi_spec = ""
+
+
+class _ApiRegistry(Mapping):
+    """
+    Read-only mapping of API name to Api that loads API config modules lazily.
+
+    A module is imported and its setup() called the first time its API is looked up; the built Api is
+    cached for the lifetime of the process. Import and setup times are kept per API in load_times and
+    logged as each API loads, whether at startup or on first use.
+    """
+
+    def __init__(self):
+        self._modules: Dict[str, str] = {}
+        self._apis: Dict[str, Api] = {}
+        self._lock = threading.Lock()
+        self.load_times: Dict[str, Dict[str, float]] = {}
+        # Incremented whenever an Api is added or loaded, so the config path index knows to rebuild
+        self.version = 0
+
+    def register(self, api_name: str, module_name: str):
+        """
+        Register the config module of an API without importing it.
+
+        :param api_name: The name of the API.
+        :param module_name: The dotted name of the module defining setup().
+        """
+        self._modules[api_name] = module_name
+
+    def add(self, api_name: str, api: Api):
+        """
+        Add an already built Api.
+
+        :param api_name: The name of the API.
+        :param api: The Api.
+        """
+        self._apis[api_name] = api
+        self.version += 1
+
+    def load_all(self):
+        """
+        Load every registered API now instead of on first use.
+        """
+        for api_name in self:
+            self[api_name]
+
+    def loaded(self) -> Dict[str, Api]:
+        """
+        Get the APIs that have been built so far, without loading any others.
+
+        :return: A dictionary of API name to Api.
+        """
+        return dict(self._apis)
+
+    def __getitem__(self, api_name: str) -> Api:
+        api = self._apis.get(api_name)
+        if api is not None:
+            return api
+
+        if api_name not in self._modules:
+            raise KeyError(api_name)
+
+        with self._lock:
+            if api_name not in self._apis:
+                self._apis[api_name], self.load_times[api_name] = self._load(api_name, self._modules[api_name])
+                self.version += 1
+        return self._apis[api_name]
+
+    def __contains__(self, api_name: object) -> bool:
+        # Checking whether an API exists must not load it
+        return api_name in self._modules or api_name in self._apis
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules.keys() | self._apis.keys())
+
+    def __len__(self) -> int:
+        return len(self._modules.keys() | self._apis.keys())
+
+    @staticmethod
+    def _load(api_name: str, module_name: str) -> Tuple[Api, Dict[str, float]]:
+        """
+        Import an API config module, call its setup() and log how long each step took.
+
+        :param api_name: The name of the API, for the log.
+        :param module_name: The dotted name of the module.
+        :return: The built Api and the import and setup times in seconds.
+        """
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        imported = time.perf_counter()
+        api = module.setup()
+        finished = time.perf_counter()
+
+        logger.info(f"API config {api_name}: import {(imported - start) * 1000:.1f}ms, "
+                    f"setup {(finished - imported) * 1000:.1f}ms")
+        return api, {"import_seconds": imported - start, "setup_seconds": finished - imported}
 
 
 class _TestApis:
     def __init__(self):
-        self.apis = {}
+        self.apis = _ApiRegistry()
 
     def add_api(self, api_name: str, api: Api):
-        self.apis[api_name] = api
+        self.apis.add(api_name, api)
+
+    def register_api_module(self, api_name: str, module_name: str):
+        self.apis.register(api_name, module_name)
+
+
+class ConfigEntry(NamedTuple):
+    """
+    A config value with its placeholder already classified.
+    For LITERAL entries, value is the config value; for ENV and SSM entries, it is the name of the secret.
+    """
+    kind: str
+    value: Any
+
+
+class ConfigIndex(Mapping):
+    """
+    Immutable index of every value in a Config tree by dotted path, e.g. 'confirmatron.auth_zero.test.client_id'.
+
+    Values of each loaded Api are indexed under '<api_name>.<attribute>'. `{NAME}` placeholders are
+    classified once, when the index is built: as ENV when the ENVIRONMENT environment variable is LOCAL,
+    as SSM otherwise. Objects in the tree are indexed too, so a path to a section returns the section.
+    """
+
+    def __init__(self, entries: Dict[str, ConfigEntry], version: int):
+        """
+        Initialize the ConfigIndex.
+
+        :param entries: The entries by dotted path.
+        :param version: The version of the API registry the index was built from.
+        """
+        self._entries = MappingProxyType(entries)
+        self.version = version
+
+    @classmethod
+    def build(cls, config: 'Config') -> 'ConfigIndex':
+        """
+        Flatten the public attributes of a Config and of its loaded APIs into an index.
+
+        :param config: The config to index.
+        :return: The index.
+        """
+        placeholder_kind = ENV if os.getenv('ENVIRONMENT') == 'LOCAL' else SSM
+        registry = config.test_apis.apis
+        version = registry.version
+        entries: Dict[str, ConfigEntry] = {}
+
+        def add(path: str, value: Any):
+            if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+                entries[path] = ConfigEntry(placeholder_kind, value[1:-1])
+                return
+            entries[path] = ConfigEntry(LITERAL, value)
+            if hasattr(value, '__dict__'):
+                for name, child in vars(value).items():
+                    if not name.startswith('_'):
+                        add(f"{path}.{name}", child)
+
+        for name, value in vars(config).items():
+            # APIs are indexed by name below rather than under test_apis
+            if not name.startswith('_') and name != 'test_apis':
+                add(name, value)
+        for api_name, api in registry.loaded().items():
+            add(api_name, api)
+
+        return cls(entries, version)
+
+    def dump(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the values of the index for inspection, leaving out sections. Secrets are shown by name only.
+
+        :return: A dictionary of dotted path to kind and value.
+        """
+        return {path: {"kind": entry.kind, "value": entry.value}
+                for path, entry in self._entries.items() if not hasattr(entry.value, '__dict__')}
+
+    def __getitem__(self, path: str) -> ConfigEntry:
+        return self._entries[path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class Config:
     def __init__(self):
         self.confirmatron = _Confirmatron()
         self.test_apis = _TestApis()
+        self._index: Optional[ConfigIndex] = None
+        self._index_lock = threading.Lock()
+
+    def path_index(self) -> ConfigIndex:
+        """
+        Get the dotted path index of this config, building it on first use and again after an Api is added
+        or loaded. Changes made to the config tree in place are picked up only after invalidate_index().
+
+        :return: The index.
+        """
+        index = self._index
+        if index is None or index.version != self.test_apis.apis.version:
+            with self._index_lock:
+                index = self._index
+                if index is None or index.version != self.test_apis.apis.version:
+                    index = self._index = ConfigIndex.build(self)
+        return index
+
+    def lookup(self, path: str) -> ConfigEntry:
+        """
+        Look up a config value by dotted path. If the path belongs to an API that is registered
+        but not loaded yet, the API is loaded first.
+
+        :param path: The dotted path, e.g. 'confirmatron.auth_zero.test.client_secret' or 'apiOne.app_id'.
+        :return: The entry for the path.
+        :raises KeyError: If there is no value at the path.
+        """
+        try:
+            return self.path_index()[path]
+        except KeyError:
+            api_name = path.split('.', 1)[0]
+            if api_name not in self.test_apis.apis or api_name in self.test_apis.apis.loaded():
+                raise
+        self.test_apis.apis[api_name]
+        return self.path_index()[path]
+
+    def invalidate_index(self):
+        """
+        Drop the path index, so it is rebuilt on next use.
+        """
+        self._index = None
 
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import aiohttp
+from typing import Dict, Optional, Any, Iterable, List, Tuple, Union
+from modules.constants import Environments
+from modules.auth_0_handler import Auth0Handler
+
+# A request for AsyncHttpClient.gather: (method, path, keyword arguments of that method)
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+
+class AsyncHttpClient:
+    """
+    asyncio HTTP client with the same surface as HttpClient, for fanning test requests out concurrently.
+
+    Use it as an async context manager so every request shares one connection pool, or let gather()
+    open and close the session around a single fan-out. From synchronous code, run_concurrently()
+    runs a fan-out on its own event loop.
+    """
+
+    def __init__(self, base_url: str, environment_under_test: Environments, concurrency: Optional[int] = None):
+        """
+        Initialize the AsyncHttpClient. This must be called inside the Flask application context, like HttpClient.
+        The bearer token is fetched up front, so the first requests do not block the event loop on Auth0.
+
+        :param base_url: The base URL of the API under test.
+        :param environment_under_test: The environment whose bearer token is sent.
+        :param concurrency: The maximum number of requests in flight. Defaults to ASYNC_HTTP_CONCURRENCY or 100.
+        """
+        self.base_url = base_url
+        auth = Auth0Handler()
+
+        bearer_token_fetchers = {
+            Environments.TEST: auth.get_test_token,
+            Environments.BETA: auth.get_beta_token,
+            Environments.PROD: auth.get_prod_token,
+        }
+        self._bearer_token_fetcher = bearer_token_fetchers.get(environment_under_test)
+        # Warm the TokenManager cache; requests read the token again, so they pick up refreshes
+        self.bearer_token
+
+        self.concurrency = concurrency or int(os.environ.get("ASYNC_HTTP_CONCURRENCY", 100))
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05)),
+            sock_read=float(os.environ.get("HTTP_READ_TIMEOUT", 30)),
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def bearer_token(self) -> Optional[str]:
+        """
+        The bearer token for the environment under test. Tokens are cached and refreshed in the background
+        by the TokenManager, so a long-running fan-out keeps picking up refreshed tokens, like HttpClient.
+
+        :returns: The bearer token, or None if the environment has no token fetcher.
+        """
+        if self._bearer_token_fetcher is None:
+            return None
+        return self._bearer_token_fetcher()
+
+    async def __aenter__(self) -> 'AsyncHttpClient':
+        """
+        Open the session and its connection pool, which is sized to the concurrency limit.
+
+        :returns: This client.
+        """
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=self.timeout,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Close the session and its connections.
+        """
+        await self._session.close()
+        self._session = None
+
+    async def _request(self,
+                       method: str,
+                       path: str,
+                       extra_headers: Optional[Dict[str, str]] = None,
+                       **kwargs) -> aiohttp.ClientResponse:
+        """
+        Makes a request to the specified path. The body is read before returning, so the response
+        can be inspected with status, json() and text() after the connection is released.
+
+        :param method: The HTTP method.
+        :param path: The path to make the request to.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :param kwargs: Extra arguments passed to aiohttp, such as params or json.
+        :returns: An aiohttp.ClientResponse object.
+        :raises aiohttp.ClientError: If the request fails for any reason.
+        """
+        if self._session is None:
+            raise RuntimeError("AsyncHttpClient must be used as an async context manager")
+
+        headers = {"Authorization": f"Bearer {self.bearer_token}"}
+        if extra_headers:
+            headers.update(extra_headers)
+
+        async with self._session.request(method, f"{self.base_url}/{path}", headers=headers, **kwargs) as response:
+            await response.read()
+            response.raise_for_status()
+        return response
+
+    async def get(self,
+                  path: str,
+                  params: Optional[Dict[str, str]] = None,
+                  extra_headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """
+        Makes a GET request to the specified path.
+
+        :param path: The path to make the GET request to.
+        :param params: Optional dictionary of query parameters.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :returns: An aiohttp.ClientResponse object.
+        :raises aiohttp.ClientError: If the request fails for any reason.
+        """
+        return await self._request("GET", path, extra_headers, params=params)
+
+    async def post(self,
+                   path: str,
+                   data: Optional[Dict[str, Any]] = None,
+                   extra_headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """
+        Makes a POST request to the specified path.
+
+        :param path: The path to make the POST request to.
+        :param data: Optional dictionary of data to send as JSON in the body of the request.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :returns: An aiohttp.ClientResponse object.
+        :raises aiohttp.ClientError: If the request fails for any reason.
+        """
+        return await self._request("POST", path, extra_headers, json=data)
+
+    async def put(self,
+                  path: str,
+                  data: Optional[Dict[str, Any]] = None,
+                  extra_headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """
+        Makes a PUT request to the specified path.
+
+        :param path: The path to make the PUT request to.
+        :param data: Optional dictionary of data to send as JSON in the body of the request.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :returns: An aiohttp.ClientResponse object.
+        :raises aiohttp.ClientError: If the request fails for any reason.
+        """
+        return await self._request("PUT", path, extra_headers, json=data)
+
+    async def delete(self,
+                     path: str,
+                     params: Optional[Dict[str, str]] = None,
+                     extra_headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """
+        Makes a DELETE request to the specified path.
+
+        :param path: The path to make the DELETE request to.
+        :param params: Optional dictionary of query parameters.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :returns: An aiohttp.ClientResponse object.
+        :raises aiohttp.ClientError: If the request fails for any reason.
+        """
+        return await self._request("DELETE", path, extra_headers, params=params)
+
+    async def gather(self,
+                     requests: Iterable[RequestSpec],
+                     concurrency: Optional[int] = None) -> List[Union[aiohttp.ClientResponse, BaseException]]:
+        """
+        Run many requests concurrently, with at most `concurrency` of them in flight at once.
+
+        :param requests: (method, path, kwargs) tuples, where kwargs are the keyword arguments of the
+            matching method, e.g. ("POST", "users", {"data": {...}}).
+        :param concurrency: The maximum number of requests in flight. Defaults to the client's limit.
+        :returns: The responses in the order of the requests. A request that failed is returned as its exception.
+        """
+        if self._session is None:
+            async with self:
+                return await self.gather(requests, concurrency)
+
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        verbs = {"GET": self.get, "POST": self.post, "PUT": self.put, "DELETE": self.delete}
+
+        async def run(method: str, path: str, kwargs: Dict[str, Any]):
+            async with semaphore:
+                return await verbs[method.upper()](path, **kwargs)
+
+        return await asyncio.gather(*(run(method, path, kwargs) for method, path, kwargs in requests),
+                                    return_exceptions=True)
+
+    def run_concurrently(self,
+                         requests: Iterable[RequestSpec],
+                         concurrency: Optional[int] = None) -> List[Union[aiohttp.ClientResponse, BaseException]]:
+        """
+        Synchronous wrapper around gather() for use from Flask controllers.
+        Runs the fan-out on a new event loop, so it must not be called from a running loop.
+
+        :param requests: (method, path, kwargs) tuples, see gather().
+        :param concurrency: The maximum number of requests in flight. Defaults to the client's limit.
+        :returns: The responses in the order of the requests. A request that failed is returned as its exception.
+        """
+        return asyncio.run(self.gather(requests, concurrency))
@@ -1,11 +1,146 @@
+import os
+import threading
+import time
 import requests
-from cachetools import TTLCache, cached
-from typing import Optional
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple, Any
 from flask import current_app
+from modules.secrets_manager import SingletonMeta
 
-# Global cache for Auth0 credentials
-# stores up to 3 items (one per environment), each expires after 1800 seconds (30 minutes)
-auth0_cache = TTLCache(maxsize=3, ttl=1800)
+# Lifetime assumed for a token when Auth0 does not report expires_in, in seconds (30 minutes)
+DEFAULT_TOKEN_TTL = 1800
+
+
+class _Token:
+    def __init__(self, token: Optional[str], expires_in: float, refresh_margin: float):
+        """
+        A token together with the times it expires and should be refreshed at.
+
+        :param token: The access token.
+        :param expires_in: The number of seconds the token is valid for.
+        :param refresh_margin: How many seconds before expiry to start refreshing, at most half the lifetime.
+        """
+        now = time.time()
+        self.token = token
+        self.expires_at = now + expires_in
+        self.refresh_at = self.expires_at - min(refresh_margin, expires_in / 2)
+
+
+class TokenManager(metaclass=SingletonMeta):
+    """
+    Process-wide cache of Auth0 tokens, one per environment.
+
+    Tokens are kept until the expiry Auth0 reports for them. Once a token enters its refresh window,
+    callers keep getting it while a background thread fetches its replacement. Fetches are single-flight:
+    concurrent misses for an environment wait for one fetch instead of each calling Auth0.
+    """
+
+    def __init__(self):
+        """
+        Initialize the TokenManager. The refresh margin is pulled from the AUTH0_REFRESH_MARGIN environment variable.
+        """
+        self.refresh_margin = float(os.environ.get("AUTH0_REFRESH_MARGIN", 300))
+        self._tokens: Dict[str, _Token] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def get_token(self, env: str, fetch: Callable[[], Tuple[Optional[str], float]]) -> Optional[str]:
+        """
+        Get the token for an environment, fetching it only if there is no unexpired token.
+
+        :param env: The environment for which to get the token.
+        :param fetch: Fetches a new token, returning the token and the number of seconds it is valid for.
+        :return: The token for the environment.
+        """
+        entry = self._tokens.get(env)
+        if entry is not None and time.time() < entry.expires_at:
+            self._count("hits")
+            if time.time() >= entry.refresh_at:
+                self._refresh_in_background(env, fetch)
+            return entry.token
+
+        with self._lock_for(env):
+            # Another caller may have fetched the token while we waited for the lock
+            entry = self._tokens.get(env)
+            if entry is not None and time.time() < entry.expires_at:
+                self._count("hits")
+                return entry.token
+
+            self._count("misses")
+            return self._fetch(env, fetch).token
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache counters and how long each cached token remains valid.
+
+        :return: The hit, miss, refresh and refresh failure counts, and the seconds to expiry per environment.
+        """
+        now = time.time()
+        stats: Dict[str, Any] = dict(self._metrics)
+        stats["expires_in_seconds"] = {env: round(entry.expires_at - now) for env, entry in self._tokens.items()}
+        return stats
+
+    def clear(self):
+        """
+        Forget all cached tokens, so the next call for each environment fetches a new one.
+        """
+        self._tokens.clear()
+
+    def _count(self, metric: str):
+        """
+        Increment one of the cache counters.
+
+        :param metric: The name of the counter.
+        """
+        with self._metrics_lock:
+            self._metrics[metric] += 1
+
+    def _lock_for(self, env: str) -> threading.Lock:
+        """
+        Get the lock that serializes fetches for an environment.
+
+        :param env: The environment.
+        :return: The lock.
+        """
+        with self._locks_lock:
+            return self._locks.setdefault(env, threading.Lock())
+
+    def _fetch(self, env: str, fetch: Callable[[], Tuple[Optional[str], float]]) -> _Token:
+        """
+        Fetch and cache a new token. Must be called while holding the environment's lock.
+
+        :param env: The environment.
+        :param fetch: Fetches a new token, returning the token and the number of seconds it is valid for.
+        :return: The new token.
+        """
+        token, expires_in = fetch()
+        entry = self._tokens[env] = _Token(token, expires_in, self.refresh_margin)
+        return entry
+
+    def _refresh_in_background(self, env: str, fetch: Callable[[], Tuple[Optional[str], float]]):
+        """
+        Start fetching a replacement token, unless a fetch for the environment is already running.
+
+        :param env: The environment.
+        :param fetch: Fetches a new token, returning the token and the number of seconds it is valid for.
+        """
+        lock = self._lock_for(env)
+        if not lock.acquire(blocking=False):
+            return
+
+        def refresh():
+            try:
+                self._fetch(env, fetch)
+                self._count("refreshes")
+            except Exception:
+                # The current token stays in use until it expires; the next call retries the refresh
+                self._count("refresh_failures")
+            finally:
+                lock.release()
+
+        threading.Thread(target=refresh, name=f"auth0-refresh-{env}", daemon=True).start()
 
 
 class Auth0Handler:
@@ -19,59 +154,64 @@ class Auth0Handler:
 
         """
         self.secrets_manager = current_app.config['secrets_manager']
+        self.token_manager = TokenManager()
+
+        # Tokens may be refreshed on a background thread, which needs the application to read secrets
+        self._app = current_app._get_current_object()
 
-    def _get_auth0_token(self, env: str) -> Optional[str]:
+    def _get_auth0_token(self, env: str) -> Tuple[Optional[str], float]:
         """
-        Helper method to get an Auth0 token for a specific environment. The token is fetched from Auth0 the first time
-        this method is called for a certain environment, and then it's cached in memory for subsequent calls.
-        The cache expires after 30 minutes.
+        Helper method to fetch a new Auth0 token for a specific environment from Auth0.
+        Tokens are cached by the TokenManager; use the get_*_token methods to get a cached token.
 
         :param env: The environment for which to get the token. Should be 'test', 'beta', or 'prod'.
-        :return: The Auth0 token for the specified environment.
+        :return: The Auth0 token for the specified environment and the number of seconds it is valid for.
         """
-        auth_url = self.secrets_manager.get_secret(f'confirmatron.auth_zero.{env}.auth_url')
-        client_id = self.secrets_manager.get_secret(f'confirmatron.auth_zero.{env}.client_id')
-        client_secret = self.secrets_manager.get_secret(f'confirmatron.auth_zero.{env}.client_secret')
-        audience = self.secrets_manager.get_secret(f'confirmatron.auth_zero.{env}.audience')
-        grant_type = self.secrets_manager.get_secret(f'confirmatron.auth_zero.{env}.grant_type')
+        # Resolve all the settings together, so secrets in AWS are fetched in one batch
+        prefix = f'confirmatron.auth_zero.{env}'
+        with self._app.app_context():
+            secrets = self.secrets_manager.get_secrets([
+                f'{prefix}.auth_url',
+                f'{prefix}.client_id',
+                f'{prefix}.client_secret',
+                f'{prefix}.audience',
+                f'{prefix}.grant_type',
+            ])
 
         headers = {'content-type': 'application/json'}
         data = {
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "audience": audience,
-            "grant_type": grant_type
+            "client_id": secrets[f'{prefix}.client_id'],
+            "client_secret": secrets[f'{prefix}.client_secret'],
+            "audience": secrets[f'{prefix}.audience'],
+            "grant_type": secrets[f'{prefix}.grant_type']
         }
 
-        response = requests.post(auth_url, headers=headers, json=data)
+        response = requests.post(secrets[f'{prefix}.auth_url'], headers=headers, json=data)
         response.raise_for_status()  # Raise an exception if the request failed
-        token = response.json().get('access_token')
+        body = response.json()
 
-        return token
+        return body.get('access_token'), body.get('expires_in', DEFAULT_TOKEN_TTL)
 
-    @cached(cache=auth0_cache)
     def get_test_token(self) -> Optional[str]:
         """
         Get an Auth0 token for the test environment.
 
         :return: The Auth0 token for the test environment.
         """
-        return self._get_auth0_token('test')
+        return self.token_manager.get_token('test', partial(self._get_auth0_token, 'test'))
 
-    @cached(cache=auth0_cache)
     def get_beta_token(self) -> Optional[str]:
         """
         Get an Auth0 token for the beta environment.
 
         :return: The Auth0 token for the beta environment.
         """
-        return self._get_auth0_token('beta')
+        return self.token_manager.get_token('beta', partial(self._get_auth0_token, 'beta'))
 
-    @cached(cache=auth0_cache)
     def get_prod_token(self) -> Optional[str]:
         """
         Get an Auth0 token for the prod environment.
 
         :return: The Auth0 token for the prod environment.
         """
-        return self._get_auth0_token('prod')
+        return self.token_manager.get_token('prod', partial(self._get_auth0_token, 'prod'))
@@ -1,7 +1,9 @@
-from flask import g
+from flask import g, jsonify, make_response, request
 from functools import wraps
-from typing import Callable
+from typing import Callable, Type
+from marshmallow import Schema, ValidationError
 from modules.secrets_manager import SecretsManager
+from modules.validation import get_compiled_schema
 
 
 def load_api_config(api_name: str) -> Callable:
@@ -33,4 +35,40 @@ def load_api_config(api_name: str) -> Callable:
                 g.api_config = config.api
                 return func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+def load_body(schema_class: Type[Schema], many: bool = False) -> Callable:
+    """
+    A decorator function to validate and deserialize the JSON request body once, with the shared
+    compiled instance of a schema, and store the result in Flask's application context variable (g.payload).
+    Invalid bodies are rejected with a 400 response listing the errors, before the route runs.
+
+    :param schema_class: The marshmallow schema class of the request body.
+    :param many: Whether the body is a list of objects.
+    :returns: Decorator function that can be applied to a Flask route.
+    """
+    schema = get_compiled_schema(schema_class, many=many)
+
+    def decorator(func: Callable) -> Callable:
+        """
+        Decorator function that wraps the original route function, loading the request body before execution.
+
+        :param func: The function to be decorated.
+        :returns: The wrapped function.
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """
+            Wrapper function to execute the original function with the loaded request body.
+
+            :param *args: Variable length argument list of the original function.
+            :param **kwargs: Arbitrary keyword arguments of the original function.
+            :returns: The return value of the original function, or a 400 response if the body is invalid.
+            """
+            try:
+                g.payload = schema.load(request.get_json())
+            except ValidationError as e:
+                return make_response(jsonify({"error": "Invalid request body", "messages": e.messages}), 400)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
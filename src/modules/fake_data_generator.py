@@ -1,6 +1,15 @@
-import prance
 from faker import Faker
 import json
+import random
+import re
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from modules.openapi_spec import OpenApiSpec, load_spec
+
+try:
+    import numpy
+except ImportError:  # numeric columns fall back to the random module
+    numpy = None
 
 fake = Faker()
 
@@ -38,19 +47,314 @@ def generate_fake_data(schema):
 
     return None
 
-# Parse the OpenAPI spec and generate a sample payload for each endpoint
-def print_sample_payloads(spec_url):
-    parser = prance.ResolvingParser(spec_url)
-    for path, path_obj in parser.specification['paths'].items():
-        for method, method_obj in path_obj.items():
-            if 'requestBody' in method_obj:
-                content = method_obj['requestBody'].get('content', {})
-                if 'application/json' in content:
-                    schema = content['application/json'].get('schema', {})
-                    print(f"Endpoint: {method.upper()} {path}")
-                    print("Sample Payload:")
-                    payload = generate_fake_data(schema)
-                    print(json.dumps(payload, indent=4, sort_keys=True))
-                    print()
-
-print_sample_payloads('https://petstore3.swagger.io/api/v3/openapi.json')
+
+# A compiled schema node: given a count, returns that many values for the node
+Column = Callable[[int], List[Any]]
+
+# A generated test case: (path, method, payload)
+GeneratedCase = Tuple[str, str, Any]
+
+# A parameter templated in a path, e.g. {petId}
+_PATH_PARAMETER = re.compile(r"\{([^}]+)\}")
+
+# Faker providers of the string formats honoured when generating with constraints
+STRING_FORMATS: Dict[str, Callable[[Faker], str]] = {
+    'date': lambda faker: faker.date(),
+    'date-time': lambda faker: faker.iso8601(),
+    'time': lambda faker: faker.time(),
+    'email': lambda faker: faker.email(),
+    'uuid': lambda faker: faker.uuid4(),
+    'uri': lambda faker: faker.uri(),
+    'hostname': lambda faker: faker.hostname(),
+    'ipv4': lambda faker: faker.ipv4(),
+    'ipv6': lambda faker: faker.ipv6(),
+}
+
+
+class PayloadGenerator:
+    """
+    Generates payloads for a JSON schema in bulk.
+
+    The schema is compiled once into a plan of column generators: each node produces the values of
+    a whole batch at a time, strings are drawn from a pool sampled from Faker up front, and numbers
+    come from NumPy when it is installed. Values follow the same rules as generate_fake_data, unless
+    constraints are enabled. Generators created with the same seed produce the same payloads.
+    """
+
+    def __init__(self, schema: Dict[str, Any], seed: Optional[int] = None, pool_size: int = 1024,
+                 constraints: bool = False):
+        """
+        Compile a schema into a generator.
+
+        :param schema: The JSON schema of the payloads, with references resolved.
+        :param seed: Seed of the random generators, for reproducible payloads.
+        :param pool_size: How many strings to sample from Faker up front.
+        :param constraints: Honour enum, minLength, maxLength, format (see STRING_FORMATS), minItems and
+            maxItems, so the payloads are valid for the schema.
+        """
+        self.seed = seed
+        self.pool_size = pool_size
+        self.constraints = constraints
+        self._random = random.Random(seed)
+        self._numpy_random = numpy.random.default_rng(seed) if numpy is not None else None
+        self._faker = Faker()
+        self._faker.seed_instance(seed)
+        self._string_pool: Optional[List[str]] = None
+        # String pools of constrained strings, by (format, minLength, maxLength)
+        self._constrained_pools: Dict[Tuple[Optional[str], int, Optional[int]], List[str]] = {}
+        self._generate = self._compile(schema)
+
+    def generate(self, count: int) -> List[Any]:
+        """
+        Generate a batch of payloads.
+
+        :param count: How many payloads to generate.
+        :return: The payloads.
+        """
+        return self._generate(count)
+
+    def _compile(self, schema: Dict[str, Any]) -> Column:
+        """
+        Compile a schema node into a column generator.
+
+        :param schema: The schema node.
+        :return: The column generator of the node.
+        """
+        schema_type = schema.get('type')
+
+        if self.constraints and 'enum' in schema:
+            values = list(schema['enum'])
+            return lambda count: self._random.choices(values, k=count)
+        if schema_type == 'string':
+            return self._compile_string(schema) if self.constraints else self._strings
+        if schema_type == 'integer':
+            return self._integers
+        if schema_type == 'number':
+            return self._numbers
+        if schema_type == 'boolean':
+            return self._booleans
+        if schema_type == 'array':
+            return self._compile_array(schema)
+        if schema_type == 'object':
+            return self._compile_object(schema)
+        return lambda count: [None] * count
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Column:
+        """
+        Compile an array node. The items of every array in a batch are generated as one column.
+
+        :param schema: The array schema.
+        :return: The column generator of the array.
+        """
+        items = self._compile(schema.get('items', {}))
+        min_items, max_items = 1, 5
+        if self.constraints:
+            min_items = schema.get('minItems', min(1, schema.get('maxItems', 1)))
+            max_items = schema.get('maxItems', max(min_items, 5))
+
+        def arrays(count: int) -> List[List[Any]]:
+            lengths = self._randint_column(min_items, max_items, count)
+            values = items(sum(lengths))
+            result = []
+            start = 0
+            for length in lengths:
+                result.append(values[start:start + length])
+                start += length
+            return result
+
+        return arrays
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Column:
+        """
+        Compile an object node. Required properties without a schema are None, as in generate_fake_data.
+
+        :param schema: The object schema.
+        :return: The column generator of the object.
+        """
+        properties = schema.get('properties', {})
+        names = list(properties) + [name for name in schema.get('required', []) if name not in properties]
+        columns = [self._compile(properties.get(name, {})) for name in names]
+
+        def objects(count: int) -> List[Dict[str, Any]]:
+            values = [column(count) for column in columns]
+            return [dict(zip(names, row)) for row in zip(*values)] if names else [{} for _ in range(count)]
+
+        return objects
+
+    def _compile_string(self, schema: Dict[str, Any]) -> Column:
+        """
+        Compile a string node with its format and length constraints.
+        Strings of a known format are not padded or truncated to the length constraints.
+
+        :param schema: The string schema.
+        :return: The column generator of the string.
+        """
+        string_format = schema.get('format') if schema.get('format') in STRING_FORMATS else None
+        min_length = schema.get('minLength', 0)
+        max_length = schema.get('maxLength')
+        if string_format is None and not min_length and max_length is None:
+            return self._strings
+
+        key = (string_format, min_length, max_length)
+        pool = self._constrained_pools.get(key)
+        if pool is None:
+            if string_format is not None:
+                pool = [STRING_FORMATS[string_format](self._faker) for _ in range(self.pool_size)]
+            else:
+                upper = max_length if max_length is not None else max(min_length, 20)
+                pool = [self._faker.pystr(min_chars=min_length, max_chars=upper) for _ in range(self.pool_size)]
+            self._constrained_pools[key] = pool
+        return lambda count: self._random.choices(pool, k=count)
+
+    def _strings(self, count: int) -> List[str]:
+        """
+        Draw strings from the pool, sampling it from Faker on first use.
+
+        :param count: How many strings to draw.
+        :return: The strings.
+        """
+        if self._string_pool is None:
+            self._string_pool = [self._faker.pystr_format() for _ in range(self.pool_size)]
+        return self._random.choices(self._string_pool, k=count)
+
+    def _integers(self, count: int) -> List[int]:
+        """
+        Generate integers in the range of Faker.pyint.
+
+        :param count: How many integers to generate.
+        :return: The integers.
+        """
+        return self._randint_column(0, 9999, count)
+
+    def _numbers(self, count: int) -> List[float]:
+        """
+        Generate floats with two decimals.
+
+        :param count: How many floats to generate.
+        :return: The floats.
+        """
+        if self._numpy_random is not None:
+            return self._numpy_random.uniform(-10000, 10000, count).round(2).tolist()
+        return [round(self._random.uniform(-10000, 10000), 2) for _ in range(count)]
+
+    def _booleans(self, count: int) -> List[bool]:
+        """
+        Generate booleans.
+
+        :param count: How many booleans to generate.
+        :return: The booleans.
+        """
+        if self._numpy_random is not None:
+            return (self._numpy_random.random(count) < 0.5).tolist()
+        return [self._random.random() < 0.5 for _ in range(count)]
+
+    def _randint_column(self, low: int, high: int, count: int) -> List[int]:
+        """
+        Generate integers between low and high, both included.
+
+        :param low: The lowest value.
+        :param high: The highest value.
+        :param count: How many integers to generate.
+        :return: The integers.
+        """
+        if self._numpy_random is not None:
+            return self._numpy_random.integers(low, high, count, endpoint=True).tolist()
+        return [self._random.randint(low, high) for _ in range(count)]
+
+
+def generate_cases(spec: OpenApiSpec,
+                   seed: Optional[int] = None,
+                   chunk_size: int = 100,
+                   constraints: bool = False,
+                   endpoints: Optional[Iterable[Tuple[str, str]]] = None) -> Iterator[GeneratedCase]:
+    """
+    Lazily generate an unbounded stream of test cases for the endpoints of a spec.
+
+    Each endpoint gets its own PayloadGenerator, compiled once. The endpoints take turns, each
+    producing chunk_size payloads at a time, so only one chunk is held in memory. Take a finite
+    number of cases with itertools.islice. Parameters templated in the path of an endpoint are
+    filled with values generated from their schemas, so each case has a path that can be requested.
+
+    :param spec: The spec, see load_spec.
+    :param seed: Seed for reproducible cases. Each endpoint derives its own seed from it, so adding an
+        endpoint does not change the cases of the others.
+    :param chunk_size: How many payloads an endpoint generates per turn.
+    :param constraints: Generate payloads that are valid for their schema, see PayloadGenerator.
+    :param endpoints: The (path, method) pairs to generate cases for. Defaults to every endpoint taking
+        a JSON request body.
+    :return: The (path, method, payload) cases, with the path parameters filled in.
+    :raises KeyError: If one of the endpoints takes no JSON request body.
+    """
+    endpoints = spec.endpoints() if endpoints is None else list(endpoints)
+    generators = [
+        (method, PayloadGenerator(spec.request_body_schema(path, method), seed=_endpoint_seed(seed, path, method),
+                                  constraints=constraints),
+         _compile_path(path, spec.path_parameters(path, method), _endpoint_seed(seed, path, method, "path"),
+                       constraints))
+        for path, method in endpoints
+    ]
+    if not generators:
+        return
+
+    while True:
+        for method, generator, paths in generators:
+            for path, payload in zip(paths(chunk_size), generator.generate(chunk_size)):
+                yield path, method.upper(), payload
+
+
+def _compile_path(path: str, parameters: Dict[str, Dict[str, Any]], seed: Optional[int],
+                  constraints: bool) -> Callable[[int], List[str]]:
+    """
+    Compile the path of an endpoint into a generator of paths with their parameters filled in.
+
+    :param path: The path, as written in the spec.
+    :param parameters: The schema of each path parameter by name, see OpenApiSpec.path_parameters.
+    :param seed: Seed of the parameter values.
+    :param constraints: Generate values that are valid for their schema, see PayloadGenerator.
+    :return: A function returning the given number of paths.
+    """
+    if not _PATH_PARAMETER.search(path):
+        return lambda count: [path] * count
+
+    names = _PATH_PARAMETER.findall(path)
+    generator = PayloadGenerator({'type': 'object', 'properties': {name: parameters.get(name, {'type': 'string'})
+                                                                   for name in names}},
+                                 seed=seed, constraints=constraints)
+
+    def paths(count: int) -> List[str]:
+        return [_PATH_PARAMETER.sub(lambda match: quote(str(values[match.group(1)]), safe=""), path)
+                for values in generator.generate(count)]
+
+    return paths
+
+
+def _endpoint_seed(seed: Optional[int], path: str, method: str, part: str = "") -> Optional[int]:
+    """
+    Derive the seed of an endpoint's generator. Seeding Random with a string is stable across processes.
+
+    :param seed: The seed of the stream, None for random cases.
+    :param path: The path of the endpoint.
+    :param method: The HTTP method of the endpoint.
+    :param part: Which generator of the endpoint the seed is for, empty for its payloads.
+    :return: The seed of the endpoint, None if the stream is not seeded.
+    """
+    if seed is None:
+        return None
+    suffix = f":{part}" if part else ""
+    return random.Random(f"{seed}:{method.upper()} {path}{suffix}").getrandbits(64)
+
+
+# Load the OpenAPI spec and generate a sample payload for each endpoint
+def print_sample_payloads(spec_source):
+    spec = load_spec(spec_source)
+    for (path, method), schema in spec.request_body_schemas.items():
+        print(f"Endpoint: {method} {path}")
+        print("Sample Payload:")
+        payload = generate_fake_data(schema)
+        print(json.dumps(payload, indent=4, sort_keys=True))
+        print()
+
+
+# Only print the samples when run as a script; the spec is fetched once and then read from the disk cache
+if __name__ == "__main__":
+    print_sample_payloads('https://petstore3.swagger.io/api/v3/openapi.json')
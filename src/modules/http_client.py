@@ -1,13 +1,51 @@
+import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
+from urllib3.util.retry import Retry
 from modules.constants import Environments
 from modules.auth_0_handler import Auth0Handler
 
+# HttpClient instances shared per (base_url, environment), owned by the process that created them
+_clients: Dict[Tuple[str, Environments], 'HttpClient'] = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """
+    Build a keep-alive session with a connection pool per host and a retry-with-backoff adapter.
+    Pool and retry settings are pulled from environment variables.
+
+    :return: The configured session.
+    """
+    retry = Retry(
+        total=int(os.environ.get("HTTP_MAX_RETRIES", 3)),
+        backoff_factor=float(os.environ.get("HTTP_BACKOFF_FACTOR", 0.3)),
+        status_forcelist=(502, 503, 504),
+        # Leave raising on error statuses to raise_for_status
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(os.environ.get("HTTP_POOL_CONNECTIONS", 10)),
+        pool_maxsize=int(os.environ.get("HTTP_POOL_MAXSIZE", 20)),
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class HttpClient:
     """
     Simple HTTP client for making requests.
+
+    All requests go through one pooled keep-alive session, so connections to the API under test are reused.
+    Use HttpClient.get_client to share one instance per base URL and environment.
     """
 
     def __init__(self, base_url: str, environment_under_test: Environments):
@@ -19,22 +57,61 @@ class HttpClient:
             Environments.BETA: auth.get_beta_token,
             Environments.PROD: auth.get_prod_token,
         }
-        fetcher = bearer_token_fetchers.get(environment_under_test)
-        if fetcher is not None:
-            self.bearer_token = fetcher()
+        self._bearer_token_fetcher = bearer_token_fetchers.get(environment_under_test)
 
-        self.session = requests.Session()
+        self.session = _build_session()
+        self.timeout = (
+            float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05)),
+            float(os.environ.get("HTTP_READ_TIMEOUT", 30)),
+        )
 
-    def get(self,
-            path: str,
-            params: Optional[Dict[str, str]] = None,
-            extra_headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    @classmethod
+    def get_client(cls, base_url: str, environment_under_test: Environments) -> 'HttpClient':
         """
-        Makes a GET request to the specified path.
+        Get the HttpClient shared by every caller using the same base URL and environment, creating it on first use.
+        Clients created before a fork are not reused by the child process.
 
-        :param path: The path to make the GET request to.
-        :param params: Optional dictionary of query parameters.
+        :param base_url: The base URL of the API under test.
+        :param environment_under_test: The environment whose bearer token is sent.
+        :returns: The shared HttpClient.
+        """
+        global _clients_pid
+
+        key = (base_url, environment_under_test)
+        with _clients_lock:
+            if _clients_pid != os.getpid():
+                _clients.clear()
+                _clients_pid = os.getpid()
+
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = cls(base_url, environment_under_test)
+        return client
+
+    @property
+    def bearer_token(self) -> Optional[str]:
+        """
+        The bearer token for the environment under test. Tokens are cached by the Auth0Handler,
+        so a long-lived client keeps picking up refreshed tokens.
+
+        :returns: The bearer token, or None if the environment has no token fetcher.
+        """
+        if self._bearer_token_fetcher is None:
+            return None
+        return self._bearer_token_fetcher()
+
+    def _request(self,
+                 method: str,
+                 path: str,
+                 extra_headers: Optional[Dict[str, str]] = None,
+                 **kwargs) -> requests.Response:
+        """
+        Makes a request to the specified path through the pooled session.
+
+        :param method: The HTTP method.
+        :param path: The path to make the request to.
         :param extra_headers: Optional dictionary of headers to be added to the request.
+        :param kwargs: Extra arguments passed to requests, such as params or json.
         :returns: A requests.Response object.
         :raises RequestException: If the request fails for any reason.
         """
@@ -43,13 +120,29 @@ class HttpClient:
             headers.update(extra_headers)
 
         try:
-            response = requests.get(f"{self.base_url}/{path}", headers=headers, params=params)
+            response = self.session.request(method, f"{self.base_url}/{path}", headers=headers,
+                                            timeout=self.timeout, **kwargs)
             response.raise_for_status()
         except RequestException as e:
             # handle or raise the exception as needed
             raise e
         return response
 
+    def get(self,
+            path: str,
+            params: Optional[Dict[str, str]] = None,
+            extra_headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Makes a GET request to the specified path.
+
+        :param path: The path to make the GET request to.
+        :param params: Optional dictionary of query parameters.
+        :param extra_headers: Optional dictionary of headers to be added to the request.
+        :returns: A requests.Response object.
+        :raises RequestException: If the request fails for any reason.
+        """
+        return self._request("GET", path, extra_headers, params=params)
+
     def post(self,
              path: str,
              data: Optional[Dict[str, Any]] = None,
@@ -63,17 +156,7 @@ class HttpClient:
         :returns: A requests.Response object.
         :raises RequestException: If the request fails for any reason.
         """
-        headers = {"Authorization": f"Bearer {self.bearer_token}"}
-        if extra_headers:
-            headers.update(extra_headers)
-
-        try:
-            response = requests.post(f"{self.base_url}/{path}", headers=headers, json=data)
-            response.raise_for_status()
-        except RequestException as e:
-            # handle or raise the exception as needed
-            raise e
-        return response
+        return self._request("POST", path, extra_headers, json=data)
 
     def put(self,
             path: str,
@@ -88,17 +171,7 @@ class HttpClient:
         :returns: A requests.Response object.
         :raises RequestException: If the request fails for any reason.
         """
-        headers = {"Authorization": f"Bearer {self.bearer_token}"}
-        if extra_headers:
-            headers.update(extra_headers)
-
-        try:
-            response = requests.put(f"{self.base_url}/{path}", headers=headers, json=data)
-            response.raise_for_status()
-        except RequestException as e:
-            # handle or raise the exception as needed
-            raise e
-        return response
+        return self._request("PUT", path, extra_headers, json=data)
 
     def delete(self,
                path: str,
@@ -113,15 +186,4 @@ class HttpClient:
         :returns: A requests.Response object.
         :raises RequestException: If the request fails for any reason.
         """
-        headers = {"Authorization": f"Bearer {self.bearer_token}"}
-        if extra_headers:
-            headers.update(extra_headers)
-
-        try:
-            response = requests.delete(f"{self.base_url}/{path}", headers=headers, params=params)
-            response.raise_for_status()
-        except RequestException as e:
-            # handle or raise the exception as needed
-            raise e
-        return response
-
+        return self._request("DELETE", path, extra_headers, params=params)
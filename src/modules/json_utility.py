@@ -1,5 +1,58 @@
-from typing import Any
+from typing import Any, Optional, Union
 import json
+import os
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # only needed when RESULT_ENCODING=msgpack
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # the fastest backend, used when installed
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # used when installed and orjson is not
+    ujson = None
+
+# Tag bytes that start binary-encoded values. Neither can start a JSON document,
+# so values written as JSON before the encoding was switched are still readable.
+MSGPACK_TAG = b"\x01"
+MSGPACK_ZLIB_TAG = b"\x02"
+
+# Errors of a fast backend on input the json module handles differently (NaN, integers over 64 bits,
+# non-string keys, UTF-16 bytes, ...), for which the json module is used instead
+_BACKEND_ERRORS = (TypeError, ValueError, OverflowError)
+
+# orjson parses integers over 64 bits as floats instead of failing. Documents with a run of 19 digits,
+# found by mapping every digit to 0, are parsed with the json module so such integers stay exact.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_NUMBER = b"0" * 19
+
+
+def _select_backend(name: str) -> str:
+    """
+    Select the JSON backend used by serialize(), serialize_bytes() and deserialize().
+
+    :param name: "auto" for the fastest one installed, or "orjson", "ujson" or "json".
+    :return: The name of the backend.
+    :raises ValueError: If the backend is unknown or not installed.
+    """
+    installed = {"orjson": orjson, "ujson": ujson, "json": json}
+    if name == "auto":
+        return next(backend for backend, module in installed.items() if module is not None)
+    if name not in installed:
+        raise ValueError(f"Unknown JSON backend {name}, expected auto, orjson, ujson or json")
+    if installed[name] is None:
+        raise ValueError(f"The {name} JSON backend requires the {name} package")
+    return name
+
+
+# Selected once, with the JSON_BACKEND environment variable
+BACKEND = _select_backend(os.environ.get("JSON_BACKEND", "auto"))
 
 
 class JsonUtility:
@@ -7,32 +60,147 @@ class JsonUtility:
     Static class for working with JSON.
     """
     @staticmethod
-    def serialize(data: Any) -> str:
+    def serialize(data: Any, backend: Optional[str] = None) -> str:
         """
-        Serialize a Python object into a JSON string.
+        Serialize a Python object into a compact JSON string, with the fastest backend available.
+        This is the format result records are stored in; see serialize_bytes().
 
         :param data: The Python object to be serialized.
+        :param backend: The backend to use. Defaults to the one selected by JSON_BACKEND.
         :return: The JSON string.
         :raises ValueError: If the data cannot be serialized into JSON.
         """
+        return JsonUtility.serialize_bytes(data, backend=backend).decode("utf-8")
+
+    @staticmethod
+    def serialize_bytes(data: Any, backend: Optional[str] = None) -> bytes:
+        """
+        Serialize a Python object into compact UTF-8 JSON, with the fastest backend available.
+        Input a fast backend rejects (integers over 64 bits, non-string keys, ...) is serialized with
+        the json module instead.
+
+        Every backend produces the same JSON document, except that orjson writes NaN and infinities,
+        which JSON cannot represent, as null.
+
+        :param data: The Python object to be serialized.
+        :param backend: The backend to use. Defaults to the one selected by JSON_BACKEND.
+        :return: The JSON document as bytes.
+        :raises ValueError: If the data cannot be serialized into JSON.
+        """
+        backend = backend or BACKEND
         try:
-            return json.dumps(data)
+            if backend == "orjson":
+                return orjson.dumps(data)
+            if backend == "ujson":
+                return ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+        except _BACKEND_ERRORS:
+            pass
+
+        try:
+            return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
         except TypeError as e:
             print(f"Unable to convert {data} to string - {e}")
             raise ValueError(f"Failed to serialize data into JSON: {e}")
 
     @staticmethod
-    def deserialize(json_str: str) -> Any:
+    def deserialize(json_str: Union[str, bytes], backend: Optional[str] = None) -> Any:
         """
-        Attempts to deserialize a JSON string into a Python object.
+        Attempts to deserialize a JSON string into a Python object, with the fastest backend available.
+        Values produced by encode() in a binary encoding are decoded transparently.
+
+        Input a fast backend rejects is parsed again with the json module, so every backend returns the
+        same objects and raises the same errors.
 
-        :param json_str: The JSON string to deserialize.
+        :param json_str: The JSON string, or UTF-8 JSON bytes as read from the store, or a value produced by encode().
+        :param backend: The backend to use. Defaults to the one selected by JSON_BACKEND.
         :returns: The deserialized Python object.
         :raises json.JSONDecodeError: If the JSON string is invalid.
         """
+        if JsonUtility.is_binary(json_str):
+            return JsonUtility._decode_binary(json_str)
+
+        backend = backend or BACKEND
+        try:
+            if backend == "orjson":
+                json_bytes = json_str.encode("utf-8") if isinstance(json_str, str) else json_str
+                if _LONG_NUMBER not in json_bytes.translate(_DIGITS_TO_ZERO):
+                    return orjson.loads(json_bytes)
+            if backend == "ujson":
+                return ujson.loads(json_str)
+        except _BACKEND_ERRORS:
+            pass
+
         try:
             return json.loads(json_str)
         except json.JSONDecodeError as e:
             # handle or raise the exception as needed
             print(f"Unable to convert {json_str} from string - {e}")
             raise e
+
+    @staticmethod
+    def encode(data: Any, encoding: Optional[str] = None, compress_threshold: Optional[int] = None) -> Union[str, bytes]:
+        """
+        Encode a Python object for storage, in the encoding selected by the RESULT_ENCODING environment variable.
+
+        "json" (default) produces the same string as serialize(). "msgpack" produces a tagged msgpack
+        value, zlib-compressed when it is at least compress_threshold bytes and compression makes it smaller.
+        Values msgpack cannot hold, such as integers over 64 bits, are stored as JSON instead.
+        Either can be read back with deserialize().
+
+        :param data: The Python object to be encoded.
+        :param encoding: "json" or "msgpack". Defaults to RESULT_ENCODING or "json".
+        :param compress_threshold: The size in bytes from which msgpack values are compressed.
+            Defaults to RESULT_COMPRESSION_THRESHOLD or 1024.
+        :return: A JSON string, or bytes starting with a tag byte.
+        :raises ValueError: If the data cannot be encoded, or the encoding is unknown or unavailable.
+        """
+        encoding = encoding or os.environ.get("RESULT_ENCODING", "json")
+        if encoding == "json":
+            return JsonUtility.serialize(data)
+        if encoding != "msgpack":
+            raise ValueError(f"Unknown encoding {encoding}, expected json or msgpack")
+        if msgpack is None:
+            raise ValueError("The msgpack encoding requires the msgpack package")
+
+        try:
+            packed = msgpack.packb(data)
+        except OverflowError:
+            # JSON has no limit on integers, and untagged values are read back as JSON
+            return JsonUtility.serialize(data)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Failed to serialize data into msgpack: {e}")
+
+        if compress_threshold is None:
+            compress_threshold = int(os.environ.get("RESULT_COMPRESSION_THRESHOLD", 1024))
+        if len(packed) >= compress_threshold:
+            compressed = zlib.compress(packed)
+            if len(compressed) < len(packed):
+                return MSGPACK_ZLIB_TAG + compressed
+        return MSGPACK_TAG + packed
+
+    @staticmethod
+    def is_binary(value: Union[str, bytes]) -> bool:
+        """
+        Check whether a stored value was produced by encode() in a binary encoding.
+
+        :param value: The stored value.
+        :returns: True if the value starts with a tag byte.
+        """
+        return isinstance(value, bytes) and value[:1] in (MSGPACK_TAG, MSGPACK_ZLIB_TAG)
+
+    @staticmethod
+    def _decode_binary(value: bytes) -> Any:
+        """
+        Decode a tagged binary value produced by encode().
+
+        :param value: The tagged value.
+        :returns: The decoded Python object.
+        :raises ValueError: If the value cannot be decoded.
+        """
+        if msgpack is None:
+            raise ValueError("Decoding msgpack values requires the msgpack package")
+
+        body = value[1:]
+        if value[:1] == MSGPACK_ZLIB_TAG:
+            body = zlib.decompress(body)
+        return msgpack.unpackb(body)
@@ -0,0 +1,215 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+from modules.result_store import ResultStore, ResultRecord, COUNTER_FIELDS, SUMMARY_FIELDS
+
+
+class MemoryResultStore(ResultStore):
+    """
+    ResultStore that keeps test suites in process memory, with no network cost.
+
+    Meant for unit tests and single-node runs: results are lost when the process exits and are not
+    shared between gunicorn workers. Test suites expire like they do in Redis.
+    """
+
+    def __init__(self, expire_seconds: int = 7200):
+        """
+        Initialize the MemoryResultStore.
+
+        :param expire_seconds: The number of seconds a test suite is kept after its last write.
+        """
+        self.expire_seconds = expire_seconds
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._expires_at: Dict[str, float] = {}
+        # Test suite keys of each API with their creation time, in creation order
+        self._index: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.RLock()
+
+    def create_key(self, api_name: str) -> str:
+        """
+        Create the key of a new test suite and index it under its API.
+
+        :param api_name: The name of the API under test.
+        :return: The new key, `{api_name}:{uuid}`.
+        """
+        key = self.new_key(api_name)
+        with self._lock:
+            self._write(key, {"Tests Initialized": ""})
+            self._index.setdefault(api_name, {})[key] = time.time()
+        return key
+
+    def initialize_test_suite(self, key: str):
+        """
+        Initialize the test suite by setting its counters to 0 and recording when it started.
+
+        :param key: The key of the test suite.
+        """
+        with self._lock:
+            self._write(key, {"total_tests": "0", "total_pass": "0", "total_fail": "0",
+                              "started_at": str(time.time())})
+
+    def retrieve_results(self, key: str, raw: bool = False) -> Dict[str, str]:
+        """
+        Retrieve all fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param raw: Accepted for the ResultStore interface; values are always strings here.
+        :return: A dictionary of field to value, empty if the test suite does not exist.
+        """
+        with self._lock:
+            return dict(self._get(key))
+
+    def scan_results(self, key: str, cursor: int = 0, count: int = 100,
+                     raw: bool = False) -> Tuple[int, Dict[str, str]]:
+        """
+        Retrieve one page of the fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param cursor: The offset returned by the previous page, or 0 to start.
+        :param count: How many fields to return.
+        :param raw: Accepted for the ResultStore interface; values are always strings here.
+        :return: The offset of the next page, 0 when there are no more, and a dictionary of field to value.
+        """
+        with self._lock:
+            # Fields keep their insertion order, so an offset is a stable cursor while fields are only added
+            fields = list(self._get(key).items())[cursor:cursor + count]
+            next_cursor = cursor + count if cursor + count < len(self._get(key)) else 0
+        return next_cursor, dict(fields)
+
+    def iter_results(self, key: str, count: int = 1000, raw: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over a snapshot of the fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param count: Accepted for the ResultStore interface; the snapshot is taken at once.
+        :param raw: Accepted for the ResultStore interface; values are always strings here.
+        :return: The (field, value) pairs of the test suite.
+        """
+        # The fields are already in memory, so a snapshot avoids re-slicing them for every page
+        with self._lock:
+            fields = list(self._get(key).items())
+        yield from fields
+
+    def get_summary(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the counters and timestamps of a test suite.
+
+        :param key: The key of the test suite.
+        :return: The summary, see ResultStore.parse_summary, or None if the test suite does not exist.
+        """
+        with self._lock:
+            fields = self._get(key)
+            return self.parse_summary([fields.get(field) for field in SUMMARY_FIELDS])
+
+    def get_totals(self, key: str) -> Dict[str, Dict[str, int]]:
+        """
+        Read the counters of a test suite and of its API.
+
+        :param key: The key of the test suite.
+        :return: The counters, under "suite" and "api".
+        """
+        with self._lock:
+            suite = self._get(key)
+            api = self._get(self._counters_key(self.api_name_of(key)))
+            return {
+                "suite": self.parse_counters(suite.get(field) for field in COUNTER_FIELDS),
+                "api": self.parse_counters(api.get(field) for field in COUNTER_FIELDS),
+            }
+
+    def store_results(self, key: str, results: Iterable[ResultRecord], count: bool = True,
+                      recounted: Optional[Counter] = None):
+        """
+        Store a batch of results and update the counters under a single lock.
+
+        :param key: The key of the test suite.
+        :param results: The (field, status, payload_sent, payload_received, context) records.
+        :param count: Whether to add the results to the counters of the suite and its API.
+        :param recounted: How many of the results were already counted, per status they were counted under.
+        """
+        mapping, statuses = self.serialize_results(results)
+        if not mapping:
+            return
+
+        mapping["updated_at"] = str(time.time())
+        with self._lock:
+            self._write(key, mapping)
+            if count:
+                increments = self.counter_increments(statuses, recounted)
+                self._increment(key, increments)
+                self._increment(self._counters_key(self.api_name_of(key)), increments)
+
+    def page_redis_keys(self, api_name: str, cursor: int = 0, limit: int = 100, start: Optional[float] = None,
+                        end: Optional[float] = None) -> Tuple[List[str], int]:
+        """
+        Get one page of the test suite keys of an API, in creation order, dropping expired suites from the index.
+
+        :param api_name: The name of the API.
+        :param cursor: The offset returned by the previous page, or 0 to start.
+        :param limit: How many keys to return.
+        :param start: Only return suites created at or after this epoch timestamp.
+        :param end: Only return suites created at or before this epoch timestamp.
+        :return: The keys, and the offset of the next page, 0 when there are no more.
+        """
+        with self._lock:
+            index = self._index.get(api_name, {})
+            for key in [key for key in index if not self._get(key)]:
+                del index[key]
+
+            keys = [key for key, created_at in index.items()
+                    if (start is None or created_at >= start) and (end is None or created_at <= end)]
+        page = keys[cursor:cursor + limit]
+        return page, cursor + limit if cursor + limit < len(keys) else 0
+
+    def exists(self, key: str) -> bool:
+        """
+        Check whether a test suite exists and has not expired.
+
+        :param key: The key of the test suite.
+        :return: True if it exists.
+        """
+        with self._lock:
+            return bool(self._get(key))
+
+    @staticmethod
+    def _counters_key(api_name: str) -> str:
+        """
+        Get the key of the hash rolling up the counters of every test suite of an API.
+
+        :param api_name: The name of the API.
+        :return: The key of the rollup, the same as in Redis.
+        """
+        return f"counters:{api_name}"
+
+    def _get(self, key: str) -> Dict[str, str]:
+        """
+        Get the fields of a hash, dropping it if it has expired. Must be called while holding the lock.
+
+        :param key: The key of the hash.
+        :return: The fields, empty if the hash does not exist.
+        """
+        if key in self._expires_at and self._expires_at[key] <= time.time():
+            del self._hashes[key]
+            del self._expires_at[key]
+        return self._hashes.get(key, {})
+
+    def _write(self, key: str, mapping: Dict[str, str]):
+        """
+        Set fields of a hash and refresh its expiry. Must be called while holding the lock.
+
+        :param key: The key of the hash.
+        :param mapping: The fields to set.
+        """
+        self._get(key)
+        self._hashes.setdefault(key, {}).update(mapping)
+        self._expires_at[key] = time.time() + self.expire_seconds
+
+    def _increment(self, key: str, increments: Dict[str, int]):
+        """
+        Increment counter fields of a hash and refresh its expiry. Must be called while holding the lock.
+
+        :param key: The key of the hash.
+        :param increments: The amount to add per counter field.
+        """
+        fields = self._get(key)
+        self._write(key, {field: str(int(fields.get(field, 0)) + amount) for field, amount in increments.items()})
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import requests
+
+# HTTP methods of an OpenAPI path item; its other keys (parameters, summary, ...) are not operations
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+# A $ref pointing outside the document, which can only be resolved relative to the location of the spec
+_EXTERNAL_REF = re.compile(r"""\$ref["']?\s*:\s*["']?[^"'#\s]""")
+
+# Resolved specs by content hash, so a spec is only resolved once per process
+_specs: Dict[str, 'OpenApiSpec'] = {}
+_specs_lock = threading.Lock()
+
+
+class OpenApiSpec:
+    """
+    A resolved OpenAPI specification, with the JSON request body schema and the path parameters of
+    each endpoint indexed.
+    """
+
+    def __init__(self, specification: Dict[str, Any], content_hash: str):
+        """
+        Index a resolved specification.
+
+        :param specification: The specification, with every $ref resolved.
+        :param content_hash: The hash of the document it was resolved from.
+        """
+        self.specification = specification
+        self.content_hash = content_hash
+
+        index = {}
+        path_parameters = {}
+        for path, path_obj in specification.get('paths', {}).items():
+            for method, method_obj in path_obj.items():
+                if method not in HTTP_METHODS or 'requestBody' not in method_obj:
+                    continue
+                content = method_obj['requestBody'].get('content', {})
+                if 'application/json' in content:
+                    index[(path, method.upper())] = content['application/json'].get('schema', {})
+                    # Parameters of the operation override those of the path item with the same name
+                    path_parameters[(path, method.upper())] = {
+                        parameter['name']: parameter.get('schema', {'type': 'string'})
+                        for parameter in path_obj.get('parameters', []) + method_obj.get('parameters', [])
+                        if parameter.get('in') == 'path'
+                    }
+        self.request_body_schemas: Mapping[Tuple[str, str], Dict[str, Any]] = MappingProxyType(index)
+        self.path_parameter_schemas: Mapping[Tuple[str, str], Dict[str, Dict[str, Any]]] = \
+            MappingProxyType(path_parameters)
+
+    def endpoints(self) -> List[Tuple[str, str]]:
+        """
+        List the endpoints taking a JSON request body.
+
+        :return: The (path, method) pairs, in the order of the specification.
+        """
+        return list(self.request_body_schemas)
+
+    def request_body_schema(self, path: str, method: str) -> Dict[str, Any]:
+        """
+        Get the JSON request body schema of an endpoint.
+
+        :param path: The path of the endpoint, as written in the specification.
+        :param method: The HTTP method, in any case.
+        :return: The schema.
+        :raises KeyError: If the endpoint does not exist or takes no JSON request body.
+        """
+        return self.request_body_schemas[(path, method.upper())]
+
+    def path_parameters(self, path: str, method: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the schemas of the parameters templated in the path of an endpoint, e.g. petId in /pet/{petId}.
+
+        :param path: The path of the endpoint, as written in the specification.
+        :param method: The HTTP method, in any case.
+        :return: The schema of each path parameter by name, empty if the path has none. Parameters
+            declared without a schema are strings.
+        :raises KeyError: If the endpoint does not exist or takes no JSON request body.
+        """
+        return self.path_parameter_schemas[(path, method.upper())]
+
+
+def load_spec(source: str, cache_dir: Optional[str] = None) -> OpenApiSpec:
+    """
+    Load an OpenAPI specification from a local file or a URL, resolving it only when its content changed.
+
+    Resolved specifications are cached in memory and on disk, keyed by the hash of their content, so
+    loading a spec that was resolved before only reads JSON. A URL is fetched at most once every
+    OPENAPI_SPEC_MAX_AGE seconds (default 3600), revalidating the cached copy with its ETag, and the
+    cached copy is used when the URL cannot be reached.
+
+    :param source: The path of the spec file, or its http(s) URL.
+    :param cache_dir: The directory of the disk cache. Defaults to OPENAPI_SPEC_CACHE_DIR, or a
+        confirmatron_openapi directory in the system temporary directory.
+    :return: The resolved specification.
+    :raises requests.RequestException: If the URL cannot be fetched and was never cached.
+    :raises OSError: If the file cannot be read.
+    """
+    cache_dir = cache_dir or os.environ.get("OPENAPI_SPEC_CACHE_DIR",
+                                            os.path.join(tempfile.gettempdir(), "confirmatron_openapi"))
+    os.makedirs(cache_dir, exist_ok=True)
+
+    if source.startswith(("http://", "https://")):
+        content_hash, text = _fetch(source, cache_dir)
+    else:
+        with open(source, "rb") as spec_file:
+            content = spec_file.read()
+        content_hash, text = _hash(content), content.decode("utf-8")
+
+    with _specs_lock:
+        spec = _specs.get(content_hash)
+        if spec is None:
+            spec = OpenApiSpec(_resolve_cached(source, content_hash, text, cache_dir), content_hash)
+            _specs[content_hash] = spec
+    return spec
+
+
+def _fetch(url: str, cache_dir: str) -> Tuple[str, Optional[str]]:
+    """
+    Fetch a spec from a URL, unless the cached copy is recent or still valid.
+
+    :param url: The URL of the spec.
+    :param cache_dir: The directory of the disk cache.
+    :return: The hash of the spec content, and the content if it was downloaded, None if the cached copy is used.
+    :raises requests.RequestException: If the URL cannot be fetched and was never cached.
+    """
+    meta_path = os.path.join(cache_dir, f"{_hash(url.encode('utf-8'))}.url.json")
+    meta = _read_json(meta_path)
+    cached = meta is not None and os.path.exists(_resolved_path(cache_dir, meta["content_hash"]))
+
+    if cached and time.time() - meta["fetched_at"] < float(os.environ.get("OPENAPI_SPEC_MAX_AGE", 3600)):
+        return meta["content_hash"], None
+
+    headers = {"If-None-Match": meta["etag"]} if cached and meta.get("etag") else {}
+    try:
+        response = requests.get(url, headers=headers, timeout=float(os.environ.get("OPENAPI_SPEC_TIMEOUT", 10)))
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if not cached:
+            raise
+        print(f"Unable to fetch {url}, using the cached spec - {e}")
+        return meta["content_hash"], None
+
+    if response.status_code == 304:
+        content_hash, text = meta["content_hash"], None
+    else:
+        content_hash, text = _hash(response.content), response.text
+
+    _write_json(meta_path, {"url": url, "etag": response.headers.get("ETag"), "content_hash": content_hash,
+                            "fetched_at": time.time()})
+    return content_hash, text
+
+
+def _resolve_cached(source: str, content_hash: str, text: Optional[str], cache_dir: str) -> Dict[str, Any]:
+    """
+    Read a resolved spec from the disk cache, resolving and caching it on a miss.
+
+    :param source: The path or URL of the spec, to resolve references relative to it.
+    :param content_hash: The hash of the spec content.
+    :param text: The spec content, None if only the cached copy is available.
+    :param cache_dir: The directory of the disk cache.
+    :return: The resolved specification.
+    """
+    resolved_path = _resolved_path(cache_dir, content_hash)
+    specification = _read_json(resolved_path)
+    if specification is None:
+        specification = _resolve(source, text)
+        _write_json(resolved_path, specification)
+    return specification
+
+
+def _resolve(source: str, text: Optional[str]) -> Dict[str, Any]:
+    """
+    Resolve every $ref of a spec with prance. prance is only imported here, since a cached spec does not need it.
+
+    :param source: The path or URL of the spec.
+    :param text: The spec content, if it was already read.
+    :return: The resolved specification.
+    """
+    import prance
+
+    if text is not None and not _EXTERNAL_REF.search(text):
+        # Self-contained documents are resolved from the content already read, without reading it again
+        return prance.ResolvingParser(spec_string=text).specification
+    # References to other documents are resolved relative to the source, so prance reads it itself
+    return prance.ResolvingParser(source).specification
+
+
+def _resolved_path(cache_dir: str, content_hash: str) -> str:
+    """
+    Get the path of a resolved spec in the disk cache.
+
+    :param cache_dir: The directory of the disk cache.
+    :param content_hash: The hash of the spec content.
+    :return: The path.
+    """
+    return os.path.join(cache_dir, f"{content_hash}.json")
+
+
+def _hash(content: bytes) -> str:
+    """
+    Hash content for the cache keys.
+
+    :param content: The content.
+    :return: The hex SHA-256 digest.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_json(path: str) -> Optional[Any]:
+    """
+    Read a JSON file of the disk cache.
+
+    :param path: The path of the file.
+    :return: The content, or None if the file does not exist or is corrupt.
+    """
+    try:
+        with open(path, encoding="utf-8") as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Any):
+    """
+    Write a JSON file of the disk cache atomically, so concurrent readers never see a partial file.
+
+    :param path: The path of the file.
+    :param data: The content.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+        json.dump(data, cache_file)
+    os.replace(temp_path, path)
@@ -1,30 +1,96 @@
 import os
 import redis
+from redis.client import Pipeline
+import threading
+import time
 import uuid
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from itertools import islice
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, Union
 from modules.constants import TestStatus
 from modules.json_utility import JsonUtility
+from modules.result_store import ResultStore, ResultRecord, PayloadSet, COUNTER_FIELDS, SUMMARY_FIELDS, PAYLOAD_FIELDS, \
+    DIGEST_SUFFIX
 
+# Process-wide connection pool shared by every RedisClient instance, created on first use
+_connection_pool: Optional[redis.BlockingConnectionPool] = None
+_connection_pool_lock = threading.Lock()
 
-class RedisClient:
+
+def _get_connection_pool() -> redis.BlockingConnectionPool:
+    """
+    Get the process-wide Redis connection pool, creating it on first use.
+
+    The pool is fork-safe: redis-py checks the owning PID whenever a connection is checked out
+    and discards connections inherited from a parent process, so a pool created before gunicorn
+    forks its workers is rebuilt lazily in each worker.
+    Pool settings are pulled from environment variables.
+
+    :return: The shared connection pool.
+    """
+    global _connection_pool
+
+    if _connection_pool is None:
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                # Get Redis host and port from environment variables or Kubernetes secrets
+                _redis_host = os.environ.get("REDIS_HOST", "localhost")  # Replace "localhost" with the default Redis host if needed
+                _redis_port = int(os.environ.get("REDIS_PORT", 6379))  # Replace 6379 with the default Redis port if needed
+
+                _connection_pool = redis.BlockingConnectionPool(
+                    host=_redis_host,
+                    port=_redis_port,
+                    db=0,
+                    max_connections=int(os.environ.get("REDIS_MAX_CONNECTIONS", 50)),
+                    timeout=float(os.environ.get("REDIS_POOL_TIMEOUT", 5)),
+                    health_check_interval=int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+                    socket_keepalive=os.environ.get("REDIS_SOCKET_KEEPALIVE", "true").lower() == "true",
+                )
+    return _connection_pool
+
+
+class RedisClient(ResultStore):
     """
     RedisClient is a wrapper around the redis-py StrictRedis client,
     providing some additional methods for managing test results in a Redis database.
+    It is the default ResultStore; test suites expire after 2 hours.
+
+    Large payloads are stored once per test suite in a `payloads:{key}` hash keyed by the digest of
+    their content, with the digest each record references in `payload_refs:{key}`. Both expire with the suite,
+    and the records reference them by digest. Set RESULT_PAYLOAD_DEDUP=false to store payloads inline.
     """
 
     def __init__(self):
         """
         Initialize RedisClient with a connection to the Redis server.
-        Connection details are pulled from environment variables.
+        Connections are borrowed from the process-wide pool, so creating a RedisClient does not open a socket.
         """
         self.expire_seconds = 7200
+        self.dedupe_payloads = os.environ.get("RESULT_PAYLOAD_DEDUP", "true").lower() == "true"
 
-        # Get Redis host and port from environment variables or Kubernetes secrets
-        _redis_host = os.environ.get("REDIS_HOST", "localhost")  # Replace "localhost" with the default Redis host if needed
-        _redis_port = int(os.environ.get("REDIS_PORT", 6379))  # Replace 6379 with the default Redis port if needed
+        # Create the Redis client on top of the shared connection pool
+        self.redis_client = redis.StrictRedis(connection_pool=_get_connection_pool())
 
-        # Create the Redis client with the obtained host and port
-        self.redis_client = redis.StrictRedis(host=_redis_host, port=_redis_port, db=0)
+    @staticmethod
+    def pool_stats() -> Dict[str, Any]:
+        """
+        Report utilisation of the process-wide connection pool, to help size it for the worker count.
+
+        Returns:
+            dict: The pool limits along with the number of created, idle and in-use connections.
+        """
+        pool = _get_connection_pool()
+        created = len(pool._connections)
+        idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+        return {
+            "pid": pool.pid,
+            "max_connections": pool.max_connections,
+            "created_connections": created,
+            "idle_connections": idle,
+            "in_use_connections": created - idle,
+            "health_check_interval": pool.connection_kwargs.get("health_check_interval"),
+            "socket_keepalive": pool.connection_kwargs.get("socket_keepalive"),
+        }
 
     def create_key(self, api_name: str) -> str:
         """
@@ -38,33 +104,233 @@ class RedisClient:
         """
         unique_id = str(uuid.uuid4())
         key = f"{api_name}:{unique_id}"
-        self.redis_client.hset(key, "Tests Initialized", "")
-        self.redis_client.expire(key, self.expire_seconds)
+        index_key = self._index_key(api_name)
+
+        # Create the hash and register it in the per-API index scored by creation time
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(key, "Tests Initialized", "")
+        pipe.expire(key, self.expire_seconds)
+        pipe.zadd(index_key, {key: time.time()})
+        pipe.expire(index_key, self.expire_seconds)
+        pipe.execute()
         return key
 
+    @staticmethod
+    def _index_key(api_name: str) -> str:
+        """
+        Get the key of the sorted set indexing the test keys of an API.
+
+        Args:
+            api_name (str): The name of the API.
+
+        Returns:
+            str: The key of the index. It deliberately does not match the `{api_name}:*` test key pattern.
+        """
+        return f"test_keys:{api_name}"
+
     def initialize_test_suite(self, key: str):
         """
-        Initialize the test suite by setting initial values for total_tests, total_pass, and total_fail.
+        Initialize the test suite by setting initial values for total_tests, total_pass, and total_fail,
+        and recording when it started.
 
         Args:
             key (str): The key of the test suite in Redis.
         """
 
-        self.redis_client.hset(key, "total_tests", 0)
-        self.redis_client.hset(key, "total_pass", 0)
-        self.redis_client.hset(key, "total_fail", 0)
+        # One round trip for the counters and the start time, refreshing the expiry set by create_key
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(key, mapping={"total_tests": 0, "total_pass": 0, "total_fail": 0, "started_at": time.time()})
+        pipe.expire(key, self.expire_seconds)
+        pipe.execute()
 
-    def retrieve_results(self, key: str) -> Dict[str, str]:
+    def retrieve_results(self, key: str, raw: bool = False) -> Dict[str, str]:
         """
         Retrieve all fields and their values associated with the provided key from Redis.
 
         Args:
             key (str): The key in Redis from which to retrieve the results.
+            raw (bool): Return the values as the bytes Redis sent, without decoding them into strings,
+                for callers that pass them to JsonUtility.deserialize. Defaults to False.
+
+        Returns:
+            Dict[str, str]: A dictionary of field-value pairs from the Redis hash, with deduplicated payloads
+                resolved. Records stored in a binary encoding are returned as bytes; read them with
+                JsonUtility.deserialize.
+        """
+        fields = {field.decode('utf-8'): self._decode(value, raw)
+                  for field, value in self.redis_client.hgetall(key).items()}
+        return self._resolve_payloads(key, fields, raw)
+
+    def scan_results(self, key: str, cursor: int = 0, count: int = 100,
+                     raw: bool = False) -> Tuple[int, Dict[str, str]]:
+        """
+        Retrieve one page of the fields of a test suite with HSCAN.
+
+        Args:
+            key (str): The key in Redis from which to retrieve the results.
+            cursor (int): The cursor returned by the previous page, or 0 to start. Defaults to 0.
+            count (int): How many fields to return. Redis treats this as a hint, so a page may
+                hold more or fewer fields. Defaults to 100.
+            raw (bool): Return the values as bytes, see retrieve_results. Defaults to False.
 
         Returns:
-            Dict[str, str]: A dictionary of field-value pairs from the Redis hash.
+            tuple: The cursor of the next page, 0 when there are no more, and a dictionary of field-value pairs.
         """
-        return {field.decode('utf-8'): value.decode('utf-8') for field, value in self.redis_client.hgetall(key).items()}
+        next_cursor, fields = self.redis_client.hscan(key, cursor=cursor, count=count)
+        return next_cursor, self._resolve_payloads(
+            key, {field.decode('utf-8'): self._decode(value, raw) for field, value in fields.items()}, raw)
+
+    def iter_results(self, key: str, count: int = 1000, raw: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over the fields of a test suite with HSCAN, fetching `count` fields per round trip,
+        so a large suite is never held in memory at once.
+
+        Args:
+            key (str): The key in Redis from which to retrieve the results.
+            count (int): How many fields to fetch per round trip. Defaults to 1000.
+            raw (bool): Return the values as bytes, see retrieve_results. Defaults to False.
+
+        Returns:
+            Iterator[tuple]: The (field, value) pairs of the hash. A field may be returned more than
+                once if the hash is written to while it is being scanned.
+        """
+        fields = ((field.decode('utf-8'), self._decode(value, raw))
+                  for field, value in self.redis_client.hscan_iter(key, count=count))
+
+        # Resolve the payloads of `count` fields at a time, with one HMGET each
+        while True:
+            chunk = dict(islice(fields, count))
+            if not chunk:
+                return
+            yield from self._resolve_payloads(key, chunk, raw).items()
+
+    def _resolve_payloads(self, key: str, fields: Dict[str, Union[str, bytes]],
+                          raw: bool = False) -> Dict[str, Union[str, bytes]]:
+        """
+        Put the payloads referenced by records back into them, fetching every payload with a single HMGET.
+
+        Args:
+            key (str): The key of the test suite.
+            fields (dict): The fields of the test suite as stored.
+            raw (bool): Keep the payloads read as bytes. Defaults to False.
+
+        Returns:
+            dict: The fields, with every record holding its payloads inline.
+        """
+        records = self.find_payload_references(fields)
+        if not records:
+            return fields
+
+        digests = list({record[name + DIGEST_SUFFIX] for record in records.values() for name in PAYLOAD_FIELDS
+                        if name + DIGEST_SUFFIX in record})
+        payloads = dict(zip(digests, (self._decode(value, raw) if value is not None else None
+                                      for value in self.redis_client.hmget(self._payloads_key(key), digests))))
+        return self.resolve_payloads(fields, records, payloads)
+
+    def get_payload_stats(self, key: str) -> Optional[Dict[str, int]]:
+        """
+        Report how much storage deduplicating payloads saves a test suite.
+
+        Args:
+            key (str): The key of the test suite in Redis.
+
+        Returns:
+            dict: The number of distinct payloads and references, the bytes stored, the bytes the
+                references would take inline, and the bytes saved.
+        """
+        references = Counter(digest.decode('utf-8')
+                             for digest in self.redis_client.hgetall(self._payload_refs_key(key)).values())
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for digest in references:
+            pipe.hstrlen(self._payloads_key(key), digest)
+        sizes = dict(zip(references, pipe.execute())) if references else {}
+
+        return self.payload_stats(references, sizes)
+
+    @staticmethod
+    def _payloads_key(key: str) -> str:
+        """
+        Get the key of the hash holding the payloads of a test suite by digest.
+
+        Args:
+            key (str): The key of the test suite.
+
+        Returns:
+            str: The key of the payloads. It deliberately does not match the `{api_name}:*` test key pattern.
+        """
+        return f"payloads:{key}"
+
+    @staticmethod
+    def _payload_refs_key(key: str) -> str:
+        """
+        Get the key of the hash holding the digest each record of a test suite references, by "{field}:{name}".
+
+        Args:
+            key (str): The key of the test suite.
+
+        Returns:
+            str: The key of the reference counts.
+        """
+        return f"payload_refs:{key}"
+
+    @staticmethod
+    def _decode(value: bytes, raw: bool = False) -> Union[str, bytes]:
+        """
+        Decode a hash value read from Redis, leaving binary-encoded records as bytes for JsonUtility.deserialize.
+
+        Args:
+            value (bytes): The raw value.
+            raw (bool): Leave every value as bytes, saving the copy made by decoding it. Defaults to False.
+
+        Returns:
+            str or bytes: The value as a string, or the binary-encoded record.
+        """
+        return value if raw or JsonUtility.is_binary(value) else value.decode('utf-8')
+
+    def get_summary(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the counters and timestamps of a test suite with a single HMGET, without fetching its results.
+
+        Args:
+            key (str): The key of the test suite in Redis.
+
+        Returns:
+            dict or None: total_tests, total_pass and total_fail as ints, started_at and updated_at as epoch
+                timestamps (None when not recorded yet), or None if the test suite does not exist.
+        """
+        return self.parse_summary(self.redis_client.hmget(key, SUMMARY_FIELDS))
+
+    def get_totals(self, key: str) -> Dict[str, Dict[str, int]]:
+        """
+        Read the counters of a test suite and the rollup counters of its API in a single round trip.
+
+        Args:
+            key (str): The key of the test suite in Redis.
+
+        Returns:
+            dict: {"suite": {...}, "api": {...}}, each with total_tests, total_pass and total_fail.
+                Counters that were never incremented are 0.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hmget(key, COUNTER_FIELDS)
+        pipe.hmget(self._counters_key(self.api_name_of(key)), COUNTER_FIELDS)
+        suite, api = pipe.execute()
+
+        return {"suite": self.parse_counters(suite), "api": self.parse_counters(api)}
+
+    @staticmethod
+    def _counters_key(api_name: str) -> str:
+        """
+        Get the key of the hash rolling up the counters of every test suite of an API.
+
+        Args:
+            api_name (str): The name of the API.
+
+        Returns:
+            str: The key of the rollup. It deliberately does not match the `{api_name}:*` test key pattern.
+        """
+        return f"counters:{api_name}"
 
     def get_total(self, key: str) -> Optional[int]:
         """
@@ -78,18 +344,23 @@ class RedisClient:
         """
         return self.redis_client.get(key)
 
-    def store_result(self, key: str, field: str, result: TestStatus, payload_sent: Dict[str, Any],
-                     payload_received: Dict[str, Any], context: str):
+    def store_results(self, key: str, results: Iterable[ResultRecord], count: bool = True,
+                      recounted: Optional[Counter] = None):
         """
-        Store a test result in Redis.
+        Store many test results in Redis in a single round trip.
+
+        All results are written to the hash, the expiry is refreshed once and the suite and API
+        counters are incremented by the aggregated pass/fail totals inside one MULTI/EXEC transaction,
+        so the counters always agree with the stored results. Large payloads are written to the payloads
+        of the suite in the same transaction, unless RESULT_PAYLOAD_DEDUP is false.
 
         Args:
-            key (str): The key in Redis where the test result will be stored.
-            field (str): The field name under which the result will be stored within the hash.
-            result (TestStatus): The test result status (PASS or FAIL).
-            payload_sent (dict): The payload sent during the test.
-            payload_received (dict): The payload received during the test.
-            context (str): Additional context or reason for the test result.
+            key (str): The key in Redis where the test results will be stored.
+            results (iterable): Tuples of (field, result, payload_sent, payload_received, context),
+                matching the arguments of store_result.
+            count (bool): Whether to add the results to the counters. Defaults to True.
+            recounted (Counter, optional): How many of the results were already counted, per status they were
+                counted under. Those counts are taken back in the same transaction.
 
         Raises:
             redis.exceptions.RedisError: If there is an issue with the Redis connection or storage.
@@ -97,49 +368,168 @@ class RedisClient:
         Returns:
             None
         """
-        data_to_store = {
-            "status": result.value,
-            "payload_sent": payload_sent,
-            "payload_received": payload_received,
-            "context": context,
-        }
-        data_to_store_str = JsonUtility.serialize(data_to_store)
-        self.redis_client.hset(key, field, data_to_store_str)
-        self.redis_client.expire(key, self.expire_seconds)
-
-        # Update the total counters based on the test result
-        self.update_counters(result, key)
-
-    def update_counters(self, result: TestStatus, key: str):
+        payloads = PayloadSet() if self.dedupe_payloads else None
+        mapping, statuses = self.serialize_results(results, payloads)
+        if not mapping:
+            return
+
+        # Record when the suite last received a result, for the summary
+        mapping["updated_at"] = time.time()
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.expire_seconds)
+
+        # Store each payload once, and record which payloads each record references. The references are
+        # set per record, so a rewritten record or a retried batch replaces its references instead of adding to them
+        payloads_key, refs_key = self._payloads_key(key), self._payload_refs_key(key)
+        if payloads is not None:
+            for digest, payload in payloads.payloads.items():
+                pipe.hsetnx(payloads_key, digest, payload)
+            referenced = {reference: digest for reference, digest in payloads.references.items() if digest}
+            inline = [reference for reference, digest in payloads.references.items() if not digest]
+            if referenced:
+                pipe.hset(refs_key, mapping=referenced)
+            if inline:
+                pipe.hdel(refs_key, *inline)
+
+        # Keep the payloads exactly as long as the suite, even when this batch holds none of them
+        pipe.expire(payloads_key, self.expire_seconds)
+        pipe.expire(refs_key, self.expire_seconds)
+
+        # Update the total counters based on the test results
+        if count:
+            for result, amount in statuses.items():
+                self.update_counters(result, key, amount=amount, pipe=pipe)
+            for result, amount in (recounted or {}).items():
+                self.update_counters(result, key, amount=-amount, pipe=pipe)
+            pipe.expire(self._counters_key(self.api_name_of(key)), self.expire_seconds)
+        pipe.execute()
+
+    def update_counters(self, result: TestStatus, key: str, amount: int = 1, pipe: Optional[Pipeline] = None):
         """
-        Update the total counters based on the test result.
+        Update the counters of the test suite and the rollup counters of its API based on the test result.
 
         Args:
             result (TestStatus): The test result status (PASS or FAIL).
             key (str): The key identifying the test.
+            amount (int): How many results with this status to add to the counters. Defaults to 1.
+            pipe (Pipeline, optional): A pipeline to queue the increments on. When omitted the increments
+                are sent on their own transactional pipeline.
 
         Raises:
             redis.exceptions.RedisError: If there is an issue with the Redis connection or storage.
         """
-
-        self.redis_client.hincrby(key, "total_tests", 1)
-        if result == TestStatus.PASS:
-            self.redis_client.hincrby(key, "total_pass", 1)
-        elif result == TestStatus.FAIL:
-            self.redis_client.hincrby(key, "total_fail", 1)
-
-    def get_redis_keys(self, api_name: str) -> List[str]:
+        own_pipe = pipe is None
+        if own_pipe:
+            pipe = self.redis_client.pipeline(transaction=True)
+
+        counters_key = self._counters_key(self.api_name_of(key))
+        for counter_key in (key, counters_key):
+            pipe.hincrby(counter_key, "total_tests", amount)
+            if result == TestStatus.PASS:
+                pipe.hincrby(counter_key, "total_pass", amount)
+            elif result == TestStatus.FAIL:
+                pipe.hincrby(counter_key, "total_fail", amount)
+
+        if own_pipe:
+            pipe.expire(counters_key, self.expire_seconds)
+            pipe.execute()
+
+    def page_redis_keys(self, api_name: str, cursor: int = 0, limit: int = 100, start: Optional[float] = None,
+                        end: Optional[float] = None) -> Tuple[List[str], int]:
         """
-        Retrieve all keys in Redis that match the provided API name.
+        Page through the keys of an API using the per-API index instead of scanning the keyspace.
+
+        Keys that have expired since they were indexed are pruned from the index as they are encountered.
 
         Args:
             api_name (str): The name of the API for which to retrieve the keys.
+            cursor (int): The cursor returned by the previous call, 0 to start from the oldest key.
+            limit (int): The maximum number of keys to return.
+            start (float, optional): Only return keys created at or after this epoch timestamp.
+            end (float, optional): Only return keys created at or before this epoch timestamp.
 
         Returns:
-            List[str]: A list of keys from Redis that match the provided API name.
+            Tuple[List[str], int]: The page of keys and the cursor for the next page, which is 0 once exhausted.
+        """
+        self._index_legacy_keys(api_name)
+
+        index_key = self._index_key(api_name)
+        min_score = "-inf" if start is None else start
+        max_score = "+inf" if end is None else end
+
+        while True:
+            page = [key.decode("utf-8") for key in
+                    self.redis_client.zrangebyscore(index_key, min_score, max_score, start=cursor, num=limit)]
+            if not page:
+                return [], 0
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in page:
+                pipe.exists(key)
+            live, expired = [], []
+            for key, exists in zip(page, pipe.execute()):
+                (live if exists else expired).append(key)
+
+            if expired:
+                self.redis_client.zrem(index_key, *expired)
+
+            # Pruned entries shift the remaining ones down, so only live keys advance the cursor
+            next_cursor = cursor + len(live) if len(page) == limit else 0
+            if live or not next_cursor:
+                return live, next_cursor
+            cursor = next_cursor
+
+    def _index_legacy_keys(self, api_name: str):
+        """
+        Add keys created before the per-API index existed to the index, using an incremental SCAN.
+
+        The scan runs at most once per expiry window per API; after that every live key was created
+        through create_key and is already indexed. A scan that fails is retried by the next call.
+
+        Args:
+            api_name (str): The name of the API whose legacy keys should be indexed.
+        """
+        marker_key = f"{self._index_key(api_name)}:legacy_indexed"
+        if not self.redis_client.set(marker_key, 1, nx=True, ex=self.expire_seconds):
+            return
+
+        index_key = self._index_key(api_name)
+        now = time.time()
+        batch = []
+        try:
+            for key in self.redis_client.scan_iter(match=f"{api_name}:*", count=1000):
+                batch.append(key)
+                if len(batch) == 1000:
+                    self._index_keys_by_ttl(index_key, batch, now)
+                    batch = []
+            if batch:
+                self._index_keys_by_ttl(index_key, batch, now)
+        except Exception:
+            # The marker only claims the scan so concurrent callers do not repeat it; drop it so a
+            # partial scan does not leave legacy keys unindexed until the marker expires
+            self.redis_client.delete(marker_key)
+            raise
+
+    def _index_keys_by_ttl(self, index_key: str, keys: List[bytes], now: float):
+        """
+        Add keys to an index, estimating their creation time from their remaining time to live.
+
+        Args:
+            index_key (str): The key of the index.
+            keys (List[bytes]): The keys to add.
+            now (float): The current epoch timestamp.
         """
-        all_keys = self.redis_client.keys(f"{api_name}:*")
-        return [key.decode("utf-8") for key in all_keys]
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        scores = {key: now - (self.expire_seconds - ttl) if ttl > 0 else now
+                  for key, ttl in zip(keys, pipe.execute())}
+
+        # Never overwrite the exact creation time of keys that are already indexed
+        self.redis_client.zadd(index_key, scores, nx=True)
+        self.redis_client.expire(index_key, self.expire_seconds)
 
     def exists(self, key: str) -> bool:
         """
@@ -0,0 +1,224 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from modules.constants import TestStatus
+from modules.result_store import ResultStore, TRANSIENT_ERRORS, get_result_store
+
+logger = logging.getLogger(__name__)
+
+# Process-wide sink shared by the test controllers, created on first use
+_result_sink: Optional['ResultSink'] = None
+_result_sink_lock = threading.Lock()
+
+
+def get_result_sink() -> 'ResultSink':
+    """
+    Get the process-wide result sink, creating it on first use.
+    The sink is flushed when the interpreter exits.
+
+    :return: The shared result sink.
+    """
+    global _result_sink
+
+    if _result_sink is None:
+        with _result_sink_lock:
+            if _result_sink is None:
+                _result_sink = ResultSink()
+                atexit.register(_result_sink.close)
+    return _result_sink
+
+
+class ResultSink:
+    """
+    In-process sink that takes test results off the request path.
+
+    Results are put on a bounded queue and a background worker drains them in batches, writing each
+    batch to the result store with store_results. A batch is written once it reaches batch_size
+    results or flush_interval seconds after its first result, whichever comes first.
+    When the queue is full, put() blocks for up to put_timeout seconds before dropping the result.
+    """
+
+    def __init__(self,
+                 store: Optional[ResultStore] = None,
+                 max_queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 put_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None):
+        """
+        Initialize the ResultSink. Settings that are not passed are pulled from environment variables.
+
+        :param store: The ResultStore to write results to. Defaults to the process-wide store.
+        :param max_queue_size: The maximum number of results waiting to be written.
+        :param batch_size: The maximum number of results written per batch.
+        :param flush_interval: The maximum number of seconds a result waits for its batch to fill.
+        :param put_timeout: The number of seconds put() blocks on a full queue before dropping the result.
+        :param max_retries: The number of times a failed batch is retried before it is dropped.
+        """
+        self.store = store or get_result_store()
+        self.max_queue_size = max_queue_size or int(os.environ.get("RESULT_SINK_QUEUE_SIZE", 10000))
+        self.batch_size = batch_size or int(os.environ.get("RESULT_SINK_BATCH_SIZE", 100))
+        self.flush_interval = flush_interval or float(os.environ.get("RESULT_SINK_FLUSH_INTERVAL", 0.05))
+        self.put_timeout = put_timeout if put_timeout is not None else float(os.environ.get("RESULT_SINK_PUT_TIMEOUT", 1))
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get("RESULT_SINK_MAX_RETRIES", 3))
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._worker = None
+        self._closed = False
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "retries": 0,
+            "batches": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+        }
+
+    def put(self, key: str, field: str, result: TestStatus, payload_sent: Dict[str, Any],
+            payload_received: Dict[str, Any], context: str) -> bool:
+        """
+        Queue a test result to be written to Redis by the background worker.
+
+        :param key: The key identifying the test suite.
+        :param field: The field where the result should be stored.
+        :param result: The test result to store.
+        :param payload_sent: The payload sent during the test.
+        :param payload_received: The payload received during the test.
+        :param context: Additional context or reason for the test result.
+        :return: True if the result was queued, False if it was dropped because the queue stayed full.
+        :raises RuntimeError: If the sink has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot add results to a closed ResultSink")
+
+        self._ensure_worker()
+        try:
+            self._queue.put((key, (field, result, payload_sent, payload_received, context)),
+                            timeout=self.put_timeout)
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(f"Result sink queue is full, dropped result {field} for {key}")
+            return False
+
+        self._count("enqueued")
+        return True
+
+    def flush(self):
+        """
+        Block until every result queued so far has been written or dropped.
+        """
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        """
+        Flush the queued results and stop accepting new ones. Called on interpreter exit for the shared sink.
+        """
+        self.flush()
+        self._closed = True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the state of the sink.
+
+        :return: The current queue depth and limits, together with the enqueued, written, dropped and
+            retry counts and batch sizes since the sink was created.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        stats["max_queue_size"] = self.max_queue_size
+        stats["average_batch_size"] = stats["written"] / stats["batches"] if stats["batches"] else 0
+        return stats
+
+    def _ensure_worker(self):
+        """
+        Start the background worker on first use, and again in a child process after a fork,
+        since threads do not survive a fork.
+        """
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+                self._worker = threading.Thread(target=self._run, name="result-sink", daemon=True)
+                self._worker.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Worker loop: collect a batch from the queue and write it, forever.
+        """
+        while True:
+            batch = [self._queue.get()]
+
+            # Fill the batch until it is full or the flush interval has elapsed
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        """
+        Write a batch of results to the store, one write per test suite key.
+        Failed writes are retried with a linear backoff, then dropped.
+
+        :param batch: A list of (key, result tuple) pairs.
+        """
+        by_key = OrderedDict()
+        for key, result in batch:
+            by_key.setdefault(key, []).append(result)
+
+        for key, results in by_key.items():
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.store.store_results(key, results)
+                    self._count("written", len(results))
+                    break
+                except TRANSIENT_ERRORS as e:
+                    if attempt == self.max_retries:
+                        self._count("dropped", len(results))
+                        logger.error(f"Dropped {len(results)} results for {key} after {attempt} retries - {e}")
+                    else:
+                        self._count("retries")
+                        time.sleep(0.1 * (attempt + 1))
+                except Exception as e:
+                    # Anything else, such as a payload that cannot be serialized, will not succeed on retry
+                    self._count("dropped", len(results))
+                    logger.error(f"Dropped {len(results)} results for {key} - {e}")
+                    break
+
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["last_batch_size"] = len(batch)
+            self._counters["max_batch_size"] = max(self._counters["max_batch_size"], len(batch))
+
+    def _count(self, counter: str, amount: int = 1):
+        """
+        Increment one of the sink counters.
+
+        :param counter: The name of the counter.
+        :param amount: The amount to add.
+        """
+        with self._lock:
+            self._counters[counter] += amount
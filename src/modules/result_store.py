@@ -0,0 +1,474 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple, Union
+import redis
+from modules.constants import TestStatus
+from modules.json_utility import JsonUtility
+
+# Counter fields kept on every test suite and on the per-API rollups
+COUNTER_FIELDS = ("total_tests", "total_pass", "total_fail")
+
+# Fields of a test suite that summarise it, read together by get_summary
+SUMMARY_FIELDS = COUNTER_FIELDS + ("started_at", "updated_at")
+
+# Errors raised by a backend that may succeed when the write is retried
+TRANSIENT_ERRORS = (redis.exceptions.RedisError, sqlite3.OperationalError)
+
+# Fields of a result record that may be moved out of the record by PayloadSet
+PAYLOAD_FIELDS = ("payload_sent", "payload_received")
+
+# Suffix of the record field holding the digest of a payload that was moved out of the record
+DIGEST_SUFFIX = "_digest"
+
+# A test result as accepted by store_results: (field, result, payload_sent, payload_received, context)
+ResultRecord = Tuple[str, TestStatus, Dict[str, Any], Dict[str, Any], str]
+
+# Process-wide store shared by Results, the result sink and the admin API, created on first use
+_result_store: Optional['ResultStore'] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> 'ResultStore':
+    """
+    Get the process-wide result store, creating it on first use.
+
+    The backend is selected with the RESULT_STORE environment variable:
+    - "redis" (default): RedisClient, results expire after 2 hours.
+    - "memory": MemoryResultStore, in-process with no network cost, for unit tests and single-node runs.
+    - "sqlite": SQLiteResultStore, durable local history in the file named by RESULT_STORE_SQLITE_PATH.
+
+    :return: The shared result store.
+    :raises ValueError: If RESULT_STORE names an unknown backend.
+    """
+    global _result_store
+
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = create_result_store(os.environ.get("RESULT_STORE", "redis"))
+    return _result_store
+
+
+def create_result_store(backend: str) -> 'ResultStore':
+    """
+    Create a result store. Backends are imported on demand, so unused ones cost nothing.
+
+    :param backend: "redis", "memory" or "sqlite".
+    :return: A new result store.
+    :raises ValueError: If the backend is unknown.
+    """
+    if backend == "redis":
+        from modules.redis_client import RedisClient
+        return RedisClient()
+    if backend == "memory":
+        from modules.memory_result_store import MemoryResultStore
+        return MemoryResultStore()
+    if backend == "sqlite":
+        from modules.sqlite_result_store import SQLiteResultStore
+        return SQLiteResultStore(os.environ.get("RESULT_STORE_SQLITE_PATH", "confirmatron_results.sqlite3"))
+    raise ValueError(f"Unknown result store {backend}, expected redis, memory or sqlite")
+
+
+class PayloadSet:
+    """
+    Payloads moved out of result records by ResultStore.serialize_results, so a backend can store each
+    distinct payload once per test suite, keyed by the digest of its content.
+
+    Payloads smaller than min_bytes stay inline, since a reference would not save anything.
+    """
+
+    def __init__(self, min_bytes: Optional[int] = None):
+        """
+        Initialize an empty PayloadSet.
+
+        :param min_bytes: The encoded size from which a payload is moved out of its record.
+            Defaults to RESULT_PAYLOAD_DEDUP_MIN_BYTES or 256.
+        """
+        if min_bytes is None:
+            min_bytes = int(os.environ.get("RESULT_PAYLOAD_DEDUP_MIN_BYTES", 256))
+        self.min_bytes = min_bytes
+        # Encoded payload per digest
+        self.payloads: Dict[str, Union[str, bytes]] = {}
+        # Digest referenced by each payload field of the records, by "{field}:{name}", None when the
+        # payload stayed inline. Written per record, so rewriting a record never counts a reference twice.
+        self.references: Dict[str, Optional[str]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.payloads)
+
+    def add(self, field: str, name: str, payload: Any) -> Optional[str]:
+        """
+        Add the payload of a record.
+
+        :param field: The field of the record in the test suite.
+        :param name: The name of the payload in the record, one of PAYLOAD_FIELDS.
+        :param payload: The payload.
+        :return: The digest the payload is stored under, or None if it is too small and stays inline.
+        """
+        encoded = JsonUtility.encode(payload)
+        digest = self.digest(encoded) if len(encoded) >= self.min_bytes else None
+        if digest is not None:
+            self.payloads.setdefault(digest, encoded)
+        self.references[f"{field}:{name}"] = digest
+        return digest
+
+    @staticmethod
+    def digest(encoded: Union[str, bytes]) -> str:
+        """
+        Get the digest of an encoded payload.
+
+        :param encoded: The payload as encoded by JsonUtility.encode.
+        :return: The hex digest.
+        """
+        if isinstance(encoded, str):
+            encoded = encoded.encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class ResultStore(ABC):
+    """
+    Interface of the backends that store test suites and their results.
+
+    A test suite is a hash of field to string value, keyed `{api_name}:{uuid}`. It holds one serialized
+    record per result next to the total_tests/total_pass/total_fail counters and the started_at/updated_at
+    timestamps, so every backend returns the same fields from retrieve_results. Counters of each suite and
+    of its API are updated in the same atomic write as the results.
+
+    Records are JSON strings, or bytes when a binary RESULT_ENCODING is used; JsonUtility.deserialize
+    reads both. Every other field is a string. A backend that stores payloads apart from the records
+    (see PayloadSet) resolves them before returning the records, so readers never see the references.
+    """
+
+    @abstractmethod
+    def create_key(self, api_name: str) -> str:
+        """
+        Create a unique key for a new test suite and index it under its API.
+
+        :param api_name: The name of the API for which the key is being created.
+        :return: The unique key created for the test suite.
+        """
+
+    @abstractmethod
+    def initialize_test_suite(self, key: str):
+        """
+        Initialize the test suite by setting its counters to 0 and recording when it started.
+
+        :param key: The key of the test suite.
+        """
+
+    @abstractmethod
+    def retrieve_results(self, key: str, raw: bool = False) -> Dict[str, str]:
+        """
+        Retrieve all fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param raw: Return values as the backend reads them, which may be UTF-8 bytes instead of strings, for
+            callers that pass every value to JsonUtility.deserialize anyway.
+        :return: A dictionary of field to value, empty if the test suite does not exist.
+        """
+
+    @abstractmethod
+    def scan_results(self, key: str, cursor: int = 0, count: int = 100,
+                     raw: bool = False) -> Tuple[int, Dict[str, str]]:
+        """
+        Retrieve one page of the fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param cursor: The cursor returned by the previous page, or 0 to start.
+        :param count: How many fields to return. A backend may treat this as a hint.
+        :param raw: Return values as the backend reads them, see retrieve_results.
+        :return: The cursor of the next page, 0 when there are no more, and a dictionary of field to value.
+        """
+
+    def iter_results(self, key: str, count: int = 1000, raw: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over the fields of a test suite, `count` at a time, so a large suite is never held in memory.
+
+        :param key: The key of the test suite.
+        :param count: How many fields to fetch at a time.
+        :param raw: Return values as the backend reads them, see retrieve_results.
+        :return: The (field, value) pairs of the test suite.
+        """
+        cursor = 0
+        while True:
+            cursor, fields = self.scan_results(key, cursor=cursor, count=count, raw=raw)
+            yield from fields.items()
+            if not cursor:
+                return
+
+    @abstractmethod
+    def get_summary(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the counters and timestamps of a test suite without fetching its results.
+
+        :param key: The key of the test suite.
+        :return: See parse_summary, or None if the test suite does not exist.
+        """
+
+    @abstractmethod
+    def get_totals(self, key: str) -> Dict[str, Dict[str, int]]:
+        """
+        Read the counters of a test suite and the rollup counters of its API together.
+
+        :param key: The key of the test suite.
+        :return: {"suite": {...}, "api": {...}}, each with total_tests, total_pass and total_fail.
+        """
+
+    def get_payload_stats(self, key: str) -> Optional[Dict[str, int]]:
+        """
+        Report how much storage deduplicating payloads saves a test suite.
+
+        :param key: The key of the test suite.
+        :return: See payload_stats, or None if the backend stores payloads inline.
+        """
+        return None
+
+    def store_result(self, key: str, field: str, result: TestStatus, payload_sent: Dict[str, Any],
+                     payload_received: Dict[str, Any], context: str, count: bool = True,
+                     counted_as: Optional[TestStatus] = None):
+        """
+        Store a test result.
+
+        :param key: The key of the test suite.
+        :param field: The field the result is stored under.
+        :param result: The test result status (PASS or FAIL).
+        :param payload_sent: The payload sent during the test.
+        :param payload_received: The payload received during the test.
+        :param context: Additional context or reason for the test result.
+        :param count: Whether to add the result to the counters. Defaults to True.
+        :param counted_as: The status the result was already counted under, if any. With count, its count
+            is moved to the new status without adding to total_tests.
+        """
+        self.store_results(key, [(field, result, payload_sent, payload_received, context)], count=count,
+                           recounted=Counter([counted_as]) if counted_as is not None else None)
+
+    @abstractmethod
+    def store_results(self, key: str, results: Iterable[ResultRecord], count: bool = True,
+                      recounted: Optional[Counter] = None):
+        """
+        Store many test results and update the suite and API counters in one atomic write.
+
+        :param key: The key of the test suite.
+        :param results: Tuples of (field, result, payload_sent, payload_received, context).
+        :param count: Whether to add the results to the counters. Defaults to True.
+        :param recounted: How many of the results were already counted, per status they were counted under.
+            Those counts are taken back in the same write, so the results are not counted twice.
+        """
+
+    def get_redis_keys(self, api_name: str, start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+        """
+        Retrieve all test suite keys of an API.
+
+        :param api_name: The name of the API for which to retrieve the keys.
+        :param start: Only return keys created at or after this epoch timestamp.
+        :param end: Only return keys created at or before this epoch timestamp.
+        :return: The keys, oldest first.
+        """
+        keys = []
+        cursor = 0
+        while True:
+            page, cursor = self.page_redis_keys(api_name, cursor=cursor, limit=1000, start=start, end=end)
+            keys.extend(page)
+            if not cursor:
+                return keys
+
+    @abstractmethod
+    def page_redis_keys(self, api_name: str, cursor: int = 0, limit: int = 100, start: Optional[float] = None,
+                        end: Optional[float] = None) -> Tuple[List[str], int]:
+        """
+        Page through the test suite keys of an API, oldest first.
+
+        :param api_name: The name of the API for which to retrieve the keys.
+        :param cursor: The cursor returned by the previous call, 0 to start from the oldest key.
+        :param limit: The maximum number of keys to return.
+        :param start: Only return keys created at or after this epoch timestamp.
+        :param end: Only return keys created at or before this epoch timestamp.
+        :return: The page of keys and the cursor for the next page, which is 0 once exhausted.
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """
+        Check if a test suite exists.
+
+        :param key: The key of the test suite.
+        :return: True if the test suite exists, False otherwise.
+        """
+
+    @staticmethod
+    def new_key(api_name: str) -> str:
+        """
+        Generate a unique test suite key.
+
+        :param api_name: The name of the API.
+        :return: The key, `{api_name}:{uuid}`.
+        """
+        return f"{api_name}:{uuid.uuid4()}"
+
+    @staticmethod
+    def api_name_of(key: str) -> str:
+        """
+        Get the name of the API a test suite belongs to.
+
+        :param key: The key of the test suite, `{api_name}:{uuid}`.
+        :return: The name of the API.
+        """
+        return key.split(":", 1)[0]
+
+    @staticmethod
+    def serialize_results(results: Iterable[ResultRecord], payloads: Optional[PayloadSet] = None
+                          ) -> Tuple[Dict[str, Union[str, bytes]], Counter]:
+        """
+        Serialize test results into the records stored in a test suite, in the encoding selected by
+        RESULT_ENCODING (see JsonUtility.encode). Read them back with JsonUtility.deserialize.
+
+        :param results: Tuples of (field, result, payload_sent, payload_received, context).
+        :param payloads: When given, large payloads are added to it and the records hold their digest
+            under payload_sent_digest or payload_received_digest instead. Resolve them with resolve_payloads.
+        :return: A dictionary of field to serialized record, and the number of results per status.
+        """
+        mapping = {}
+        statuses = Counter()
+        for field, result, payload_sent, payload_received, context in results:
+            data_to_store = {
+                "status": result.value,
+                "payload_sent": payload_sent,
+                "payload_received": payload_received,
+                "context": context,
+            }
+            if payloads is not None:
+                data_to_store = dict(ResultStore._reference_payloads(field, data_to_store, payloads))
+            mapping[field] = JsonUtility.encode(data_to_store)
+            statuses[result] += 1
+        return mapping, statuses
+
+    @staticmethod
+    def _reference_payloads(field: str, record: Dict[str, Any], payloads: PayloadSet) -> Iterator[Tuple[str, Any]]:
+        """
+        Replace the large payloads of a record with their digest, keeping the order of the record fields.
+
+        :param field: The field of the record in the test suite.
+        :param record: The record.
+        :param payloads: The set the payloads are added to.
+        :return: The (name, value) pairs of the record.
+        """
+        for name, value in record.items():
+            digest = payloads.add(field, name, value) if name in PAYLOAD_FIELDS else None
+            if digest is None:
+                yield name, value
+            else:
+                yield name + DIGEST_SUFFIX, digest
+
+    @staticmethod
+    def find_payload_references(fields: Dict[str, Union[str, bytes]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Find the records of a test suite that reference payloads stored apart from them.
+
+        :param fields: The fields of the test suite as stored.
+        :return: A dictionary of field to decoded record, for the records holding a digest.
+        """
+        records = {}
+        for field, value in fields.items():
+            # Only decode values that can hold a reference; counters and timestamps never do
+            if not (JsonUtility.is_binary(value) or (isinstance(value, str) and DIGEST_SUFFIX in value)
+                    or (isinstance(value, bytes) and DIGEST_SUFFIX.encode("utf-8") in value)):
+                continue
+            record = JsonUtility.deserialize(value)
+            if isinstance(record, dict) and any(name + DIGEST_SUFFIX in record for name in PAYLOAD_FIELDS):
+                records[field] = record
+        return records
+
+    @staticmethod
+    def resolve_payloads(fields: Dict[str, Union[str, bytes]], records: Dict[str, Dict[str, Any]],
+                         payloads: Dict[str, Optional[Union[str, bytes]]]) -> Dict[str, Union[str, bytes]]:
+        """
+        Put the payloads referenced by records back into them.
+
+        :param fields: The fields of the test suite as stored.
+        :param records: The records referencing payloads, from find_payload_references.
+        :param payloads: The encoded payload per digest, None for payloads that no longer exist.
+        :return: The fields, with the records re-encoded in their original encoding with their payloads inline.
+        """
+        resolved = dict(fields)
+        for field, record in records.items():
+            restored = {}
+            for name, value in record.items():
+                if name.endswith(DIGEST_SUFFIX) and name[:-len(DIGEST_SUFFIX)] in PAYLOAD_FIELDS:
+                    payload = payloads.get(value)
+                    restored[name[:-len(DIGEST_SUFFIX)]] = JsonUtility.deserialize(payload) if payload else None
+                else:
+                    restored[name] = value
+            encoding = "msgpack" if JsonUtility.is_binary(fields[field]) else "json"
+            resolved[field] = JsonUtility.encode(restored, encoding=encoding)
+        return resolved
+
+    @staticmethod
+    def payload_stats(references: Dict[str, int], sizes: Dict[str, int]) -> Dict[str, int]:
+        """
+        Summarise the payloads stored for a test suite.
+
+        :param references: The number of records referencing each digest.
+        :param sizes: The encoded size of each payload per digest.
+        :return: The number of distinct payloads and references, the bytes stored, the bytes the
+            references would take inline, and the bytes saved.
+        """
+        stored = sum(sizes.get(digest, 0) for digest in references)
+        referenced = sum(count * sizes.get(digest, 0) for digest, count in references.items())
+        return {
+            "payloads": len(references),
+            "references": sum(references.values()),
+            "bytes_stored": stored,
+            "bytes_referenced": referenced,
+            "bytes_saved": referenced - stored,
+        }
+
+    @staticmethod
+    def counter_increments(statuses: Counter, recounted: Optional[Counter] = None) -> Dict[str, int]:
+        """
+        Get how much each counter goes up for a number of results per status.
+
+        :param statuses: The number of results per status.
+        :param recounted: How many of the results were already counted, per status they were counted under.
+        :return: A dictionary of counter field to increment, leaving out counters that do not change.
+        """
+        recounted = recounted or Counter()
+        increments = {
+            "total_tests": sum(statuses.values()) - sum(recounted.values()),
+            "total_pass": statuses[TestStatus.PASS] - recounted[TestStatus.PASS],
+            "total_fail": statuses[TestStatus.FAIL] - recounted[TestStatus.FAIL],
+        }
+        return {field: amount for field, amount in increments.items() if amount}
+
+    @staticmethod
+    def parse_counters(values: Iterable[Any]) -> Dict[str, int]:
+        """
+        Parse counter values read in the order of COUNTER_FIELDS.
+
+        :param values: The raw values, None for counters that were never set.
+        :return: A dictionary of counter field to int.
+        """
+        return {field: int(value or 0) for field, value in zip(COUNTER_FIELDS, values)}
+
+    @staticmethod
+    def parse_summary(values: List[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Parse summary values read in the order of SUMMARY_FIELDS.
+
+        :param values: The raw values, None for fields that are not set.
+        :return: total_tests, total_pass and total_fail as ints, started_at and updated_at as epoch
+            timestamps (None when not recorded yet), or None if no field is set.
+        """
+        if all(value is None for value in values):
+            return None
+
+        summary = dict(zip(SUMMARY_FIELDS, values))
+        for field in COUNTER_FIELDS:
+            summary[field] = int(summary[field] or 0)
+        for field in ("started_at", "updated_at"):
+            summary[field] = float(summary[field]) if summary[field] is not None else None
+        return summary
@@ -1,22 +1,32 @@
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional
 from modules.constants import TestStatus
-from modules.redis_client import RedisClient
+from modules.result_store import ResultStore, get_result_store
+from modules.result_sink import ResultSink
 
 
 class Results:
     """
     The TestResult class provides methods for storing and managing test results in a Redis database.
     """
-    def __init__(self):
+    def __init__(self, sink: Optional[ResultSink] = None, store: Optional[ResultStore] = None):
         """
         Initialize a new instance of the TestResult class.
+
+        Args:
+            sink (ResultSink, optional): When given, add_result queues results on the sink to be written
+                in the background instead of writing them to Redis before returning.
+            store (ResultStore, optional): The backend results are stored in. Defaults to the process-wide
+                store selected by the RESULT_STORE environment variable.
         """
-        self.redis_client = RedisClient()
+        self.store = store or get_result_store()
+        self.sink = sink
 
     def add_result(self, key: str, field: str, result: TestStatus,
                    payload_sent: Dict[str, Any], payload_received: Dict[str, Any], context: str):
         """
         Add a test result to the Redis database and update the counters.
+        With a sink the result is queued and written asynchronously.
 
         Args:
             key (str): The key identifying the test.
@@ -26,34 +36,87 @@ class Results:
             payload_received (dict): The payload received during the test.
             context (str): Additional context or reason for the test result.
         """
-        self.redis_client.store_result(key, field, result, payload_sent, payload_received, context)
+        if self.sink is not None:
+            self.sink.put(key, field, result, payload_sent, payload_received, context)
+        else:
+            self.store.store_result(key, field, result, payload_sent, payload_received, context)
+
+    def flush(self):
+        """
+        Block until every result queued on the sink has been written. Does nothing without a sink.
+        """
+        if self.sink is not None:
+            self.sink.flush()
+
+    def get_totals(self, test_key: str) -> Dict[str, Dict[str, int]]:
+        """
+        Get the counters of a test suite and of its API in a single round trip.
+
+        Args:
+            test_key (str): The key identifying the test.
+
+        Returns:
+            dict: {"suite": {...}, "api": {...}}, each with total_tests, total_pass and total_fail.
+        """
+        return self.store.get_totals(test_key)
 
-    def get_total_tests(self) -> int:
+    def get_total_tests(self, test_key: str) -> int:
         """
         Get the total number of tests performed.
 
+        Args:
+            test_key (str): The key identifying the test.
+
         Returns:
             int: The total number of tests.
         """
-        return self.redis_client.get_total("total_tests")
+        return self.get_totals(test_key)["suite"]["total_tests"]
 
-    def get_total_pass(self) -> int:
+    def get_total_pass(self, test_key: str) -> int:
         """
         Get the total number of passed tests.
 
+        Args:
+            test_key (str): The key identifying the test.
+
         Returns:
             int: The total number of passed tests.
         """
-        return self.redis_client.get_total("total_pass")
+        return self.get_totals(test_key)["suite"]["total_pass"]
 
-    def get_total_fail(self) -> int:
+    def get_total_fail(self, test_key: str) -> int:
         """
         Get the total number of failed tests.
 
+        Args:
+            test_key (str): The key identifying the test.
+
         Returns:
             int: The total number of failed tests.
         """
-        return self.redis_client.get_total("total_fail")
+        return self.get_totals(test_key)["suite"]["total_fail"]
+
+    def get_summary(self, test_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the pass/fail tally of a test suite in one round trip, without fetching its results.
+
+        Args:
+            test_key (str): The key identifying the test.
+
+        Returns:
+            dict or None: The counters, failure_rate (0 when no tests ran), started_at, updated_at and
+                duration_seconds from the start to the last result, or None if the test suite does not exist.
+        """
+        summary = self.store.get_summary(test_key)
+        if summary is None:
+            return None
+
+        summary["test_key"] = test_key
+        summary["failure_rate"] = summary["total_fail"] / summary["total_tests"] if summary["total_tests"] else 0
+        summary["duration_seconds"] = (summary["updated_at"] - summary["started_at"]
+                                       if summary["started_at"] is not None and summary["updated_at"] is not None
+                                       else None)
+        return summary
 
     def get_result(self, test_key: str, field: str) -> TestStatus:
         """
@@ -66,7 +129,7 @@ class Results:
         Returns:
             TestStatus: The requested test result.
         """
-        result = self.redis_client.retrieve_results(test_key).get(field, None)
+        result = self.store.retrieve_results(test_key).get(field, None)
         return TestStatus(result) if result else None
 
     def get_results_by_key(self, test_key: str):
@@ -79,7 +142,7 @@ class Results:
         Returns:
             dict: The test results, where each key is a field name and each value is a result.
         """
-        return self.redis_client.retrieve_results(test_key)
+        return self.store.retrieve_results(test_key)
 
     def get_all_keys(self, api_name: str):
         """
@@ -91,7 +154,7 @@ class Results:
         Returns:
             list: A list of keys related to the API.
         """
-        return self.redis_client.get_redis_keys(api_name)
+        return self.store.get_redis_keys(api_name)
 
 
 class TestResult:
@@ -99,31 +162,99 @@ class TestResult:
     A class representing the result of a test.
 
     Attributes:
-        redis_client (RedisClient): The RedisClient instance to interact with Redis.
+        store (ResultStore): The backend the test result is stored in.
         test_key (str): The unique key associated with the test result in Redis.
         _status (TestStatus): The status of the test (PASS or FAIL).
         _payload_sent (Dict[str, Any]): The payload sent during the test, if applicable.
         _payload_received (Dict[str, Any]): The payload received during the test, if applicable.
         _context (str): Additional context or information about the test result.
+        field (str): The field the result is stored under when buffered.
+        buffered (bool): Whether setters only record changes in memory until flush() is called.
+        _counted_status (TestStatus): The status the buffered result was counted under by a previous flush.
+
+    Buffered mode is enabled by passing buffered=True or by using the TestResult as a context manager,
+    which flushes on a clean exit. A flush writes one serialized record. The result is counted by the
+    first flush only; a later flush that changes the status moves the count to the new status.
 
     Methods:
-        _update_counters(): Update the counters for total_tests, total_pass, and total_fail in Redis.
+        flush(): Write the buffered result to Redis.
+
+    The suite and API counters are updated by the write that stores the status; writes made by the
+    other setters are not counted again.
     """
 
-    def __init__(self, test_key: str):
+    def __init__(self, test_key: str, field: Optional[str] = None, buffered: bool = False,
+                 store: Optional[ResultStore] = None):
         """
         Initialize a TestResult object.
 
         Args:
             test_key (str): The unique key associated with the test result in Redis.
+            field (str, optional): The field to store the buffered result under. Defaults to a unique test name.
+            buffered (bool): Whether to buffer changes until flush() is called. Defaults to False.
+            store (ResultStore, optional): The backend to store the result in. Defaults to the process-wide store.
         """
-        self.redis_client = RedisClient()
+        self.store = store or get_result_store()
         self.test_key = test_key
+        self.field = field or f"test-{uuid.uuid4().hex}"
+        self.buffered = buffered
+        self._dirty = False
+        self._counted_status = None
         self._status = None
         self._payload_sent = {}
         self._payload_received = {}
         self._context = ""
 
+    def __enter__(self) -> 'TestResult':
+        """
+        Enter buffered mode. Field changes are kept in memory until the context exits.
+
+        Returns:
+            TestResult: This test result.
+        """
+        self.buffered = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Flush the buffered result, unless the context exited with an exception.
+
+        Args:
+            exc_type: The type of exception that caused the context to be exited, if any.
+            exc_val: The instance of the exception that caused the context to be exited, if any.
+            exc_tb: The traceback of the exception that caused the context to be exited, if any.
+        """
+        if exc_type is None:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered result to Redis as a single record. The first flush counts the result; later
+        flushes leave the counters alone unless the status changed, in which case the count is moved from
+        the old status to the new one. Does nothing if no field changed since the last flush.
+
+        Raises:
+            ValueError: If the status has not been set.
+        """
+        if not self._dirty:
+            return
+
+        if self._status is None:
+            raise ValueError(f"Cannot flush test result {self.field} for {self.test_key} without a status")
+
+        self.store.store_result(
+            self.test_key,
+            self.field,
+            self._status,
+            self._payload_sent,
+            self._payload_received,
+            self._context,
+            count=self._status != self._counted_status,
+            counted_as=self._counted_status,
+        )
+        self._counted_status = self._status
+        self._dirty = False
+
     @property
     def status(self) -> TestStatus:
         """
@@ -137,13 +268,18 @@ class TestResult:
     @status.setter
     def status(self, value: TestStatus):
         """
-        Set the status of the test and update it in Redis.
+        Set the status of the test and update it in Redis,
+        or keep it in memory until flush() when buffered.
 
         Args:
             value (TestStatus): The status of the test (PASS or FAIL).
         """
         self._status = value
-        self.redis_client.store_result(
+        if self.buffered:
+            self._dirty = True
+            return
+
+        self.store.store_result(
             self.test_key,
             "status",
             value,
@@ -152,9 +288,6 @@ class TestResult:
             self._context,
         )
 
-        # Update the counters for total_tests, total_pass, and total_fail
-        self._update_counters()
-
     @property
     def payload_sent(self) -> Dict[str, Any]:
         """
@@ -168,19 +301,25 @@ class TestResult:
     @payload_sent.setter
     def payload_sent(self, value: Dict[str, Any]):
         """
-        Set the payload sent during the test and update it in Redis.
+        Set the payload sent during the test and update it in Redis,
+        or keep it in memory until flush() when buffered.
 
         Args:
             value (dict): The payload sent during the test.
         """
         self._payload_sent = value
-        self.redis_client.store_result(
+        if self.buffered:
+            self._dirty = True
+            return
+
+        self.store.store_result(
             self.test_key,
             "payload_sent",
             self._status,
             value,
             self._payload_received,
             self._context,
+            count=False,
         )
 
     @property
@@ -196,19 +335,25 @@ class TestResult:
     @payload_received.setter
     def payload_received(self, value: Dict[str, Any]):
         """
-        Set the payload received during the test and update it in Redis.
+        Set the payload received during the test and update it in Redis,
+        or keep it in memory until flush() when buffered.
 
         Args:
             value (dict): The payload received during the test.
         """
         self._payload_received = value
-        self.redis_client.store_result(
+        if self.buffered:
+            self._dirty = True
+            return
+
+        self.store.store_result(
             self.test_key,
             "payload_received",
             self._status,
             self._payload_sent,
             value,
             self._context,
+            count=False,
         )
 
     @property
@@ -224,31 +369,23 @@ class TestResult:
     @context.setter
     def context(self, value: str):
         """
-        Set the additional context or reason for the test result and update it in Redis.
+        Set the additional context or reason for the test result and update it in Redis,
+        or keep it in memory until flush() when buffered.
 
         Args:
             value (str): The additional context or reason for the test result.
         """
         self._context = value
-        self.redis_client.store_result(
+        if self.buffered:
+            self._dirty = True
+            return
+
+        self.store.store_result(
             self.test_key,
             "context",
             self._status,
             self._payload_sent,
             self._payload_received,
             value,
+            count=False,
         )
-
-    def _update_counters(self):
-        """
-        Update the counters for total_tests, total_pass, and total_fail in Redis based on the test status.
-        """
-        total_tests_key = "total_tests"
-        total_pass_key = "total_pass"
-        total_fail_key = "total_fail"
-
-        self.redis_client.incr(total_tests_key)
-        if self._status == TestStatus.PASS:
-            self.redis_client.incr(total_pass_key)
-        elif self._status == TestStatus.FAIL:
-            self.redis_client.incr(total_fail_key)
@@ -1,13 +1,16 @@
 from flask import current_app
 import boto3
-from cachetools import TTLCache, cached
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from functools import cached_property
-from typing import Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 import os
-from config.config import Config, Api
+from config.config import Config, Api, ConfigEntry, ENV, SSM
 
-# Global cache that stores up to 1000 items, and items expire after 1800 seconds (30 minutes)
-cache = TTLCache(maxsize=1000, ttl=1800)
+# GetParameters accepts at most 10 names per call
+SSM_GET_PARAMETERS_BATCH_SIZE = 10
 
 
 class SingletonMeta(type):
@@ -35,6 +38,167 @@ class SingletonMeta(type):
         return cls._instances[cls]
 
 
+class _CacheEntry:
+    def __init__(self, value: Any, missing: bool = False):
+        """
+        A cached secret, or the fact that it does not exist.
+
+        :param value: The secret value.
+        :param missing: True if the secret does not exist.
+        """
+        self.value = value
+        self.missing = missing
+        self.fetched_at = time.time()
+
+
+class SecretCache:
+    """
+    LRU cache of resolved secrets keyed on their config path, with stale-while-revalidate.
+
+    A fresh entry (younger than ttl) is served as is. A stale entry (up to max_stale seconds past ttl)
+    is still served, while the caller schedules a refresh in the background. Older entries are misses.
+    Keys that do not exist are cached as missing for negative_ttl seconds, so repeated lookups of a
+    bad key do not go back to the config or AWS.
+    """
+
+    FRESH = "fresh"
+    STALE = "stale"
+    MISSING = "missing"
+    MISS = "miss"
+
+    def __init__(self,
+                 maxsize: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 max_stale: Optional[float] = None,
+                 negative_ttl: Optional[float] = None):
+        """
+        Initialize the SecretCache. Settings that are not passed are pulled from environment variables.
+
+        :param maxsize: The maximum number of entries. Defaults to SECRETS_CACHE_MAXSIZE or 1000.
+        :param ttl: Seconds an entry is fresh. Defaults to SECRETS_CACHE_TTL or 1800 (30 minutes).
+        :param max_stale: Seconds past ttl a stale entry is still served. Defaults to SECRETS_CACHE_MAX_STALE or 3600.
+        :param negative_ttl: Seconds a missing key is remembered. Defaults to SECRETS_CACHE_NEGATIVE_TTL or 60.
+        """
+        self.maxsize = maxsize or int(os.environ.get("SECRETS_CACHE_MAXSIZE", 1000))
+        self.ttl = ttl or float(os.environ.get("SECRETS_CACHE_TTL", 1800))
+        self.max_stale = max_stale if max_stale is not None else float(os.environ.get("SECRETS_CACHE_MAX_STALE", 3600))
+        self.negative_ttl = negative_ttl or float(os.environ.get("SECRETS_CACHE_NEGATIVE_TTL", 60))
+
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0,
+                         "refreshes": 0, "refresh_failures": 0}
+
+    def lookup(self, key: str) -> Tuple[str, Any]:
+        """
+        Look up a key and classify the entry.
+
+        :param key: The config path of the secret.
+        :return: One of FRESH, STALE, MISSING or MISS, and the cached value for FRESH and STALE.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.time() - entry.fetched_at if entry else None
+
+            if entry is None:
+                state = self.MISS
+            elif entry.missing:
+                state = self.MISSING if age < self.negative_ttl else self.MISS
+            elif age < self.ttl:
+                state = self.FRESH
+            elif age < self.ttl + self.max_stale:
+                state = self.STALE
+            else:
+                state = self.MISS
+
+            self._metrics[{self.FRESH: "hits", self.STALE: "stale_hits",
+                           self.MISSING: "negative_hits", self.MISS: "misses"}[state]] += 1
+            if state != self.MISS:
+                self._entries.move_to_end(key)
+            return state, entry.value if state in (self.FRESH, self.STALE) else None
+
+    def put(self, key: str, value: Any, missing: bool = False):
+        """
+        Cache a secret, or the fact that it does not exist, evicting the least recently used entry when full.
+
+        :param key: The config path of the secret.
+        :param value: The secret value.
+        :param missing: True if the secret does not exist.
+        """
+        with self._lock:
+            self._entries[key] = _CacheEntry(value, missing)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def refresh_in_background(self, keys: List[str], loader: Callable[[List[str]], None]):
+        """
+        Start refreshing stale keys on a background thread, skipping keys that are already being refreshed.
+
+        :param keys: The config paths to refresh.
+        :param loader: Resolves the keys and puts the new values in this cache.
+        """
+        with self._lock:
+            keys = [key for key in keys if key not in self._refreshing]
+            self._refreshing.update(keys)
+        if not keys:
+            return
+
+        def refresh():
+            try:
+                loader(keys)
+                self._count("refreshes")
+            except Exception:
+                # The stale values stay in use until they are too old; the next lookup retries the refresh
+                self._count("refresh_failures")
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(keys)
+
+        threading.Thread(target=refresh, name="secret-cache-refresh", daemon=True).start()
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache counters, hit rate and the age of every entry.
+
+        :return: The cache statistics. Entries are reported by config path only, never by value.
+        """
+        now = time.time()
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._metrics)
+            entries = {key: {"age_seconds": round(now - entry.fetched_at, 1), "missing": entry.missing}
+                       for key, entry in self._entries.items()}
+
+        lookups = stats["hits"] + stats["stale_hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0
+        stats["size"] = len(entries)
+        stats["maxsize"] = self.maxsize
+        stats["ttl"] = self.ttl
+        stats["entries"] = entries
+        return stats
+
+    def _count(self, metric: str):
+        """
+        Increment one of the cache counters.
+
+        :param metric: The name of the counter.
+        """
+        with self._lock:
+            self._metrics[metric] += 1
+
+
+# Global cache of resolved secrets, keyed on their config path
+secret_cache = SecretCache()
+
+
 class SecretsManager(metaclass=SingletonMeta):
     """
     This class handles fetching and caching secrets from AWS Parameter Store.
@@ -45,6 +209,9 @@ class SecretsManager(metaclass=SingletonMeta):
         Initialize the SecretsManager.
         """
         self._ssm = None
+        self._lock = threading.Lock()
+        # Parameter fetches in progress, so concurrent misses for the same name share one fetch
+        self._in_flight: Dict[str, Future] = {}
 
     @cached_property
     def ssm(self):
@@ -53,43 +220,194 @@ class SecretsManager(metaclass=SingletonMeta):
         """
         return boto3.client('ssm')
 
-    @cached(cache=cache)
     def get_secret(self, key: str, api_name: str = None) -> Any:
         """
-        Get a secret by its key. The secret is fetched from AWS Parameter Store
-        the first time this method is called with a certain key, and then it's
-        cached in memory for subsequent calls. The cache expires after 30 minutes.
-        If the key is not in cache, it will try to get the value from the config.
-        If the value in the config is a placeholder, it fetches the secret from AWS
-        or .env file depending on the RUN_ENV environment variable.
+        Get a secret by its key. The value is read from the config; if it is a placeholder, the secret
+        is fetched from AWS or the .env file depending on the ENVIRONMENT environment variable.
+        Values are cached by config path, see get_secrets.
 
         :param key: The key of the secret, corresponding to an attribute in the Config class.
+        :param api_name: Optional name of the API the key belongs to.
         :return: The secret value.
         :raises ValueError: If the key does not match any attribute in the Config class.
         """
+        return self.get_secrets([key], api_name)[key]
+
+    def get_secrets(self, keys: Iterable[str], api_name: str = None) -> Dict[str, Any]:
+        """
+        Get several secrets at once. Placeholders that live in AWS Parameter Store are fetched together,
+        up to 10 per GetParameters call, instead of one round trip per secret.
+
+        Resolved values are cached by config path. Stale values are served while they are refreshed in
+        the background, and keys that do not exist are remembered for a short time.
+
+        :param keys: The keys of the secrets, corresponding to attributes in the Config class.
+        :param api_name: Optional name of the API the keys belong to.
+        :return: A dictionary of key to secret value.
+        :raises ValueError: If a key does not match any attribute in the Config class.
+        """
         config: Config = current_app.config['config']
+        paths = {key: f"{api_name}.{key}" if api_name else key for key in keys}
+
+        cached = {}
+        stale, misses = [], []
+        for path in paths.values():
+            state, value = secret_cache.lookup(path)
+            if state == SecretCache.MISSING:
+                raise ValueError(f"No such key: {path}")
+            if state == SecretCache.MISS:
+                misses.append(path)
+                continue
+            if state == SecretCache.STALE:
+                stale.append(path)
+            cached[path] = value
+
+        if stale:
+            secret_cache.refresh_in_background(stale, lambda refresh_paths: self._load(config, refresh_paths))
+
+        loaded = self._load(config, misses) if misses else {}
+
+        # Built in the order of the requested keys, whichever of them were cached
+        values = {}
+        for key, path in paths.items():
+            if path in cached:
+                values[key] = cached[path]
+            elif path in loaded:
+                values[key] = loaded[path]
+            else:
+                raise ValueError(f"No such key: {path}")
+        return values
+
+    def get_parameters(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Get values from AWS Parameter Store, fetching them in batches.
+        If another thread is already fetching a name, this waits for that fetch instead of starting another.
 
-        try:
-            if api_name:
-                key = f"{api_name}.{key}"
+        :param names: The names of the parameters.
+        :return: A dictionary of parameter name to value.
+        :raises ValueError: If a parameter does not exist.
+        """
+        # The names are read twice, so a generator must not be exhausted by the first pass
+        names = list(names)
+        values = self._get_parameters(names)
+        for name in names:
+            if name not in values:
+                raise ValueError(f"No such parameter: {name}")
+        return values
+
+    def get_parameters_by_path(self, path: str) -> Dict[str, str]:
+        """
+        Get every value under a path in AWS Parameter Store with GetParametersByPath.
 
-            # Try to get the nested attribute from the config
-            val = self._get_nested_attr(config, key)
+        :param path: The path of the parameters, e.g. '/confirmatron/'.
+        :return: A dictionary of parameter name to value.
+        """
+        values = {}
+        for page in self.ssm.get_paginator('get_parameters_by_path').paginate(Path=path, Recursive=True,
+                                                                                 WithDecryption=True):
+            for parameter in page['Parameters']:
+                values[parameter['Name']] = parameter['Value']
+        return values
+
+    def prefetch(self, config: Config):
+        """
+        Resolve every placeholder in the config tree ahead of use and cache it, fetching the secrets that
+        live in AWS Parameter Store in batches.
 
-            # If the value is a placeholder, check the environment
-            if isinstance(val, str) and val.startswith('{') and val.endswith('}'):
-                run_env = os.getenv('ENVIRONMENT')
-                if run_env == 'LOCAL':
-                    val = os.getenv(val[1:-1])
-                else:
-                    # fetch the secret from AWS
-                    param = self.ssm.get_parameter(Name=val[1:-1], WithDecryption=True)
-                    val = param['Parameter']['Value']
+        :param config: The config whose placeholders should be resolved.
+        """
+        paths = [path for path, entry in config.path_index().items() if entry.kind in (ENV, SSM)]
+        if paths:
+            self._load(config, paths)
 
-            return val
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Report the secret cache statistics.
 
-        except AttributeError:
-            raise ValueError(f"No such key: {key}")
+        :return: The hit rate, counters and the age of each cached entry.
+        """
+        return secret_cache.stats()
+
+    def _load(self, config: Config, paths: List[str]) -> Dict[str, Any]:
+        """
+        Resolve config paths to their values and cache the results, including paths that do not exist.
+
+        :param config: The config to resolve the paths in.
+        :param paths: The config paths.
+        :return: A dictionary of config path to value. Paths that do not exist are left out.
+        """
+        entries: Dict[str, ConfigEntry] = {}
+        for path in paths:
+            try:
+                entries[path] = config.lookup(path)
+            except KeyError:
+                pass
+
+        values = {path: entry.value for path, entry in entries.items() if entry.kind not in (ENV, SSM)}
+        values.update({path: os.getenv(entry.value) for path, entry in entries.items() if entry.kind == ENV})
+
+        # fetch the secrets from AWS
+        ssm_names = {path: entry.value for path, entry in entries.items() if entry.kind == SSM}
+        if ssm_names:
+            parameters = self._get_parameters(ssm_names.values())
+            values.update({path: parameters[name] for path, name in ssm_names.items() if name in parameters})
+
+        for path in paths:
+            secret_cache.put(path, values.get(path), missing=path not in values)
+        return values
+
+    def _get_parameters(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Fetch values from AWS Parameter Store in batches, sharing fetches already in flight for the same names.
+
+        :param names: The names of the parameters.
+        :return: A dictionary of parameter name to value. Names that do not exist are left out.
+        """
+        names = list(dict.fromkeys(names))
+
+        # Claim the names nobody is fetching yet, and remember the fetches to wait for
+        owned: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        with self._lock:
+            for name in names:
+                if name in self._in_flight:
+                    waiting[name] = self._in_flight[name]
+                else:
+                    owned[name] = self._in_flight[name] = Future()
+
+        if owned:
+            try:
+                fetched = self._fetch_parameters(list(owned))
+                for name, future in owned.items():
+                    future.set_result(fetched.get(name))
+            except Exception as e:
+                for future in owned.values():
+                    future.set_exception(e)
+            finally:
+                with self._lock:
+                    for name in owned:
+                        del self._in_flight[name]
+
+        values = {}
+        for name, future in {**owned, **waiting}.items():
+            value = future.result()
+            if value is not None:
+                values[name] = value
+        return values
+
+    def _fetch_parameters(self, names: List[str]) -> Dict[str, str]:
+        """
+        Fetch parameters from AWS Parameter Store, 10 per GetParameters call.
+
+        :param names: The names of the parameters.
+        :return: A dictionary of parameter name to value. Names that do not exist are left out.
+        """
+        values = {}
+        for i in range(0, len(names), SSM_GET_PARAMETERS_BATCH_SIZE):
+            response = self.ssm.get_parameters(Names=names[i:i + SSM_GET_PARAMETERS_BATCH_SIZE], WithDecryption=True)
+            for parameter in response['Parameters']:
+                values[parameter['Name']] = parameter['Value']
+        return values
 
     @staticmethod
     def load_api_config(api_name: str) -> 'Api':
@@ -111,20 +429,7 @@ class SecretsManager(metaclass=SingletonMeta):
         Clears all cached secrets. Useful when the secrets in the AWS Parameter Store
         have been updated and the application needs to access the new values immediately.
         """
-        cache.clear()
-
-    @staticmethod
-    def _get_nested_attr(obj, attr):
-        """
-        A helper function to get a nested attribute from an object.
-
-        :param obj: The object to get the attribute from.
-        :param attr: A string with the path to the attribute, using dot notation.
-        :returns: The value of the nested attribute.
-        """
-        for a in attr.split("."):
-            obj = getattr(obj, a)
-        return obj
+        secret_cache.clear()
 
     @classmethod
     def api_context(cls, api_name: str) -> '_ApiContextManager':
@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from modules.result_store import ResultStore, ResultRecord, COUNTER_FIELDS, SUMMARY_FIELDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suites (
+    key TEXT PRIMARY KEY,
+    api_name TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS suites_by_api ON suites (api_name, created_at);
+CREATE TABLE IF NOT EXISTS fields (
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (key, field)
+) WITHOUT ROWID;
+"""
+
+# Sets a field, or adds to it when it holds a counter
+_INCREMENT = """
+INSERT INTO fields (key, field, value) VALUES (?, ?, ?)
+ON CONFLICT (key, field) DO UPDATE SET value = CAST(value AS INTEGER) + CAST(excluded.value AS INTEGER)
+"""
+
+_UPSERT = """
+INSERT INTO fields (key, field, value) VALUES (?, ?, ?)
+ON CONFLICT (key, field) DO UPDATE SET value = excluded.value
+"""
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    ResultStore backed by a SQLite database in WAL mode, for durable local history.
+
+    Test suites never expire, unlike in Redis. Each thread, and each process after a fork, opens its own
+    connection; WAL lets readers proceed while a write is in progress. Every write is one transaction,
+    so results and counters are updated atomically.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the SQLiteResultStore and create its tables if needed.
+
+        :param path: The path of the database file. It must be a file, since every connection
+            to ":memory:" would open a separate database.
+        """
+        self.path = path
+        self.busy_timeout = float(os.environ.get("RESULT_STORE_SQLITE_BUSY_TIMEOUT", 5))
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def create_key(self, api_name: str) -> str:
+        """
+        Create the key of a new test suite and record it under its API.
+
+        :param api_name: The name of the API under test.
+        :return: The new key, `{api_name}:{uuid}`.
+        """
+        key = self.new_key(api_name)
+        with self._transaction() as connection:
+            connection.execute("INSERT INTO suites (key, api_name, created_at) VALUES (?, ?, ?)",
+                               (key, api_name, time.time()))
+            connection.execute(_UPSERT, (key, "Tests Initialized", ""))
+        return key
+
+    def initialize_test_suite(self, key: str):
+        """
+        Initialize the test suite by setting its counters to 0 and recording when it started.
+
+        :param key: The key of the test suite.
+        """
+        with self._transaction() as connection:
+            connection.executemany(_UPSERT, [(key, field, "0") for field in COUNTER_FIELDS] +
+                                   [(key, "started_at", str(time.time()))])
+
+    def retrieve_results(self, key: str, raw: bool = False) -> Dict[str, str]:
+        """
+        Retrieve all fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param raw: Accepted for the ResultStore interface; values are always strings here.
+        :return: A dictionary of field to value, empty if the test suite does not exist.
+        """
+        return dict(self._connection().execute("SELECT field, value FROM fields WHERE key = ?", (key,)))
+
+    def scan_results(self, key: str, cursor: int = 0, count: int = 100,
+                     raw: bool = False) -> Tuple[int, Dict[str, str]]:
+        """
+        Retrieve one page of the fields of a test suite.
+
+        :param key: The key of the test suite.
+        :param cursor: The offset returned by the previous page, or 0 to start.
+        :param count: How many fields to return.
+        :param raw: Accepted for the ResultStore interface; values are always strings here.
+        :return: The offset of the next page, 0 when there are no more, and a dictionary of field to value.
+        """
+        # Fetch one row past the page to tell whether there is a next page
+        rows = self._connection().execute(
+            "SELECT field, value FROM fields WHERE key = ? ORDER BY field LIMIT ? OFFSET ?",
+            (key, count + 1, cursor),
+        ).fetchall()
+        next_cursor = cursor + count if len(rows) > count else 0
+        return next_cursor, dict(rows[:count])
+
+    def get_summary(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the counters and timestamps of a test suite in one query.
+
+        :param key: The key of the test suite.
+        :return: The summary, see ResultStore.parse_summary, or None if the test suite does not exist.
+        """
+        values = self._get_fields(key, SUMMARY_FIELDS)
+        return self.parse_summary([values.get(field) for field in SUMMARY_FIELDS])
+
+    def get_totals(self, key: str) -> Dict[str, Dict[str, int]]:
+        """
+        Read the counters of a test suite and of its API.
+
+        :param key: The key of the test suite.
+        :return: The counters, under "suite" and "api".
+        """
+        suite = self._get_fields(key, COUNTER_FIELDS)
+        api = self._get_fields(self._counters_key(self.api_name_of(key)), COUNTER_FIELDS)
+        return {
+            "suite": self.parse_counters(suite.get(field) for field in COUNTER_FIELDS),
+            "api": self.parse_counters(api.get(field) for field in COUNTER_FIELDS),
+        }
+
+    def store_results(self, key: str, results: Iterable[ResultRecord], count: bool = True,
+                      recounted: Optional[Counter] = None):
+        """
+        Store a batch of results and update the counters in one transaction.
+
+        :param key: The key of the test suite.
+        :param results: The (field, status, payload_sent, payload_received, context) records.
+        :param count: Whether to add the results to the counters of the suite and its API.
+        :param recounted: How many of the results were already counted, per status they were counted under.
+        """
+        mapping, statuses = self.serialize_results(results)
+        if not mapping:
+            return
+
+        mapping["updated_at"] = str(time.time())
+        with self._transaction() as connection:
+            connection.executemany(_UPSERT, [(key, field, value) for field, value in mapping.items()])
+            if count:
+                increments = self.counter_increments(statuses, recounted)
+                counters_key = self._counters_key(self.api_name_of(key))
+                connection.executemany(_INCREMENT, [(counter_key, field, str(amount))
+                                                    for counter_key in (key, counters_key)
+                                                    for field, amount in increments.items()])
+
+    def page_redis_keys(self, api_name: str, cursor: int = 0, limit: int = 100, start: Optional[float] = None,
+                        end: Optional[float] = None) -> Tuple[List[str], int]:
+        """
+        Get one page of the test suite keys of an API, in creation order.
+
+        :param api_name: The name of the API.
+        :param cursor: The offset returned by the previous page, or 0 to start.
+        :param limit: How many keys to return.
+        :param start: Only return suites created at or after this epoch timestamp.
+        :param end: Only return suites created at or before this epoch timestamp.
+        :return: The keys, and the offset of the next page, 0 when there are no more.
+        """
+        rows = self._connection().execute(
+            "SELECT key FROM suites WHERE api_name = ? AND created_at BETWEEN ? AND ? "
+            "ORDER BY created_at, key LIMIT ? OFFSET ?",
+            (api_name, float("-inf") if start is None else start, float("inf") if end is None else end,
+             limit + 1, cursor),
+        ).fetchall()
+        next_cursor = cursor + limit if len(rows) > limit else 0
+        return [key for key, in rows[:limit]], next_cursor
+
+    def exists(self, key: str) -> bool:
+        """
+        Check whether a test suite exists.
+
+        :param key: The key of the test suite.
+        :return: True if it exists.
+        """
+        return self._connection().execute("SELECT 1 FROM fields WHERE key = ? LIMIT 1", (key,)).fetchone() is not None
+
+    @staticmethod
+    def _counters_key(api_name: str) -> str:
+        """
+        Get the key under which the counters of every test suite of an API are rolled up.
+
+        :param api_name: The name of the API.
+        :return: The key of the rollup, the same as in Redis.
+        """
+        return f"counters:{api_name}"
+
+    def _get_fields(self, key: str, fields: Tuple[str, ...]) -> Dict[str, str]:
+        """
+        Read some fields of a test suite in one query.
+
+        :param key: The key of the test suite.
+        :param fields: The fields to read.
+        :return: A dictionary of field to value, leaving out fields that are not set.
+        """
+        placeholders = ", ".join("?" * len(fields))
+        return dict(self._connection().execute(
+            f"SELECT field, value FROM fields WHERE key = ? AND field IN ({placeholders})", (key, *fields)))
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection of the calling thread, opening it on first use and again after a fork.
+
+        :return: The connection.
+        """
+        if getattr(self._local, "pid", None) != os.getpid():
+            # Autocommit mode; writes open their own transaction in _transaction
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _transaction(self) -> '_Transaction':
+        """
+        Start a write transaction on the connection of the calling thread.
+
+        :return: A context manager yielding the connection, which commits on success and rolls back on error.
+        """
+        return _Transaction(self._connection())
+
+
+class _Transaction:
+    def __init__(self, connection: sqlite3.Connection):
+        """
+        Initialize a write transaction.
+
+        :param connection: The connection to run the transaction on.
+        """
+        self._connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        """
+        Begin the transaction, taking the write lock up front so it cannot fail halfway on a busy database.
+
+        :return: The connection.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        return self._connection
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Commit the transaction, or roll it back if the block raised.
+
+        :param exc_type: The type of exception that caused the context to be exited, if any.
+        :param exc_val: The instance of the exception that caused the context to be exited, if any.
+        :param exc_tb: The traceback of the exception that caused the context to be exited, if any.
+        """
+        self._connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
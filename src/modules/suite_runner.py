@@ -0,0 +1,269 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from flask import Flask
+from modules.constants import TestStatus
+from modules.results import Results
+from modules.result_sink import get_result_sink
+
+# The outcome of a test case: (status, payload_sent, payload_received, context)
+CaseResult = Tuple[TestStatus, Dict[str, Any], Dict[str, Any], str]
+TestCase = Callable[[], CaseResult]
+
+# How often the supervisor checks whether queued cases have started, in seconds
+_START_POLL_INTERVAL = 0.05
+
+# Process-wide runner shared by the test controllers, created on first use
+_suite_runner: Optional['SuiteRunner'] = None
+_suite_runner_lock = threading.Lock()
+
+
+def get_suite_runner() -> 'SuiteRunner':
+    """
+    Get the process-wide suite runner, creating it on first use.
+    It records results through the shared result sink.
+
+    :return: The shared suite runner.
+    """
+    global _suite_runner
+
+    if _suite_runner is None:
+        with _suite_runner_lock:
+            if _suite_runner is None:
+                _suite_runner = SuiteRunner(Results(sink=get_result_sink()))
+    return _suite_runner
+
+
+def _run_in_app_context(app: Flask, case: TestCase) -> CaseResult:
+    """
+    Run a test case inside the application context, so it can use clients that read the Flask config.
+
+    :param app: The Flask application.
+    :param case: The test case to run.
+    :return: The outcome of the test case.
+    """
+    with app.app_context():
+        return case()
+
+
+class SuiteRun:
+    """
+    Progress of one submitted run of test cases.
+    """
+
+    def __init__(self, run_id: str, test_key: str):
+        """
+        Initialize a SuiteRun.
+
+        :param run_id: The unique ID of the run.
+        :param test_key: The key of the test suite the results are stored under.
+        """
+        self.run_id = run_id
+        self.test_key = test_key
+        self.status = "running"
+        self.submitted = 0
+        self.completed = 0
+        self.passed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.errors = 0
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the run to a JSON-serializable dictionary.
+
+        :return: The run's progress.
+        """
+        return dict(vars(self))
+
+
+class SuiteRunner:
+    """
+    Executes many test cases for one test suite across a thread or process pool.
+
+    submit() returns a run ID immediately; a supervisor thread feeds cases to the pool, enforces the
+    per-case timeout and records every outcome through Results, so callers poll
+    /testAdmin/testResults/<test_key> for progress, or /testAdmin/runs/<run_id> for the run's counts.
+    Case generators are consumed lazily, with no more cases in flight than there are workers.
+
+    A case is a callable taking no arguments and returning (status, payload_sent, payload_received, context).
+    A case that raises is recorded as a failure. A case that exceeds the timeout is recorded as a failure;
+    a thread cannot be interrupted, so it keeps its worker until it returns. The pool is shared by every
+    run, so the timeout of a case starts when a worker picks it up, not while it is queued behind the
+    cases of other runs. With use_processes=True, cases must be picklable.
+
+    The progress of a run is kept in memory by the process that started it, and dropped run_ttl seconds
+    after the run finishes; the results themselves stay in the result store.
+    """
+
+    def __init__(self,
+                 results: Results,
+                 max_workers: Optional[int] = None,
+                 case_timeout: Optional[float] = None,
+                 use_processes: bool = False,
+                 run_ttl: Optional[float] = None):
+        """
+        Initialize the SuiteRunner. Settings that are not passed are pulled from environment variables.
+
+        :param results: Where the outcomes of the test cases are recorded.
+        :param max_workers: The number of cases run at once. Defaults to SUITE_RUNNER_MAX_WORKERS or 32.
+        :param case_timeout: The number of seconds a case may run. Defaults to SUITE_RUNNER_CASE_TIMEOUT or 30.
+        :param use_processes: Run cases in a process pool instead of a thread pool.
+        :param run_ttl: The number of seconds the progress of a finished run is kept.
+            Defaults to SUITE_RUNNER_RUN_TTL or 3600.
+        """
+        self.results = results
+        self.max_workers = max_workers or int(os.environ.get("SUITE_RUNNER_MAX_WORKERS", 32))
+        self.case_timeout = case_timeout or float(os.environ.get("SUITE_RUNNER_CASE_TIMEOUT", 30))
+        self.use_processes = use_processes
+        self.run_ttl = run_ttl or float(os.environ.get("SUITE_RUNNER_RUN_TTL", 3600))
+
+        self._executor: Optional[Executor] = None
+        self._runs: Dict[str, SuiteRun] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, test_key: str, cases: Iterable[TestCase], app: Optional[Flask] = None) -> str:
+        """
+        Start running test cases in the background.
+
+        :param test_key: The key of the test suite to record the results under.
+        :param cases: A list or generator of test cases.
+        :param app: When given, each case runs inside this application's context. Thread pools only.
+        :return: The ID of the run.
+        """
+        if app is not None and self.use_processes:
+            raise ValueError("Test cases cannot run in an application context in a process pool")
+
+        run = SuiteRun(str(uuid.uuid4()), test_key)
+        with self._lock:
+            self._prune_runs()
+            self._runs[run.run_id] = run
+
+        threading.Thread(target=self._supervise, args=(run, cases, app), name=f"suite-run-{run.run_id}",
+                         daemon=True).start()
+        return run.run_id
+
+    def get_run(self, run_id: str) -> Optional[SuiteRun]:
+        """
+        Get a run started by this runner.
+
+        :param run_id: The ID of the run.
+        :return: The run, or None if this process did not start it or it finished more than run_ttl seconds ago.
+        """
+        with self._lock:
+            self._prune_runs()
+            return self._runs.get(run_id)
+
+    def _prune_runs(self):
+        """
+        Drop the runs that finished more than run_ttl seconds ago. Must be called while holding the lock.
+        """
+        expired_before = time.time() - self.run_ttl
+        for run_id in [run_id for run_id, run in self._runs.items()
+                       if run.finished_at is not None and run.finished_at <= expired_before]:
+            del self._runs[run_id]
+
+    def _get_executor(self) -> Executor:
+        """
+        Get the worker pool, creating it on first use.
+
+        :return: The worker pool.
+        """
+        with self._lock:
+            if self._executor is None:
+                executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+                self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    def _supervise(self, run: SuiteRun, cases: Iterable[TestCase], app: Optional[Flask]):
+        """
+        Feed the cases of a run to the pool and record their outcomes as they complete.
+
+        :param run: The run being executed.
+        :param cases: The test cases.
+        :param app: The application whose context the cases run in, if any.
+        """
+        executor = self._get_executor()
+        in_flight: Dict[Future, str] = {}
+        # Deadline of each case a worker has picked up
+        deadlines: Dict[Future, float] = {}
+        cases = iter(cases)
+        exhausted = False
+
+        while not exhausted or in_flight:
+            # Keep the pool busy without materializing the whole case generator
+            while not exhausted and len(in_flight) < self.max_workers:
+                try:
+                    case = next(cases, None)
+                except Exception:
+                    # A failing case generator ends the run with the cases produced so far
+                    run.errors += 1
+                    case = None
+                if case is None:
+                    exhausted = True
+                    break
+
+                field = f"test-{run.run_id}-{run.submitted}"
+                future = executor.submit(_run_in_app_context, app, case) if app else executor.submit(case)
+                in_flight[future] = field
+                run.submitted += 1
+
+            if not in_flight:
+                break
+
+            # Start the timeout of the cases that workers picked up since the last check
+            now = time.monotonic()
+            for future in in_flight:
+                if future not in deadlines and (future.running() or future.done()):
+                    deadlines[future] = now + self.case_timeout
+
+            timeout = min(deadlines.values()) - now if deadlines else self.case_timeout
+            if len(deadlines) < len(in_flight):
+                timeout = min(timeout, _START_POLL_INTERVAL)
+            done, _ = wait(in_flight, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                field = in_flight.pop(future)
+                deadlines.pop(future, None)
+                try:
+                    status, payload_sent, payload_received, context = future.result()
+                except Exception as e:
+                    run.errors += 1
+                    status, payload_sent, payload_received, context = TestStatus.FAIL, {}, {}, f"Test case raised: {e}"
+                self._record(run, field, status, payload_sent, payload_received, context)
+
+            now = time.monotonic()
+            for future, deadline in list(deadlines.items()):
+                if deadline <= now and not future.done():
+                    field = in_flight.pop(future)
+                    del deadlines[future]
+                    run.timed_out += 1
+                    self._record(run, field, TestStatus.FAIL, {}, {},
+                                 f"Test case timed out after {self.case_timeout} seconds")
+
+        run.status = "finished"
+        run.finished_at = time.time()
+
+    def _record(self, run: SuiteRun, field: str, status: TestStatus, payload_sent: Dict[str, Any],
+                payload_received: Dict[str, Any], context: str):
+        """
+        Record the outcome of a test case and update the run's progress.
+
+        :param run: The run the case belongs to.
+        :param field: The field the result is stored under.
+        :param status: The test result status (PASS or FAIL).
+        :param payload_sent: The payload sent during the test.
+        :param payload_received: The payload received during the test.
+        :param context: Additional context or reason for the test result.
+        """
+        self.results.add_result(run.test_key, field, status, payload_sent, payload_received, context)
+        run.completed += 1
+        if status == TestStatus.PASS:
+            run.passed += 1
+        else:
+            run.failed += 1
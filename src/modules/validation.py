@@ -0,0 +1,147 @@
+import math
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from marshmallow import Schema, RAISE, fields, missing
+
+# A compiled check: given a value, tells whether the schema would load it unchanged
+Check = Callable[[Any], bool]
+
+# Field types whose values are loaded unchanged when they have exactly this Python type.
+# Exact types, since bool is an int that Integer rejects and subclasses such as Email add validation.
+_SCALAR_TYPES = {fields.String: str, fields.Integer: int, fields.Boolean: bool}
+
+# Methods of Schema that a subclass may override to change what loading returns
+_LOAD_METHODS = ("load", "_do_load", "_deserialize", "_invoke_load_processors")
+
+# Schemas shared by every request, by (schema class, many)
+_schemas: Dict[Tuple[Type[Schema], bool], 'CompiledSchema'] = {}
+_schemas_lock = threading.Lock()
+
+
+def get_compiled_schema(schema_class: Type[Schema], many: bool = False) -> 'CompiledSchema':
+    """
+    Get the process-wide instance of a schema, compiling it on first use.
+
+    :param schema_class: The marshmallow schema class.
+    :param many: Whether the schema loads a list of objects.
+    :return: The shared compiled schema.
+    """
+    key = (schema_class, many)
+    schema = _schemas.get(key)
+    if schema is None:
+        with _schemas_lock:
+            schema = _schemas.get(key)
+            if schema is None:
+                schema = _schemas[key] = CompiledSchema(schema_class(many=many))
+    return schema
+
+
+class CompiledSchema:
+    """
+    A marshmallow schema with an optional fast path for valid payloads.
+
+    The fast path is a validator compiled from the schema that checks, without building any objects,
+    whether the schema would load a payload unchanged. Such payloads are returned as they are; every
+    other payload goes through the schema, so coercion and error messages are exactly marshmallow's.
+    Set VALIDATION_FAST_PATH=false to always use the schema.
+    """
+
+    def __init__(self, schema: Schema, fast_path: Optional[bool] = None):
+        """
+        Compile a schema.
+
+        :param schema: The marshmallow schema instance.
+        :param fast_path: Whether to compile the fast path. Defaults to VALIDATION_FAST_PATH or true.
+        """
+        if fast_path is None:
+            fast_path = os.environ.get("VALIDATION_FAST_PATH", "true").lower() == "true"
+        self.schema = schema
+        self.fast_path = compile_validator(schema) if fast_path else None
+
+    def load(self, data: Any) -> Any:
+        """
+        Validate and deserialize a payload in a single pass.
+
+        :param data: The payload.
+        :return: The payload itself when the fast path accepts it, otherwise the result of the schema's load.
+        :raises marshmallow.ValidationError: If the payload is invalid.
+        """
+        if self.fast_path is not None and self.fast_path(data):
+            return data
+        return self.schema.load(data)
+
+
+def compile_validator(schema: Schema) -> Optional[Check]:
+    """
+    Compile a schema into a check of whether it would load a value unchanged.
+
+    Only plain schemas are supported: String, Integer, Float, Boolean, Nested and List fields without
+    validators, data keys, attributes or load defaults, in schemas that do not override loading and
+    have no hooks, partial loading or unknown fields. A value the check rejects may still be valid, for the schema to coerce.
+
+    :param schema: The marshmallow schema instance.
+    :return: The check, or None if the schema is not supported.
+    """
+    if any(schema._hooks.values()) or schema.partial or schema.unknown != RAISE:
+        return None
+    # Subclasses that override loading build something other than the dict, e.g. marshmallow_dataclass
+    # schemas construct the dataclass in load() instead of in a hook
+    if any(getattr(type(schema), name) is not getattr(Schema, name) for name in _LOAD_METHODS):
+        return None
+
+    checks = {}
+    for name, field in schema.load_fields.items():
+        check = _compile_field(field)
+        if check is None or field.data_key not in (None, name) or field.attribute not in (None, name):
+            return None
+        checks[name] = check
+    required = frozenset(name for name, field in schema.load_fields.items() if field.required)
+
+    def check_object(value: Any) -> bool:
+        if type(value) is not dict or not required.issubset(value):
+            return False
+        for name, item in value.items():
+            check = checks.get(name)
+            if check is None or not check(item):
+                return False
+        return True
+
+    if schema.many:
+        return lambda value: type(value) is list and all(check_object(item) for item in value)
+    return check_object
+
+
+def _compile_field(field: fields.Field) -> Optional[Check]:
+    """
+    Compile a field into a check of whether it would load a value unchanged.
+
+    :param field: The marshmallow field.
+    :return: The check, or None if the field is not supported.
+    """
+    if field.validators or field.load_default is not missing:
+        return None
+
+    field_type = type(field)
+    if field_type in _SCALAR_TYPES:
+        value_type = _SCALAR_TYPES[field_type]
+        check = lambda value: type(value) is value_type
+    elif field_type is fields.Float and not field.allow_nan:
+        check = lambda value: type(value) is float and math.isfinite(value)
+    elif field_type is fields.Nested:
+        # The nested schema is created with the many of the field, so it checks lists itself
+        check = compile_validator(field.schema)
+        if check is None:
+            return None
+    elif field_type is fields.List:
+        inner = _compile_field(field.inner)
+        if inner is None:
+            return None
+        check = lambda value: type(value) is list and all(inner(item) for item in value)
+    else:
+        return None
+
+    if field.allow_none:
+        return lambda value: value is None or check(value)
+    return check
+
@@ -1,27 +1,37 @@
-from flask import request, jsonify, make_response, g
+from flask import request, jsonify, make_response, g, current_app
 from flask_restx import Namespace, Resource
+from functools import partial
+from itertools import islice
 from random import randint
-from test_suite.api1.schemas import Api1ModelSchema
+import requests
+from marshmallow import ValidationError
+from test_suite.api1.schemas import Api1ModelSchema, FuzzPayloadSchema
 from modules.constants import TestStatus
 from modules.results import Results
+from modules.result_sink import get_result_sink
 from modules.json_utility import JsonUtility
 from modules.http_client import HttpClient
 from modules.constants import Environments
-from modules.decorators import load_api_config
+from modules.decorators import load_api_config, load_body
+from modules.validation import get_compiled_schema
+from modules.suite_runner import get_suite_runner, CaseResult
+from modules.openapi_spec import load_spec
+from modules.fake_data_generator import generate_cases
 
 # Create the Namespace
 api1_ns = Namespace("api1", description="API1 Namespace")
 
-# Create instance of TestResult
-results = Results()
+# Create instance of TestResult, writing results in the background through the shared sink
+results = Results(sink=get_result_sink())
 
 
 @api1_ns.route("/test", methods=["POST"])
 class TestResource(Resource):
-    @api1_ns.expect(Api1ModelSchema())  # Use the expect decorator to specify the expected request body model
+    @api1_ns.expect(get_compiled_schema(Api1ModelSchema).schema)  # Use the expect decorator to specify the expected request body model
+    @load_body(Api1ModelSchema)
     @load_api_config("apiOne")
     def post(self):
-        http_client = HttpClient("http://192.168.1.59/api/", Environments.TEST)
+        http_client = HttpClient.get_client("http://192.168.1.59/api/", Environments.TEST)
 
         api_name = g.api_config.api_name
         app_id = g.api_config.app_id
@@ -31,8 +41,8 @@ class TestResource(Resource):
         teams_channel_link = g.api_config.teams_channel_link
         controllers_under_test = g.api_config.controllers_under_test
 
-        # Access the validated request data from the body using the 'json' attribute of the request object
-        request_data = request.json
+        # Access the request data validated by load_body
+        request_data = g.payload
 
         # Perform any data validation or processing as needed
         # You can access the validated fields using the schema
@@ -50,7 +60,7 @@ class TestResource(Resource):
 
         try:
 
-            if results.redis_client.exists(g.test_key):
+            if results.store.exists(g.test_key):
                 test_name = f"test-{randint(1, 100000000000)}"
                 save_data = JsonUtility.serialize(result_data)
                 if save_data:
@@ -71,3 +81,91 @@ class TestResource(Resource):
             }), 500)
 
         return make_response('', 201)
+
+
+def _probe_case(http_client: HttpClient, payload: dict) -> CaseResult:
+    """
+    Test case run by the suite runner: probe the API under test for one payload.
+
+    :param http_client: The client for the API under test.
+    :param payload: The payload of this case.
+    :return: The outcome of the case.
+    """
+    # HttpClient raises on error statuses
+    try:
+        response = http_client.get("private")
+    except requests.HTTPError as e:
+        return TestStatus.FAIL, payload, {"status_code": e.response.status_code}, ""
+
+    return TestStatus.PASS, payload, {"status_code": response.status_code}, ""
+
+
+@api1_ns.route("/suite", methods=["POST"])
+class SuiteResource(Resource):
+    @load_api_config("apiOne")
+    def post(self):
+        if not results.store.exists(g.test_key):
+            return make_response(jsonify({
+                'error': f'test-key with value `{g.test_key}` does not exist in our records.'
+            }), 400)
+
+        # One test case per payload in the body, validated in one pass with the shared schema
+        try:
+            payloads = get_compiled_schema(Api1ModelSchema, many=True).load(request.json.get("cases", []))
+        except ValidationError as e:
+            return make_response(jsonify({'error': 'Invalid test cases', 'messages': e.messages}), 400)
+
+        http_client = HttpClient.get_client("http://192.168.1.59/api/", Environments.TEST)
+        cases = (partial(_probe_case, http_client, payload) for payload in payloads)
+
+        run_id = get_suite_runner().submit(g.test_key, cases, app=current_app._get_current_object())
+
+        # Progress is polled through /testAdmin/testResults/<test_key>
+        return make_response(jsonify({"run_id": run_id, "test_key": g.test_key}), 202)
+
+
+def _fuzz_case(http_client: HttpClient, path: str, method: str, payload: dict) -> CaseResult:
+    """
+    Test case run by the suite runner: send one generated payload to an endpoint of the API under test.
+
+    :param http_client: The client for the API under test.
+    :param path: The path of the endpoint, with its parameters filled in.
+    :param method: POST or PUT.
+    :param payload: The generated payload.
+    :return: The outcome of the case.
+    """
+    send = http_client.post if method == "POST" else http_client.put
+    try:
+        response = send(path.lstrip("/"), payload)
+    except requests.HTTPError as e:
+        return TestStatus.FAIL, payload, {"status_code": e.response.status_code}, f"{method} {path}"
+
+    return TestStatus.PASS, payload, {"status_code": response.status_code}, f"{method} {path}"
+
+
+@api1_ns.route("/fuzz", methods=["POST"])
+class FuzzResource(Resource):
+    @load_body(FuzzPayloadSchema)
+    @load_api_config("apiOne")
+    def post(self):
+        if not results.store.exists(g.test_key):
+            return make_response(jsonify({
+                'error': f'test-key with value `{g.test_key}` does not exist in our records.'
+            }), 400)
+
+        # count, seed and constraints, validated by load_body
+        count = g.payload["count"]
+        spec = load_spec(g.api_config.openapi_spec)
+
+        # Cases are generated lazily as the runner consumes them, one chunk per endpoint at a time
+        endpoints = [(path, method) for path, method in spec.endpoints() if method in ("POST", "PUT")]
+        generated = islice(generate_cases(spec, seed=g.payload["seed"], constraints=g.payload["constraints"],
+                                          endpoints=endpoints), count)
+
+        http_client = HttpClient.get_client(g.api_config.base_url.test, Environments.TEST)
+        cases = (partial(_fuzz_case, http_client, path, method, payload) for path, method, payload in generated)
+
+        run_id = get_suite_runner().submit(g.test_key, cases, app=current_app._get_current_object())
+
+        # Progress is polled through /testAdmin/testResults/<test_key>
+        return make_response(jsonify({"run_id": run_id, "test_key": g.test_key, "count": count}), 202)
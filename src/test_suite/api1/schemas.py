@@ -1,4 +1,8 @@
-from marshmallow import Schema, fields
+import os
+from marshmallow import Schema, fields, validate
+
+# Most cases one fuzz request may generate
+FUZZ_MAX_CASES = int(os.environ.get("FUZZ_MAX_CASES", 10000))
 
 
 class AddressInfoSchema(Schema):
@@ -16,3 +20,9 @@ class Api1ModelSchema(Schema):
     name = fields.String(required=True)
     age = fields.Integer(required=True)
     addresses = fields.List(fields.Nested(AddressSchema), required=True)
+
+
+class FuzzPayloadSchema(Schema):
+    count = fields.Integer(load_default=100, validate=validate.Range(min=1, max=FUZZ_MAX_CASES))
+    seed = fields.Integer(load_default=None, allow_none=True)
+    constraints = fields.Boolean(load_default=True)
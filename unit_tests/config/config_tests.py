@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+from src.config.config import Config, Api, ConfigEntry, LITERAL, ENV, SSM
+
+
+class TestConfigIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config()
+
+    def test_placeholders_classified(self):
+        with patch.dict('os.environ', {'ENVIRONMENT': 'AWS'}):
+            index = self.config.path_index()
+
+        self.assertEqual(index['confirmatron.auth_zero.test.client_secret'],
+                         ConfigEntry(SSM, 'CONFIRMATRON_AUTH_ZERO_TEST_CLIENT_SECRET'))
+        self.assertEqual(index['confirmatron.auth_zero.test.grant_type'], ConfigEntry(LITERAL, 'client_credentials'))
+        self.assertIs(index['confirmatron.auth_zero.test'].value, self.config.confirmatron.auth_zero.test)
+
+    def test_placeholders_classified_local(self):
+        with patch.dict('os.environ', {'ENVIRONMENT': 'LOCAL'}):
+            index = self.config.path_index()
+
+        self.assertEqual(index['confirmatron.auth_zero.beta.client_secret'].kind, ENV)
+
+    def test_index_is_immutable(self):
+        index = self.config.path_index()
+
+        with self.assertRaises(TypeError):
+            index['confirmatron.redis.redis_host'] = ConfigEntry(LITERAL, 'elsewhere')
+        self.assertIs(self.config.path_index(), index)
+
+    def test_added_api_indexed_by_name(self):
+        api = Api('apiTwo')
+        api.app_id = '456'
+        self.config.test_apis.add_api('apiTwo', api)
+
+        self.assertEqual(self.config.lookup('apiTwo.app_id'), ConfigEntry(LITERAL, '456'))
+        self.assertNotIn('test_apis.apis', self.config.path_index())
+
+    def test_lookup_loads_registered_api(self):
+        self.config.test_apis.register_api_module('apiOne', 'src.config.apis.api_one')
+
+        self.assertEqual(self.config.lookup('apiOne.base_url.beta').value, 'http://fakeurl.beta.com')
+        self.assertIn('apiOne', self.config.test_apis.apis.loaded())
+
+    def test_lazy_load_logs_its_times(self):
+        self.config.test_apis.register_api_module('apiOne', 'src.config.apis.api_one')
+
+        with self.assertLogs('src.config.config', level='INFO') as logs:
+            self.config.test_apis.apis['apiOne']
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('API config apiOne: import', logs.output[0])
+        self.assertEqual(set(self.config.test_apis.apis.load_times['apiOne']), {'import_seconds', 'setup_seconds'})
+
+    def test_lookup_unknown_path(self):
+        with self.assertRaises(KeyError):
+            self.config.lookup('confirmatron.nope')
+
+    def test_dump_leaves_out_sections(self):
+        dump = self.config.path_index().dump()
+
+        self.assertEqual(dump['confirmatron.redis.redis_port'], {'kind': LITERAL, 'value': 0})
+        self.assertNotIn('confirmatron.redis', dump)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+from aiohttp import web
+from src.modules.async_http_client import AsyncHttpClient, Environments
+
+
+class TestAsyncHttpClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        async def handler(request):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.05)
+            self.in_flight -= 1
+            if request.match_info["name"] == "missing":
+                return web.json_response({"error": "not found"}, status=404)
+            return web.json_response({"auth": request.headers["Authorization"], "method": request.method})
+
+        app = web.Application()
+        app.router.add_route("*", "/{name}", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        with patch('src.modules.async_http_client.Auth0Handler') as mock_auth:
+            self.get_test_token = mock_auth.return_value.get_test_token
+            self.get_test_token.return_value = 'test_access_token'
+            self.client = AsyncHttpClient(f"http://127.0.0.1:{port}", Environments.TEST, concurrency=10)
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_verbs_send_bearer_token(self):
+        async with self.client as client:
+            response = await client.post("users", data={"name": "John"})
+
+        self.assertEqual(await response.json(), {"auth": "Bearer test_access_token", "method": "POST"})
+
+    async def test_refreshed_token_is_sent(self):
+        async with self.client as client:
+            first = await client.get("first")
+            self.get_test_token.return_value = 'refreshed_access_token'
+            second = await client.get("second")
+
+        self.assertEqual((await first.json())["auth"], "Bearer test_access_token")
+        self.assertEqual((await second.json())["auth"], "Bearer refreshed_access_token")
+
+    async def test_gather_runs_concurrently_within_limit(self):
+        requests = [("GET", f"item{i}", {}) for i in range(50)]
+
+        start = time.perf_counter()
+        responses = await self.client.gather(requests)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(responses), 50)
+        self.assertTrue(all(response.status == 200 for response in responses))
+        self.assertEqual(self.max_in_flight, 10)
+        # Sequentially this would take 50 * 0.05s
+        self.assertLess(elapsed, 1.5)
+
+    async def test_gather_returns_failures_in_order(self):
+        responses = await self.client.gather([("GET", "ok", {}), ("GET", "missing", {})])
+
+        self.assertEqual(responses[0].status, 200)
+        self.assertIsInstance(responses[1], Exception)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
-from src.modules.auth_0_handler import Auth0Handler
+from src.modules.auth_0_handler import Auth0Handler, TokenManager
 
 
 class TestAuth0Handler(unittest.TestCase):
@@ -37,6 +39,53 @@ class TestAuth0Handler(unittest.TestCase):
             }
         )
 
+
+class TestTokenManager(unittest.TestCase):
+
+    def setUp(self):
+        self.token_manager = TokenManager()
+        self.token_manager.clear()
+
+    def test_token_cached_until_expiry(self):
+        fetch = MagicMock(return_value=('test_access_token', 3600))
+
+        self.assertEqual(self.token_manager.get_token('test', fetch), 'test_access_token')
+        self.assertEqual(self.token_manager.get_token('test', fetch), 'test_access_token')
+        fetch.assert_called_once()
+
+        self.token_manager._tokens['test'].expires_at = time.time() - 1
+        fetch.return_value = ('new_access_token', 3600)
+        self.assertEqual(self.token_manager.get_token('test', fetch), 'new_access_token')
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_concurrent_misses_fetch_once(self):
+        def slow_fetch():
+            time.sleep(0.1)
+            return 'test_access_token', 3600
+        fetch = MagicMock(side_effect=slow_fetch)
+
+        threads = [threading.Thread(target=self.token_manager.get_token, args=('beta', fetch)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        fetch.assert_called_once()
+
+    def test_refresh_in_background_before_expiry(self):
+        fetch = MagicMock(return_value=('old_access_token', 3600))
+        self.token_manager.get_token('prod', fetch)
+        self.token_manager._tokens['prod'].refresh_at = time.time() - 1
+
+        fetch.return_value = ('new_access_token', 3600)
+        # The current token is served while the replacement is fetched
+        self.assertEqual(self.token_manager.get_token('prod', fetch), 'old_access_token')
+
+        deadline = time.time() + 2
+        while self.token_manager.stats()['refreshes'] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.token_manager.get_token('prod', fetch), 'new_access_token')
+
 # TODO: add exhaustive tests
 
 
@@ -0,0 +1,140 @@
+import re
+import unittest
+from itertools import islice
+from unittest.mock import patch
+from src.modules.fake_data_generator import PayloadGenerator, generate_cases
+from src.modules.openapi_spec import OpenApiSpec
+
+ADDRESS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "score": {"type": "number"},
+        "active": {"type": "boolean"},
+        "addresses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string"},
+                    "info": {"type": "object", "properties": {"street": {"type": "string"}}},
+                },
+            },
+        },
+    },
+    "required": ["name", "nickname"],
+}
+
+
+class TestPayloadGenerator(unittest.TestCase):
+
+    def _assert_payloads(self, payloads):
+        self.assertEqual(len(payloads), 50)
+        for payload in payloads:
+            self.assertIsInstance(payload["name"], str)
+            self.assertIsInstance(payload["age"], int)
+            self.assertIsInstance(payload["score"], float)
+            self.assertIsInstance(payload["active"], bool)
+            self.assertIsNone(payload["nickname"])
+            self.assertTrue(1 <= len(payload["addresses"]) <= 5)
+            for address in payload["addresses"]:
+                self.assertIsInstance(address["info"]["street"], str)
+
+    def test_generate(self):
+        self._assert_payloads(PayloadGenerator(ADDRESS_SCHEMA, seed=1).generate(50))
+
+    def test_generate_without_numpy(self):
+        with patch("src.modules.fake_data_generator.numpy", None):
+            self._assert_payloads(PayloadGenerator(ADDRESS_SCHEMA, seed=1).generate(50))
+
+    def test_seed_is_reproducible(self):
+        first = PayloadGenerator(ADDRESS_SCHEMA, seed=7)
+        second = PayloadGenerator(ADDRESS_SCHEMA, seed=7)
+        self.assertEqual(first.generate(20), second.generate(20))
+        self.assertEqual(first.generate(5), second.generate(5))
+        self.assertNotEqual(PayloadGenerator(ADDRESS_SCHEMA, seed=8).generate(20), first.generate(20))
+
+    def test_untyped_schema(self):
+        self.assertEqual(PayloadGenerator({}).generate(3), [None, None, None])
+        self.assertEqual(PayloadGenerator({"type": "object"}).generate(2), [{}, {}])
+
+    def test_constraints(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "kind": {"type": "string", "enum": ["home", "work"]},
+                "code": {"type": "string", "minLength": 8, "maxLength": 10},
+                "email": {"type": "string", "format": "email"},
+                "created": {"type": "string", "format": "date-time"},
+                "level": {"type": "integer", "enum": [1, 2, 3]},
+                "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+                "empty": {"type": "array", "items": {"type": "integer"}, "maxItems": 0},
+            },
+        }
+        for payload in PayloadGenerator(schema, seed=3, constraints=True).generate(100):
+            self.assertIn(payload["kind"], ("home", "work"))
+            self.assertTrue(8 <= len(payload["code"]) <= 10)
+            self.assertIn("@", payload["email"])
+            self.assertRegex(payload["created"], re.compile(r"^\d{4}-\d{2}-\d{2}T"))
+            self.assertIn(payload["level"], (1, 2, 3))
+            self.assertTrue(1 <= len(payload["tags"]) <= 2)
+            self.assertEqual(payload["empty"], [])
+
+    def test_constraints_disabled(self):
+        schema = {"type": "array", "items": {"type": "string", "enum": ["a"]}, "maxItems": 1}
+        payloads = PayloadGenerator(schema, seed=3).generate(50)
+        self.assertTrue(any(len(payload) > 1 for payload in payloads))
+        self.assertTrue(any(value != "a" for payload in payloads for value in payload))
+
+
+class TestGenerateCases(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = OpenApiSpec({"paths": {
+            "/pets": {"post": {"requestBody": {"content": {"application/json": {"schema": ADDRESS_SCHEMA}}}}},
+            "/tags": {"put": {"requestBody": {"content": {"application/json": {"schema": {"type": "string"}}}}}},
+        }}, "hash")
+
+    def test_endpoints_take_turns_in_chunks(self):
+        cases = list(islice(generate_cases(self.spec, seed=1, chunk_size=3), 12))
+        self.assertEqual([(path, method) for path, method, _ in cases],
+                         [("/pets", "POST")] * 3 + [("/tags", "PUT")] * 3 + [("/pets", "POST")] * 3 + [("/tags", "PUT")] * 3)
+        self.assertIsInstance(cases[0][2], dict)
+        self.assertIsInstance(cases[3][2], str)
+
+    def test_seed_is_reproducible(self):
+        first = list(islice(generate_cases(self.spec, seed=5, chunk_size=4), 20))
+        self.assertEqual(list(islice(generate_cases(self.spec, seed=5, chunk_size=4), 20)), first)
+
+        # Each endpoint has its own seed, so leaving one out does not change the other's cases
+        pets_only = list(islice(generate_cases(self.spec, seed=5, chunk_size=4, endpoints=[("/pets", "POST")]), 8))
+        self.assertEqual(pets_only, [case for case in first if case[0] == "/pets"][:8])
+
+    def test_stream_is_lazy(self):
+        with patch.object(PayloadGenerator, "generate", wraps=lambda count: [{}] * count) as generate:
+            next(generate_cases(self.spec, chunk_size=10))
+        generate.assert_called_once_with(10)
+
+    def test_path_parameters_are_filled(self):
+        spec = OpenApiSpec({"paths": {"/pet/{petId}/tags/{tag}": {
+            "parameters": [{"name": "petId", "in": "path", "schema": {"type": "integer"}}],
+            "put": {
+                "parameters": [{"name": "tag", "in": "path", "schema": {"type": "string", "enum": ["a b", "c/d"]}}],
+                "requestBody": {"content": {"application/json": {"schema": {"type": "string"}}}},
+            },
+        }}}, "hash")
+
+        cases = list(islice(generate_cases(spec, seed=2, chunk_size=5, constraints=True), 10))
+
+        for path, method, _ in cases:
+            self.assertEqual(method, "PUT")
+            self.assertRegex(path, r"^/pet/\d+/tags/(a%20b|c%2Fd)$")
+        self.assertEqual(list(islice(generate_cases(spec, seed=2, chunk_size=5, constraints=True), 10)), cases)
+
+    def test_no_endpoints(self):
+        self.assertEqual(list(generate_cases(OpenApiSpec({}, "hash"))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
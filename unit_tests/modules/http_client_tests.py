@@ -1,6 +1,7 @@
 import pytest
 import requests_mock
-from src.modules.http_client import HttpClient
+from unittest.mock import patch
+from src.modules.http_client import HttpClient, Environments
 
 
 @pytest.fixture
@@ -50,3 +51,42 @@ def test_delete(http_client, req_mock):
 
     response = http_client.delete(url)
     assert response == expected
+
+
+@pytest.fixture
+def pooled_client():
+    with patch('src.modules.http_client.Auth0Handler') as mock_auth:
+        mock_auth.return_value.get_test_token.return_value = 'test_access_token'
+        yield HttpClient('http://test.com', Environments.TEST)
+
+
+def test_requests_use_session(pooled_client, req_mock):
+    req_mock.get('http://test.com/private', json={"success": True})
+
+    with patch.object(pooled_client.session, 'request', wraps=pooled_client.session.request) as mock_request:
+        response = pooled_client.get('private', params={"q": "1"})
+
+    assert response.json() == {"success": True}
+    mock_request.assert_called_once_with(
+        'GET',
+        'http://test.com/private',
+        headers={"Authorization": "Bearer test_access_token"},
+        timeout=pooled_client.timeout,
+        params={"q": "1"},
+    )
+
+
+def test_session_is_pooled_with_retries(pooled_client):
+    adapter = pooled_client.session.get_adapter('https://test.com')
+    assert adapter._pool_maxsize > 1
+    assert adapter.max_retries.total > 0
+
+
+def test_get_client_is_cached():
+    with patch('src.modules.http_client.Auth0Handler'):
+        first = HttpClient.get_client('http://test.com', Environments.TEST)
+        second = HttpClient.get_client('http://test.com', Environments.TEST)
+        other = HttpClient.get_client('http://test.com', Environments.BETA)
+
+    assert first is second
+    assert first is not other
@@ -1,22 +1,37 @@
 import unittest
-from src.modules.json_utility import JsonUtility
+from unittest.mock import patch
+import json
+from src.modules import json_utility
+from src.modules.json_utility import JsonUtility, MSGPACK_TAG, MSGPACK_ZLIB_TAG
+
+# The backends installed here; json is always available
+BACKENDS = [name for name, module in (("json", json), ("orjson", json_utility.orjson), ("ujson", json_utility.ujson))
+            if module is not None]
+
+# Documents the fast backends parse differently from the json module, or reject
+EDGE_CASES = [
+    b'{"name": "J\\u00e9r\\u00f4me/\\ud83d\\ude00", "score": 0.30000000000000004}',
+    b'[123456789012345678901234, -9223372036854775809, 18446744073709551615]',
+    b'[NaN, Infinity, 1e400]',
+    b'{"a": 1, "a": 2}',
+]
 
 class TestJsonUtility(unittest.TestCase):
     def test_to_string(self):
         # Test normal dictionary conversion
         data = {"name": "John", "age": 30}
         result = JsonUtility.serialize(data)
-        self.assertEqual(result, '{"name": "John", "age": 30}')
+        self.assertEqual(result, '{"name":"John","age":30}')
 
         # Test conversion of a list
         data = [1, 2, 3, 4, 5]
         result = JsonUtility.serialize(data)
-        self.assertEqual(result, '[1, 2, 3, 4, 5]')
+        self.assertEqual(result, '[1,2,3,4,5]')
 
         # Test conversion of a complex nested dictionary
         data = {"person": {"name": "John", "age": 30}, "scores": [80, 90, 75]}
         result = JsonUtility.serialize(data)
-        self.assertEqual(result, '{"person": {"name": "John", "age": 30}, "scores": [80, 90, 75]}')
+        self.assertEqual(result, '{"person":{"name":"John","age":30},"scores":[80,90,75]}')
 
         # Test conversion of invalid input (should return None)
         data = object()  # Non-serializable object
@@ -45,5 +60,100 @@ class TestJsonUtility(unittest.TestCase):
         result = JsonUtility.deserialize(json_str)
         self.assertIsNone(result)
 
+    def test_encode_json_by_default(self):
+        data = {"name": "John", "age": 30}
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(JsonUtility.encode(data), JsonUtility.serialize(data))
+
+    def test_encode_msgpack(self):
+        data = {"name": "John", "scores": [80, 90, 75], "nested": {"ok": True, "none": None}}
+        result = JsonUtility.encode(data, encoding="msgpack")
+
+        self.assertTrue(result.startswith(MSGPACK_TAG))
+        self.assertTrue(JsonUtility.is_binary(result))
+        self.assertEqual(JsonUtility.deserialize(result), data)
+
+    def test_encode_msgpack_compresses_large_values(self):
+        data = {"payload": ["the same value"] * 500}
+        result = JsonUtility.encode(data, encoding="msgpack", compress_threshold=1024)
+
+        self.assertTrue(result.startswith(MSGPACK_ZLIB_TAG))
+        self.assertLess(len(result), len(JsonUtility.serialize(data)))
+        self.assertEqual(JsonUtility.deserialize(result), data)
+
+    def test_encode_msgpack_falls_back_to_json_for_big_integers(self):
+        data = {"id": 2**70, "ids": [-2**70]}
+        result = JsonUtility.encode(data, encoding="msgpack")
+
+        self.assertFalse(JsonUtility.is_binary(result))
+        self.assertEqual(JsonUtility.deserialize(result), data)
+
+    def test_encode_msgpack_invalid(self):
+        with self.assertRaises(ValueError):
+            JsonUtility.encode({"value": object()}, encoding="msgpack")
+
+    def test_encode_unknown_encoding(self):
+        with self.assertRaises(ValueError):
+            JsonUtility.encode({}, encoding="xml")
+
+    def test_deserialize_json_bytes(self):
+        # Values written as JSON before the encoding was switched are read back as before
+        self.assertFalse(JsonUtility.is_binary(b'{"a": 1}'))
+        self.assertEqual(JsonUtility.deserialize(b'{"a": 1}'), {"a": 1})
+
+    def test_backends_deserialize_like_json(self):
+        for backend in BACKENDS:
+            for document in EDGE_CASES:
+                with self.subTest(backend=backend, document=document):
+                    expected = json.loads(document)
+                    self.assertEqual(repr(JsonUtility.deserialize(document, backend=backend)), repr(expected))
+                    self.assertEqual(repr(JsonUtility.deserialize(document.decode("utf-8"), backend=backend)),
+                                     repr(expected))
+
+    def test_backends_raise_like_json(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), self.assertRaises(json.JSONDecodeError):
+                JsonUtility.deserialize(b'{"name": ', backend=backend)
+
+    def test_backends_serialize_the_same_document(self):
+        data = {"name": "J\u00e9r\u00f4me/x", "scores": [80, 0.1, None, True], 1: 2**70, "nested": {"ok": False}}
+        expected = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(JsonUtility.serialize_bytes(data, backend=backend), expected)
+
+    def test_backends_round_trip_results(self):
+        record = {"status": "pass", "payload_sent": {"name": "J\u00e9r\u00f4me", "big": 2**70},
+                  "payload_received": {"scores": [0.1, None]}, "context": ""}
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                written = JsonUtility.serialize(record, backend=backend)
+                self.assertEqual(written, JsonUtility.serialize_bytes(record, backend=backend).decode("utf-8"))
+                self.assertEqual(JsonUtility.deserialize(written), record)
+                self.assertEqual(JsonUtility.deserialize(written.encode("utf-8"), backend="json"), record)
+
+    def test_serialize_uses_the_selected_backend(self):
+        if json_utility.orjson is None:
+            self.skipTest("orjson is not installed")
+        with patch.object(json_utility, "BACKEND", "orjson"), \
+                patch.object(json_utility.orjson, "dumps", wraps=json_utility.orjson.dumps) as dumps:
+            self.assertEqual(JsonUtility.encode({"a": 1}, encoding="json"), '{"a":1}')
+        dumps.assert_called_once_with({"a": 1})
+
+    def test_serialize_bytes_invalid(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), self.assertRaises(ValueError):
+                JsonUtility.serialize_bytes(object(), backend=backend)
+
+    def test_select_backend(self):
+        self.assertEqual(json_utility._select_backend("json"), "json")
+        self.assertIn(json_utility._select_backend("auto"), BACKENDS)
+        with self.assertRaises(ValueError):
+            json_utility._select_backend("simplejson")
+        with patch.object(json_utility, "orjson", None), patch.object(json_utility, "ujson", None):
+            self.assertEqual(json_utility._select_backend("auto"), "json")
+            with self.assertRaises(ValueError):
+                json_utility._select_backend("orjson")
+
 if __name__ == '__main__':
     unittest.main()
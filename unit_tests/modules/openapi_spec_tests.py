@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests
+import requests_mock
+from src.modules import openapi_spec
+from src.modules.openapi_spec import load_spec
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Pets", "version": "1"},
+    "paths": {
+        "/pets": {
+            "parameters": [],
+            "get": {"responses": {"200": {"description": "ok"}}},
+            "post": {
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                "responses": {"200": {"description": "ok"}},
+            },
+        },
+    },
+    "components": {"schemas": {"Pet": {"type": "object", "properties": {"name": {"type": "string"}}}}},
+}
+
+URL = "https://specs.example.com/pets.json"
+
+
+class TestLoadSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.spec_path = os.path.join(self.directory.name, "pets.json")
+        with open(self.spec_path, "w") as spec_file:
+            json.dump(SPEC, spec_file)
+        openapi_spec._specs.clear()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_request_body_index(self):
+        spec = load_spec(self.spec_path, cache_dir=self.cache_dir)
+
+        self.assertEqual(spec.endpoints(), [("/pets", "POST")])
+        self.assertEqual(spec.request_body_schema("/pets", "post"),
+                         {"type": "object", "properties": {"name": {"type": "string"}}})
+        with self.assertRaises(KeyError):
+            spec.request_body_schema("/pets", "get")
+        self.assertEqual(spec.path_parameters("/pets", "POST"), {})
+
+    def test_path_parameters(self):
+        spec = openapi_spec.OpenApiSpec({"paths": {"/pets/{petId}": {
+            "parameters": [{"name": "petId", "in": "path", "schema": {"type": "string"}},
+                           {"name": "verbose", "in": "query", "schema": {"type": "boolean"}}],
+            "put": {
+                "parameters": [{"name": "petId", "in": "path", "schema": {"type": "integer"}}],
+                "requestBody": {"content": {"application/json": {"schema": {"type": "object"}}}},
+            },
+        }}}, "hash")
+
+        # The operation's declaration overrides the path item's, and query parameters are left out
+        self.assertEqual(spec.path_parameters("/pets/{petId}", "put"), {"petId": {"type": "integer"}})
+
+    def test_file_resolved_once(self):
+        with patch.object(openapi_spec, "_resolve", wraps=openapi_spec._resolve) as resolve:
+            first = load_spec(self.spec_path, cache_dir=self.cache_dir)
+            self.assertIs(load_spec(self.spec_path, cache_dir=self.cache_dir), first)
+
+            # A new process reads the resolved spec from the disk cache
+            openapi_spec._specs.clear()
+            self.assertEqual(load_spec(self.spec_path, cache_dir=self.cache_dir).specification, first.specification)
+        resolve.assert_called_once()
+
+    def test_file_change_is_resolved(self):
+        first = load_spec(self.spec_path, cache_dir=self.cache_dir)
+        with open(self.spec_path, "w") as spec_file:
+            json.dump({**SPEC, "info": {"title": "Pets", "version": "2"}}, spec_file)
+
+        second = load_spec(self.spec_path, cache_dir=self.cache_dir)
+        self.assertNotEqual(second.content_hash, first.content_hash)
+        self.assertEqual(second.specification["info"]["version"], "2")
+
+    def test_url_revalidated_with_etag(self):
+        with requests_mock.Mocker() as mock, patch.dict("os.environ", {"OPENAPI_SPEC_MAX_AGE": "0"}):
+            mock.get(URL, json=SPEC, headers={"ETag": '"v1"'})
+            first = load_spec(URL, cache_dir=self.cache_dir)
+
+            mock.get(URL, status_code=304)
+            openapi_spec._specs.clear()
+            with patch.object(openapi_spec, "_resolve") as resolve:
+                second = load_spec(URL, cache_dir=self.cache_dir)
+
+            resolve.assert_not_called()
+            self.assertEqual(mock.last_request.headers["If-None-Match"], '"v1"')
+            self.assertEqual(second.endpoints(), first.endpoints())
+
+    def test_url_not_fetched_while_fresh(self):
+        with requests_mock.Mocker() as mock:
+            mock.get(URL, json=SPEC)
+            load_spec(URL, cache_dir=self.cache_dir)
+            load_spec(URL, cache_dir=self.cache_dir)
+            self.assertEqual(mock.call_count, 1)
+
+    def test_url_offline_uses_cache(self):
+        with requests_mock.Mocker() as mock, patch.dict("os.environ", {"OPENAPI_SPEC_MAX_AGE": "0"}):
+            mock.get(URL, json=SPEC)
+            load_spec(URL, cache_dir=self.cache_dir)
+
+            mock.get(URL, exc=requests.exceptions.ConnectionError)
+            self.assertEqual(load_spec(URL, cache_dir=self.cache_dir).endpoints(), [("/pets", "POST")])
+
+    def test_url_offline_without_cache(self):
+        with requests_mock.Mocker() as mock:
+            mock.get(URL, exc=requests.exceptions.ConnectionError)
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                load_spec(URL, cache_dir=self.cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
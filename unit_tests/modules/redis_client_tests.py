@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
-from src.modules.redis_client import RedisClient, TestStatus
+import redis
+from src.modules.redis_client import RedisClient, TestStatus, JsonUtility
 
 
 class TestRedisClient(unittest.TestCase):
@@ -8,25 +9,52 @@ class TestRedisClient(unittest.TestCase):
     def setUp(self):
         self.redis_client = RedisClient()
 
+    @patch('redis.StrictRedis')
+    def test_shared_connection_pool(self, mock_strict_redis):
+        RedisClient()
+        RedisClient()
+        first_pool = mock_strict_redis.call_args_list[0].kwargs["connection_pool"]
+        second_pool = mock_strict_redis.call_args_list[1].kwargs["connection_pool"]
+        self.assertIs(first_pool, second_pool)
+
+    def test_pool_stats(self):
+        stats = RedisClient.pool_stats()
+        self.assertEqual(stats["created_connections"], stats["idle_connections"] + stats["in_use_connections"])
+        self.assertGreater(stats["max_connections"], 0)
+
     @patch('redis.StrictRedis')
     def test_create_key(self, mock_strict_redis):
         api_name = "test-api"
         unique_id = "32a4a415-5027-48e7-bec3-5a1c6b328b71"
         mock_uuid4 = MagicMock(return_value=unique_id)
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
         with patch('uuid.uuid4', mock_uuid4):
-            key = self.redis_client.create_key(api_name)
+            key = redis_client.create_key(api_name)
             expected_key = f"{api_name}:{unique_id}"
             self.assertEqual(key, expected_key)
-            mock_strict_redis.return_value.hset.assert_called_once_with(expected_key, "Tests Initialized", "")
-            mock_strict_redis.return_value.expire.assert_called_once_with(expected_key, self.redis_client.expire_seconds)
+            mock_pipe.hset.assert_called_once_with(expected_key, "Tests Initialized", "")
+            mock_pipe.expire.assert_any_call(expected_key, redis_client.expire_seconds)
+            mock_pipe.zadd.assert_called_once()
+            self.assertEqual(mock_pipe.zadd.call_args.args[0], f"test_keys:{api_name}")
+            self.assertIn(expected_key, mock_pipe.zadd.call_args.args[1])
+            mock_pipe.execute.assert_called_once()
 
     @patch('redis.StrictRedis')
     def test_initialize_test_suite(self, mock_strict_redis):
         key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
-        self.redis_client.initialize_test_suite(key)
-        mock_strict_redis.return_value.hset.assert_any_call(key, "total_tests", 0)
-        mock_strict_redis.return_value.hset.assert_any_call(key, "total_pass", 0)
-        mock_strict_redis.return_value.hset.assert_any_call(key, "total_fail", 0)
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        redis_client.initialize_test_suite(key)
+        mock_pipe.hset.assert_called_once()
+        self.assertEqual(mock_pipe.hset.call_args.args, (key,))
+        mapping = mock_pipe.hset.call_args.kwargs["mapping"]
+        self.assertEqual({field: mapping[field] for field in ("total_tests", "total_pass", "total_fail")},
+                         {"total_tests": 0, "total_pass": 0, "total_fail": 0})
+        self.assertIn("started_at", mapping)
+        mock_pipe.expire.assert_called_once_with(key, redis_client.expire_seconds)
+        mock_pipe.execute.assert_called_once()
+        mock_strict_redis.return_value.hset.assert_not_called()
 
     @patch('redis.StrictRedis')
     def test_retrieve_results(self, mock_strict_redis):
@@ -47,6 +75,43 @@ class TestRedisClient(unittest.TestCase):
         results = self.redis_client.retrieve_results(key)
         self.assertEqual(results, expected_results)
 
+    @patch('redis.StrictRedis')
+    def test_scan_results(self, mock_strict_redis):
+        redis_client = RedisClient()
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        mock_strict_redis.return_value.hscan.return_value = (42, {b"test-1": b'{"status": "pass"}'})
+        next_cursor, results = redis_client.scan_results(key, cursor=7, count=50)
+        self.assertEqual(next_cursor, 42)
+        self.assertEqual(results, {"test-1": '{"status": "pass"}'})
+        mock_strict_redis.return_value.hscan.assert_called_once_with(key, cursor=7, count=50)
+
+    @patch('redis.StrictRedis')
+    def test_iter_results(self, mock_strict_redis):
+        redis_client = RedisClient()
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        mock_strict_redis.return_value.hscan_iter.return_value = iter([(b"test-1", b"a"), (b"test-2", b"b")])
+        self.assertEqual(list(redis_client.iter_results(key)), [("test-1", "a"), ("test-2", "b")])
+        mock_strict_redis.return_value.hscan_iter.assert_called_once_with(key, count=1000)
+        mock_strict_redis.return_value.hgetall.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_get_summary(self, mock_strict_redis):
+        redis_client = RedisClient()
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        mock_strict_redis.return_value.hmget.return_value = [b"3", b"2", b"1", b"100.5", None]
+        summary = redis_client.get_summary(key)
+        self.assertEqual(summary, {"total_tests": 3, "total_pass": 2, "total_fail": 1,
+                                   "started_at": 100.5, "updated_at": None})
+        mock_strict_redis.return_value.hmget.assert_called_once_with(
+            key, ("total_tests", "total_pass", "total_fail", "started_at", "updated_at"))
+        mock_strict_redis.return_value.hgetall.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_get_summary_unknown_key(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_strict_redis.return_value.hmget.return_value = [None] * 5
+        self.assertIsNone(redis_client.get_summary("test-api:missing"))
+
     @patch('redis.StrictRedis')
     def test_get_total(self, mock_strict_redis):
         key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
@@ -56,39 +121,239 @@ class TestRedisClient(unittest.TestCase):
 
     @patch('redis.StrictRedis')
     def test_store_result(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
         key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
         field = "test-31056241454"
         result = TestStatus.PASS
         payload_sent = {"data": "sent"}
         payload_received = {"data": "received"}
         context = "Some context"
-        expected_data_to_store = {
-            "status": "pass",
-            "payload_sent": {"data": "sent"},
-            "payload_received": {"data": "received"},
-            "context": "Some context"
-        }
-        expected_data_to_store_str = '{"status": "pass", "payload_sent": {"data": "sent"}, "payload_received": {"data": "received"}, "context": "Some context"}'
-        mock_strict_redis.return_value.hset.return_value = None
-        self.redis_client.store_result(key, field, result, payload_sent, payload_received, context)
-        mock_strict_redis.return_value.hset.assert_called_once_with(key, field, expected_data_to_store_str)
-        mock_strict_redis.return_value.expire.assert_called_once_with(key, self.redis_client.expire_seconds)
-        mock_strict_redis.return_value.hincrby.assert_called_once_with(key, "total_tests", 1)
+        expected_data_to_store_str = '{"status":"pass","payload_sent":{"data":"sent"},"payload_received":{"data":"received"},"context":"Some context"}'
+        redis_client.store_result(key, field, result, payload_sent, payload_received, context)
+        mock_strict_redis.return_value.pipeline.assert_called_once_with(transaction=True)
+        mapping = mock_pipe.hset.call_args.kwargs["mapping"]
+        mock_pipe.hset.assert_called_once()
+        self.assertEqual(mapping[field], expected_data_to_store_str)
+        self.assertIn("updated_at", mapping)
+        mock_pipe.expire.assert_any_call(key, redis_client.expire_seconds)
+        mock_pipe.expire.assert_any_call("counters:test-api", redis_client.expire_seconds)
+        mock_pipe.hincrby.assert_any_call(key, "total_tests", 1)
+        mock_pipe.hincrby.assert_any_call(key, "total_pass", 1)
+        mock_pipe.hincrby.assert_any_call("counters:test-api", "total_pass", 1)
+        mock_pipe.execute.assert_called_once()
+        mock_strict_redis.return_value.hset.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_store_results(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        results = [
+            ("test-1", TestStatus.PASS, {}, {}, ""),
+            ("test-2", TestStatus.FAIL, {}, {}, "bad"),
+            ("test-3", TestStatus.PASS, {}, {}, ""),
+        ]
+        redis_client.store_results(key, results)
+        self.assertEqual(set(mock_pipe.hset.call_args.kwargs["mapping"]), {"test-1", "test-2", "test-3", "updated_at"})
+        mock_pipe.hincrby.assert_any_call(key, "total_tests", 2)
+        mock_pipe.hincrby.assert_any_call(key, "total_pass", 2)
+        mock_pipe.hincrby.assert_any_call(key, "total_tests", 1)
+        mock_pipe.hincrby.assert_any_call(key, "total_fail", 1)
+        mock_pipe.execute.assert_called_once()
+
+    @patch('redis.StrictRedis')
+    def test_store_results_deduplicates_payloads(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+        redis_client.store_results(key, [(f"test-{i}", TestStatus.PASS, fixture, {}, "") for i in range(3)])
+
+        mapping = mock_pipe.hset.call_args_list[0].kwargs["mapping"]
+        digest = JsonUtility.deserialize(mapping["test-0"])["payload_sent_digest"]
+        self.assertNotIn("same fixture", mapping["test-0"])
+        mock_pipe.hsetnx.assert_called_once_with(f"payloads:{key}", digest, JsonUtility.serialize(fixture))
+        mock_pipe.hset.assert_any_call(f"payload_refs:{key}", mapping={
+            f"test-{i}:payload_sent": digest for i in range(3)})
+        mock_pipe.hdel.assert_called_once_with(f"payload_refs:{key}",
+                                               *[f"test-{i}:payload_received" for i in range(3)])
+        mock_pipe.expire.assert_any_call(f"payloads:{key}", redis_client.expire_seconds)
+        mock_pipe.expire.assert_any_call(f"payload_refs:{key}", redis_client.expire_seconds)
+        mock_pipe.execute.assert_called_once()
+
+    @patch('redis.StrictRedis')
+    def test_store_results_refreshes_payload_expiry(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        # A batch without large payloads still keeps the payloads of earlier batches alive
+        redis_client.store_results(key, [("test-1", TestStatus.PASS, {"a": 1}, {}, "")])
+
+        mock_pipe.hsetnx.assert_not_called()
+        mock_pipe.expire.assert_any_call(key, redis_client.expire_seconds)
+        mock_pipe.expire.assert_any_call(f"payloads:{key}", redis_client.expire_seconds)
+        mock_pipe.expire.assert_any_call(f"payload_refs:{key}", redis_client.expire_seconds)
+
+    @patch('redis.StrictRedis')
+    def test_rewritten_record_replaces_its_references(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+        for _ in range(2):
+            redis_client.store_result(key, "test-1", TestStatus.PASS, fixture, {}, "", count=False)
+
+        # Both writes set the same reference instead of incrementing a count
+        refs = [call for call in mock_pipe.hset.call_args_list if call.args == (f"payload_refs:{key}",)]
+        self.assertEqual(len(refs), 2)
+        self.assertEqual(refs[0], refs[1])
+        mock_pipe.hincrby.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_retrieve_results_resolves_payloads(self, mock_strict_redis):
+        redis_client = RedisClient()
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+        redis_client.store_results(key, [("test-1", TestStatus.PASS, fixture, {"ok": True}, "")])
+        mapping = mock_strict_redis.return_value.pipeline.return_value.hset.call_args_list[0].kwargs["mapping"]
+
+        mock_strict_redis.return_value.hgetall.return_value = {
+            b"test-1": mapping["test-1"].encode(), b"total_tests": b"1"}
+        mock_strict_redis.return_value.hmget.return_value = [JsonUtility.serialize(fixture).encode()]
+        results = redis_client.retrieve_results(key)
+
+        self.assertEqual(results["total_tests"], "1")
+        self.assertEqual(results["test-1"], JsonUtility.serialize(
+            {"status": "pass", "payload_sent": fixture, "payload_received": {"ok": True}, "context": ""}))
+        mock_strict_redis.return_value.hmget.assert_called_once()
+        self.assertEqual(mock_strict_redis.return_value.hmget.call_args.args[0], f"payloads:{key}")
+
+    @patch('redis.StrictRedis')
+    def test_retrieve_raw_results(self, mock_strict_redis):
+        redis_client = RedisClient()
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+        redis_client.store_results(key, [("test-1", TestStatus.PASS, fixture, {"ok": True}, "")])
+        mapping = mock_strict_redis.return_value.pipeline.return_value.hset.call_args_list[0].kwargs["mapping"]
+
+        mock_strict_redis.return_value.hgetall.return_value = {
+            b"test-1": mapping["test-1"].encode(), b"test-2": b'{"status": "fail"}', b"total_tests": b"2"}
+        mock_strict_redis.return_value.hmget.return_value = [JsonUtility.serialize(fixture).encode()]
+        results = redis_client.retrieve_results(key, raw=True)
+
+        # Values are left as bytes, and records referencing payloads are still resolved
+        self.assertEqual(results["total_tests"], b"2")
+        self.assertEqual(results["test-2"], b'{"status": "fail"}')
+        self.assertEqual(JsonUtility.deserialize(results["test-1"])["payload_sent"], fixture)
+
+    @patch('redis.StrictRedis')
+    def test_store_results_without_deduplication(self, mock_strict_redis):
+        with patch.dict("os.environ", {"RESULT_PAYLOAD_DEDUP": "false"}):
+            redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+        redis_client.store_result("test-api:1", "test-1", TestStatus.PASS, fixture, {}, "")
+        self.assertIn("same fixture", mock_pipe.hset.call_args.kwargs["mapping"]["test-1"])
+        mock_pipe.hsetnx.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_get_payload_stats(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_strict_redis.return_value.hgetall.return_value = {
+            b"test-1:payload_sent": b"a", b"test-2:payload_sent": b"a", b"test-3:payload_sent": b"a",
+            b"test-3:payload_received": b"b"}
+        mock_strict_redis.return_value.pipeline.return_value.execute.return_value = [100, 50]
+        self.assertEqual(redis_client.get_payload_stats("test-api:1"), {
+            "payloads": 2, "references": 4, "bytes_stored": 150, "bytes_referenced": 350, "bytes_saved": 200})
+        mock_strict_redis.return_value.hgetall.assert_called_once_with("payload_refs:test-api:1")
 
     @patch('redis.StrictRedis')
     def test_update_counters(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
         key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
         result = TestStatus.PASS
-        self.redis_client.update_counters(result, key)
-        mock_strict_redis.return_value.hincrby.assert_called_once_with(key, "total_tests", 1)
-        mock_strict_redis.return_value.hincrby.assert_called_with(key, "total_pass", 1)
+        redis_client.update_counters(result, key)
+        mock_pipe.hincrby.assert_any_call(key, "total_tests", 1)
+        mock_pipe.hincrby.assert_any_call(key, "total_pass", 1)
+        mock_pipe.hincrby.assert_any_call("counters:test-api", "total_tests", 1)
+        mock_pipe.hincrby.assert_called_with("counters:test-api", "total_pass", 1)
+        mock_pipe.expire.assert_called_once_with("counters:test-api", redis_client.expire_seconds)
+        mock_pipe.execute.assert_called_once()
+
+    @patch('redis.StrictRedis')
+    def test_store_result_without_counting(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        redis_client.store_result(key, "context", TestStatus.PASS, {}, {}, "Some context", count=False)
+        mock_pipe.hset.assert_called_once()
+        mock_pipe.hincrby.assert_not_called()
+        mock_pipe.execute.assert_called_once()
+
+    @patch('redis.StrictRedis')
+    def test_get_totals(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_pipe = mock_strict_redis.return_value.pipeline.return_value
+        key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        mock_pipe.execute.return_value = [[b"3", b"2", b"1"], [b"30", b"20", None]]
+        totals = redis_client.get_totals(key)
+        self.assertEqual(totals, {"suite": {"total_tests": 3, "total_pass": 2, "total_fail": 1},
+                                  "api": {"total_tests": 30, "total_pass": 20, "total_fail": 0}})
+        mock_pipe.hmget.assert_any_call(key, ("total_tests", "total_pass", "total_fail"))
+        mock_pipe.hmget.assert_any_call("counters:test-api", ("total_tests", "total_pass", "total_fail"))
+        mock_pipe.execute.assert_called_once()
 
     @patch('redis.StrictRedis')
     def test_get_redis_keys(self, mock_strict_redis):
         api_name = "test-api"
-        mock_strict_redis.return_value.keys.return_value = [b"test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"]
-        keys = self.redis_client.get_redis_keys(api_name)
+        redis_client = RedisClient()
+        mock_redis = mock_strict_redis.return_value
+        mock_redis.set.return_value = None  # legacy keys already indexed
+        mock_redis.zrangebyscore.return_value = [b"test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"]
+        mock_redis.pipeline.return_value.execute.return_value = [1]
+        keys = redis_client.get_redis_keys(api_name)
         self.assertEqual(keys, ["test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"])
+        mock_redis.keys.assert_not_called()
+        mock_redis.scan_iter.assert_not_called()
+
+    @patch('redis.StrictRedis')
+    def test_page_redis_keys_prunes_expired(self, mock_strict_redis):
+        api_name = "test-api"
+        redis_client = RedisClient()
+        mock_redis = mock_strict_redis.return_value
+        mock_redis.set.return_value = None
+        mock_redis.zrangebyscore.return_value = [b"test-api:a", b"test-api:b"]
+        mock_redis.pipeline.return_value.execute.return_value = [1, 0]
+        keys, next_cursor = redis_client.page_redis_keys(api_name, cursor=0, limit=2)
+        self.assertEqual(keys, ["test-api:a"])
+        self.assertEqual(next_cursor, 1)
+        mock_redis.zrem.assert_called_once_with("test_keys:test-api", "test-api:b")
+
+    @patch('redis.StrictRedis')
+    def test_page_redis_keys_indexes_legacy_keys(self, mock_strict_redis):
+        api_name = "test-api"
+        redis_client = RedisClient()
+        mock_redis = mock_strict_redis.return_value
+        mock_redis.set.return_value = True
+        mock_redis.scan_iter.return_value = iter([b"test-api:legacy"])
+        mock_redis.pipeline.return_value.execute.return_value = [3600]
+        mock_redis.zrangebyscore.return_value = []
+        redis_client.page_redis_keys(api_name)
+        mock_redis.scan_iter.assert_called_once_with(match="test-api:*", count=1000)
+        self.assertIn(b"test-api:legacy", mock_redis.zadd.call_args.args[1])
+        self.assertTrue(mock_redis.zadd.call_args.kwargs["nx"])
+
+    @patch('redis.StrictRedis')
+    def test_failed_legacy_scan_is_retried(self, mock_strict_redis):
+        redis_client = RedisClient()
+        mock_redis = mock_strict_redis.return_value
+        mock_redis.set.return_value = True
+        mock_redis.scan_iter.side_effect = redis.exceptions.ConnectionError("connection lost")
+        with self.assertRaises(redis.exceptions.ConnectionError):
+            redis_client.page_redis_keys("test-api")
+        mock_redis.delete.assert_called_once_with("test_keys:test-api:legacy_indexed")
 
     @patch('redis.StrictRedis')
     def test_exists(self, mock_strict_redis):
@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+import redis
+from src.modules.result_sink import ResultSink, TestStatus
+
+
+class TestResultSink(unittest.TestCase):
+
+    def setUp(self):
+        self.redis_mock = MagicMock()
+        self.sink = ResultSink(self.redis_mock, max_queue_size=10, batch_size=5, flush_interval=0.01,
+                               put_timeout=0.01, max_retries=1)
+        self.test_key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+
+    def test_put_and_flush(self):
+        for i in range(7):
+            self.assertTrue(self.sink.put(self.test_key, f"test-{i}", TestStatus.PASS, {}, {}, ""))
+        self.sink.flush()
+
+        written = [result for call in self.redis_mock.store_results.call_args_list for result in call.args[1]]
+        self.assertEqual([result[0] for result in written], [f"test-{i}" for i in range(7)])
+        stats = self.sink.stats()
+        self.assertEqual(stats["enqueued"], 7)
+        self.assertEqual(stats["written"], 7)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertLessEqual(stats["max_batch_size"], 5)
+
+    def test_retry_then_succeed(self):
+        self.redis_mock.store_results.side_effect = [redis.exceptions.ConnectionError("down"), None]
+        self.sink.put(self.test_key, "test-1", TestStatus.FAIL, {}, {}, "")
+        self.sink.flush()
+
+        self.assertEqual(self.redis_mock.store_results.call_count, 2)
+        self.assertEqual(self.sink.stats()["retries"], 1)
+        self.assertEqual(self.sink.stats()["written"], 1)
+
+    def test_drop_after_retries(self):
+        self.redis_mock.store_results.side_effect = redis.exceptions.ConnectionError("down")
+        self.sink.put(self.test_key, "test-1", TestStatus.FAIL, {}, {}, "")
+        self.sink.flush()
+
+        self.assertEqual(self.sink.stats()["dropped"], 1)
+        self.assertEqual(self.sink.stats()["written"], 0)
+
+    def test_backpressure_drops_when_full(self):
+        release = threading.Event()
+        self.redis_mock.store_results.side_effect = lambda key, results: release.wait()
+
+        accepted = [self.sink.put(self.test_key, f"test-{i}", TestStatus.PASS, {}, {}, "") for i in range(30)]
+        release.set()
+        self.sink.flush()
+
+        self.assertIn(False, accepted)
+        self.assertEqual(self.sink.stats()["dropped"], accepted.count(False))
+
+    def test_put_after_close(self):
+        self.sink.close()
+        with self.assertRaises(RuntimeError):
+            self.sink.put(self.test_key, "test-1", TestStatus.PASS, {}, {}, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import redis
+from src.modules.result_store import create_result_store, JsonUtility, TestStatus, ResultStore, PayloadSet
+from src.modules.memory_result_store import MemoryResultStore
+from src.modules.redis_client import RedisClient
+from src.modules.sqlite_result_store import SQLiteResultStore
+
+
+class ResultStoreConformance:
+    """
+    Tests every ResultStore backend must pass. Subclasses set self.store in setUp.
+    """
+
+    def test_create_and_initialize(self):
+        key = self.store.create_key("conformance-api")
+        self.store.initialize_test_suite(key)
+
+        self.assertTrue(key.startswith("conformance-api:"))
+        self.assertTrue(self.store.exists(key))
+        results = self.store.retrieve_results(key)
+        self.assertEqual(results["Tests Initialized"], "")
+        self.assertEqual(results["total_tests"], "0")
+
+    def test_unknown_key(self):
+        self.assertFalse(self.store.exists("conformance-api:missing"))
+        self.assertEqual(self.store.retrieve_results("conformance-api:missing"), {})
+        self.assertIsNone(self.store.get_summary("conformance-api:missing"))
+
+    def test_store_results_updates_counters(self):
+        key = self.store.create_key("conformance-api")
+        self.store.initialize_test_suite(key)
+        self.store.store_results(key, [
+            ("test-1", TestStatus.PASS, {"a": 1}, {"b": 2}, ""),
+            ("test-2", TestStatus.FAIL, {}, {}, "bad"),
+        ])
+        self.store.store_result(key, "test-3", TestStatus.PASS, {}, {}, "")
+
+        record = JsonUtility.deserialize(self.store.retrieve_results(key)["test-1"])
+        self.assertEqual(record, {"status": "pass", "payload_sent": {"a": 1}, "payload_received": {"b": 2},
+                                  "context": ""})
+        totals = self.store.get_totals(key)
+        self.assertEqual(totals["suite"], {"total_tests": 3, "total_pass": 2, "total_fail": 1})
+        self.assertEqual(totals["api"]["total_tests"], 3)
+
+        summary = self.store.get_summary(key)
+        self.assertEqual(summary["total_fail"], 1)
+        self.assertGreaterEqual(summary["updated_at"], summary["started_at"])
+
+    def test_recounted_result_moves_its_count(self):
+        key = self.store.create_key("conformance-api")
+        self.store.store_result(key, "test-1", TestStatus.PASS, {}, {}, "")
+        self.store.store_result(key, "test-1", TestStatus.FAIL, {}, {}, "", counted_as=TestStatus.PASS)
+
+        totals = self.store.get_totals(key)
+        self.assertEqual(totals["suite"], {"total_tests": 1, "total_pass": 0, "total_fail": 1})
+
+    def test_api_rollup_spans_suites(self):
+        first = self.store.create_key("rollup-api")
+        second = self.store.create_key("rollup-api")
+        self.store.store_result(first, "test-1", TestStatus.PASS, {}, {}, "")
+        self.store.store_result(second, "test-1", TestStatus.FAIL, {}, {}, "")
+
+        totals = self.store.get_totals(second)
+        self.assertEqual(totals["suite"], {"total_tests": 1, "total_pass": 0, "total_fail": 1})
+        self.assertEqual(totals["api"], {"total_tests": 2, "total_pass": 1, "total_fail": 1})
+
+    def test_binary_encoding(self):
+        key = self.store.create_key("conformance-api")
+        payload = {"items": [{"id": i, "name": "item"} for i in range(100)]}
+        with patch.dict("os.environ", {"RESULT_ENCODING": "msgpack"}):
+            self.store.store_results(key, [
+                ("test-1", TestStatus.PASS, {"a": 1}, {}, ""),
+                ("test-2", TestStatus.PASS, payload, {}, ""),
+            ])
+
+        results = self.store.retrieve_results(key)
+        self.assertEqual(JsonUtility.deserialize(results["test-1"])["payload_sent"], {"a": 1})
+        self.assertEqual(JsonUtility.deserialize(results["test-2"])["payload_sent"], payload)
+        self.assertEqual(dict(self.store.iter_results(key)), results)
+        self.assertEqual(self.store.get_totals(key)["suite"]["total_pass"], 2)
+
+    def test_raw_results_deserialize_the_same(self):
+        key = self.store.create_key("conformance-api")
+        self.store.initialize_test_suite(key)
+        self.store.store_results(key, [(f"test-{i}", TestStatus.PASS, {"id": i}, {}, "") for i in range(5)])
+
+        def parse(fields):
+            return {field: JsonUtility.deserialize(value) if value else "" for field, value in fields}
+
+        expected = parse(self.store.retrieve_results(key).items())
+        self.assertEqual(parse(self.store.retrieve_results(key, raw=True).items()), expected)
+        self.assertEqual(parse(self.store.scan_results(key, count=100, raw=True)[1].items()), expected)
+        self.assertEqual(parse(self.store.iter_results(key, raw=True)), expected)
+
+    def test_store_without_counting(self):
+        key = self.store.create_key("conformance-api")
+        self.store.store_result(key, "test-1", TestStatus.PASS, {}, {}, "", count=False)
+
+        self.assertIn("test-1", self.store.retrieve_results(key))
+        self.assertEqual(self.store.get_totals(key)["suite"]["total_tests"], 0)
+
+    def test_scan_results_covers_every_field(self):
+        key = self.store.create_key("conformance-api")
+        self.store.store_results(key, [(f"test-{i}", TestStatus.PASS, {}, {}, "") for i in range(25)])
+
+        fields = {}
+        cursor = 0
+        while True:
+            cursor, page = self.store.scan_results(key, cursor=cursor, count=10)
+            fields.update(page)
+            if not cursor:
+                break
+
+        self.assertEqual(fields, self.store.retrieve_results(key))
+        self.assertEqual(dict(self.store.iter_results(key, count=7)), fields)
+
+    def test_keys_by_api(self):
+        api_name = f"keys-api-{time.time()}"
+        keys = []
+        for _ in range(5):
+            keys.append(self.store.create_key(api_name))
+            time.sleep(0.01)
+
+        self.assertEqual(self.store.get_redis_keys(api_name), keys)
+
+        page, cursor = self.store.page_redis_keys(api_name, limit=2)
+        self.assertEqual(page, keys[:2])
+        self.assertNotEqual(cursor, 0)
+
+        self.assertEqual(self.store.get_redis_keys(api_name, start=time.time()), [])
+
+    def test_concurrent_writes_are_counted(self):
+        key = self.store.create_key("conformance-api")
+
+        def write(worker):
+            for i in range(20):
+                self.store.store_result(key, f"test-{worker}-{i}", TestStatus.PASS, {}, {}, "")
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.store.get_totals(key)["suite"]["total_pass"], 80)
+
+
+class TestMemoryResultStore(ResultStoreConformance, unittest.TestCase):
+
+    def setUp(self):
+        self.store = MemoryResultStore()
+
+    def test_suites_expire(self):
+        self.store.expire_seconds = 0.05
+        key = self.store.create_key("expiring-api")
+        time.sleep(0.1)
+
+        self.assertFalse(self.store.exists(key))
+        self.assertEqual(self.store.get_redis_keys("expiring-api"), [])
+
+
+class TestSQLiteResultStore(ResultStoreConformance, unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SQLiteResultStore(os.path.join(self.directory.name, "results.sqlite3"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_history_survives_reopening(self):
+        key = self.store.create_key("durable-api")
+        self.store.store_result(key, "test-1", TestStatus.PASS, {}, {}, "")
+
+        reopened = SQLiteResultStore(self.store.path)
+        self.assertEqual(reopened.get_redis_keys("durable-api"), [key])
+        self.assertEqual(reopened.get_totals(key)["suite"]["total_pass"], 1)
+
+    def test_wal_mode(self):
+        self.assertEqual(self.store._connection().execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+
+def _redis_available() -> bool:
+    try:
+        return RedisClient().redis_client.ping()
+    except redis.exceptions.RedisError:
+        return False
+
+
+@unittest.skipUnless(_redis_available(), "Redis is not reachable at REDIS_HOST:REDIS_PORT")
+class TestRedisResultStore(ResultStoreConformance, unittest.TestCase):
+
+    def setUp(self):
+        self.store = RedisClient()
+
+
+class TestPayloadDeduplication(unittest.TestCase):
+
+    def setUp(self):
+        self.fixture = {"items": [{"id": i, "name": "same fixture"} for i in range(20)]}
+
+    def test_payloads_stored_once(self):
+        payloads = PayloadSet(min_bytes=64)
+        mapping, _ = ResultStore.serialize_results(
+            [(f"test-{i}", TestStatus.PASS, self.fixture, {"ok": True}, "") for i in range(5)], payloads)
+
+        self.assertEqual(len(payloads.payloads), 1)
+        digest, = payloads.payloads
+        self.assertEqual(payloads.references, {
+            **{f"test-{i}:payload_sent": digest for i in range(5)},
+            **{f"test-{i}:payload_received": None for i in range(5)}})
+        record = JsonUtility.deserialize(mapping["test-0"])
+        self.assertEqual(record, {"status": "pass", "payload_sent_digest": digest,
+                                  "payload_received": {"ok": True}, "context": ""})
+
+    def test_small_payloads_stay_inline(self):
+        payloads = PayloadSet(min_bytes=64)
+        mapping, _ = ResultStore.serialize_results([("test-1", TestStatus.PASS, {"a": 1}, {}, "")], payloads)
+
+        self.assertFalse(payloads)
+        self.assertEqual(mapping["test-1"], ResultStore.serialize_results(
+            [("test-1", TestStatus.PASS, {"a": 1}, {}, "")])[0]["test-1"])
+
+    def test_resolve_payloads(self):
+        results = [("test-1", TestStatus.PASS, self.fixture, self.fixture, "")]
+        payloads = PayloadSet(min_bytes=64)
+        mapping, _ = ResultStore.serialize_results(results, payloads)
+        mapping["total_tests"] = "1"
+
+        records = ResultStore.find_payload_references(mapping)
+        self.assertEqual(set(records), {"test-1"})
+        resolved = ResultStore.resolve_payloads(mapping, records, payloads.payloads)
+        self.assertEqual(resolved["test-1"], ResultStore.serialize_results(results)[0]["test-1"])
+        self.assertEqual(resolved["total_tests"], "1")
+
+    def test_resolve_binary_payloads(self):
+        with patch.dict("os.environ", {"RESULT_ENCODING": "msgpack"}):
+            payloads = PayloadSet(min_bytes=64)
+            mapping, _ = ResultStore.serialize_results([("test-1", TestStatus.PASS, self.fixture, {}, "")], payloads)
+            resolved = ResultStore.resolve_payloads(mapping, ResultStore.find_payload_references(mapping),
+                                                    payloads.payloads)
+
+        self.assertTrue(JsonUtility.is_binary(resolved["test-1"]))
+        self.assertEqual(JsonUtility.deserialize(resolved["test-1"])["payload_sent"], self.fixture)
+
+    def test_payload_stats(self):
+        stats = ResultStore.payload_stats({"a": 4, "b": 1}, {"a": 100, "b": 10})
+        self.assertEqual(stats, {"payloads": 2, "references": 5, "bytes_stored": 110, "bytes_referenced": 410,
+                                 "bytes_saved": 300})
+
+
+class TestCreateResultStore(unittest.TestCase):
+
+    def test_backends(self):
+        # Backends are imported on demand through the modules package, so compare by name
+        self.assertEqual(type(create_result_store("memory")).__name__, "MemoryResultStore")
+        self.assertEqual(type(create_result_store("redis")).__name__, "RedisClient")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_result_store("cassandra")
+
+
+if __name__ == '__main__':
+    unittest.main()
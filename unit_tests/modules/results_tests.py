@@ -2,6 +2,9 @@ import unittest
 from unittest.mock import MagicMock
 from src.modules.constants import TestStatus
 from src.modules.results import Results, TestResult
+from src.modules.memory_result_store import MemoryResultStore
+# Stores count statuses by the enum of the modules package they import, see result_store_tests
+from src.modules.result_store import TestStatus as StoreStatus
 
 
 class TestResults(unittest.TestCase):
@@ -9,7 +12,7 @@ class TestResults(unittest.TestCase):
     def setUp(self):
         self.results = Results()
         self.redis_mock = MagicMock()
-        self.results.redis_client = self.redis_mock
+        self.results.store = self.redis_mock
 
     def test_add_result(self):
         # Mocking Redis client methods
@@ -31,41 +34,90 @@ class TestResults(unittest.TestCase):
                                                              context)
         self.redis_mock.update_counters.assert_called_once_with(result)
 
+    def test_add_result_with_sink(self):
+        sink_mock = MagicMock()
+        self.results.sink = sink_mock
+
+        test_key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        self.results.add_result(test_key, "test-31056241454", TestStatus.PASS, {}, {}, "")
+        self.results.flush()
+
+        sink_mock.put.assert_called_once_with(test_key, "test-31056241454", TestStatus.PASS, {}, {}, "")
+        sink_mock.flush.assert_called_once()
+        self.redis_mock.store_result.assert_not_called()
+
+    def test_get_summary(self):
+        self.redis_mock.get_summary.return_value = {
+            "total_tests": 4, "total_pass": 3, "total_fail": 1, "started_at": 100.0, "updated_at": 112.5,
+        }
+
+        summary = self.results.get_summary("test-api:1")
+
+        self.assertEqual(summary["failure_rate"], 0.25)
+        self.assertEqual(summary["duration_seconds"], 12.5)
+        self.assertEqual(summary["test_key"], "test-api:1")
+        self.redis_mock.get_summary.assert_called_once_with("test-api:1")
+        self.redis_mock.retrieve_results.assert_not_called()
+
+    def test_get_summary_not_started(self):
+        self.redis_mock.get_summary.return_value = {
+            "total_tests": 0, "total_pass": 0, "total_fail": 0, "started_at": 100.0, "updated_at": None,
+        }
+
+        summary = self.results.get_summary("test-api:1")
+
+        self.assertEqual(summary["failure_rate"], 0)
+        self.assertIsNone(summary["duration_seconds"])
+
+    def test_get_summary_unknown_key(self):
+        self.redis_mock.get_summary.return_value = None
+
+        self.assertIsNone(self.results.get_summary("test-api:1"))
+
+    def test_get_totals(self):
+        totals = {"suite": {"total_tests": 3, "total_pass": 2, "total_fail": 1},
+                  "api": {"total_tests": 30, "total_pass": 20, "total_fail": 10}}
+        self.redis_mock.get_totals.return_value = totals
+
+        self.assertEqual(self.results.get_totals("test-api:1"), totals)
+        self.redis_mock.get_totals.assert_called_once_with("test-api:1")
+
     def test_get_total_tests(self):
         # Mocking Redis client method
-        self.redis_mock.get_total.return_value = 100
+        self.redis_mock.get_totals.return_value = {"suite": {"total_tests": 100}}
 
         # Perform the get_total_tests method call
-        total_tests = self.results.get_total_tests()
+        total_tests = self.results.get_total_tests("test-api:1")
 
         # Assert the returned value is correct
         self.assertEqual(total_tests, 100)
-        # Assert that Redis client method was called with correct argument
-        self.redis_mock.get_total.assert_called_once_with("total_tests")
+        # Assert that the per-suite counters were read
+        self.redis_mock.get_totals.assert_called_once_with("test-api:1")
+        self.redis_mock.get_total.assert_not_called()
 
     def test_get_total_pass(self):
         # Mocking Redis client method
-        self.redis_mock.get_total.return_value = 50
+        self.redis_mock.get_totals.return_value = {"suite": {"total_pass": 50}}
 
         # Perform the get_total_pass method call
-        total_pass = self.results.get_total_pass()
+        total_pass = self.results.get_total_pass("test-api:1")
 
         # Assert the returned value is correct
         self.assertEqual(total_pass, 50)
-        # Assert that Redis client method was called with correct argument
-        self.redis_mock.get_total.assert_called_once_with("total_pass")
+        # Assert that the per-suite counters were read
+        self.redis_mock.get_totals.assert_called_once_with("test-api:1")
 
     def test_get_total_fail(self):
         # Mocking Redis client method
-        self.redis_mock.get_total.return_value = 25
+        self.redis_mock.get_totals.return_value = {"suite": {"total_fail": 25}}
 
         # Perform the get_total_fail method call
-        total_fail = self.results.get_total_fail()
+        total_fail = self.results.get_total_fail("test-api:1")
 
         # Assert the returned value is correct
         self.assertEqual(total_fail, 25)
-        # Assert that Redis client method was called with correct argument
-        self.redis_mock.get_total.assert_called_once_with("total_fail")
+        # Assert that the per-suite counters were read
+        self.redis_mock.get_totals.assert_called_once_with("test-api:1")
 
     def test_get_result(self):
         # Mocking Redis client method
@@ -91,12 +143,11 @@ class TestTestResult(unittest.TestCase):
         self.test_key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
         self.test_result = TestResult(self.test_key)
         self.redis_mock = MagicMock()
-        self.test_result.redis_client = self.redis_mock
+        self.test_result.store = self.redis_mock
 
     def test_status(self):
         # Mocking Redis client method
         self.redis_mock.store_result.return_value = None
-        self.redis_mock.incr.return_value = None
 
         # Set the status of the test
         self.test_result.status = TestStatus.PASS
@@ -110,8 +161,77 @@ class TestTestResult(unittest.TestCase):
             self.test_result._payload_received,
             self.test_result._context
         )
-        self.redis_mock.incr.assert_called_once_with("total_tests")
-        self.redis_mock.incr.assert_called_once_with("total_pass")
+        # The counters are updated by store_result, not by separate global INCRs
+        self.redis_mock.incr.assert_not_called()
+
+    def test_other_setters_not_counted(self):
+        self.test_result.context = "Some context"
+
+        self.assertFalse(self.redis_mock.store_result.call_args.kwargs["count"])
+
+    def test_buffered_flush_writes_once(self):
+        self.test_result.buffered = True
+        self.test_result.payload_sent = {"data": "sent"}
+        self.test_result.payload_received = {"data": "received"}
+        self.test_result.context = "Some context"
+        self.test_result.status = TestStatus.PASS
+
+        self.redis_mock.store_result.assert_not_called()
+
+        self.test_result.flush()
+        self.test_result.flush()
+
+        self.redis_mock.store_result.assert_called_once_with(
+            self.test_key,
+            self.test_result.field,
+            TestStatus.PASS,
+            {"data": "sent"},
+            {"data": "received"},
+            "Some context",
+            count=True,
+            counted_as=None,
+        )
+        self.redis_mock.incr.assert_not_called()
+
+    def test_later_flushes_are_not_counted_again(self):
+        store = MemoryResultStore()
+        key = store.create_key("test-api")
+        test_result = TestResult(key, buffered=True, store=store)
+
+        test_result.status = StoreStatus.PASS
+        test_result.flush()
+        test_result.context = "Some context"
+        test_result.flush()
+        self.assertEqual(store.get_totals(key)["suite"], {"total_tests": 1, "total_pass": 1, "total_fail": 0})
+
+        # Changing the status moves the count instead of adding one
+        test_result.status = StoreStatus.FAIL
+        test_result.flush()
+        self.assertEqual(store.get_totals(key)["suite"], {"total_tests": 1, "total_pass": 0, "total_fail": 1})
+        self.assertEqual(store.get_totals(key)["api"], {"total_tests": 1, "total_pass": 0, "total_fail": 1})
+
+    def test_context_manager_flushes_on_exit(self):
+        with self.test_result as result:
+            result.status = TestStatus.FAIL
+            result.context = "Some context"
+            self.redis_mock.store_result.assert_not_called()
+
+        self.redis_mock.store_result.assert_called_once()
+
+    def test_context_manager_skips_flush_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.test_result as result:
+                result.status = TestStatus.FAIL
+                raise RuntimeError("probe failed")
+
+        self.redis_mock.store_result.assert_not_called()
+
+    def test_flush_without_status(self):
+        self.test_result.buffered = True
+        self.test_result.context = "Some context"
+
+        with self.assertRaises(ValueError):
+            self.test_result.flush()
 
     # Add more test cases for other methods and properties, if needed.
 
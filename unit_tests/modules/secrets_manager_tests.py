@@ -0,0 +1,180 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from src.modules.secrets_manager import SecretsManager, SecretCache, Config, Api
+
+
+def _get_parameters_stub(Names, WithDecryption):
+    return {
+        'Parameters': [{'Name': name, 'Value': f'value-of-{name}'} for name in Names if not name.startswith('MISSING')],
+        'InvalidParameters': [name for name in Names if name.startswith('MISSING')],
+    }
+
+
+class TestSecretsManager(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config()
+        self.app = Flask(__name__)
+        self.app.config['config'] = self.config
+        self.context = self.app.app_context()
+        self.context.push()
+
+        self.secrets_manager = SecretsManager()
+        self.secrets_manager.clear_cache()
+        self.ssm_mock = MagicMock()
+        self.ssm_mock.get_parameters.side_effect = _get_parameters_stub
+        self.secrets_manager.__dict__['ssm'] = self.ssm_mock
+
+        self.env_patch = patch.dict('os.environ', {'ENVIRONMENT': 'AWS'})
+        self.env_patch.start()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.context.pop()
+
+    def test_get_secrets_batches_parameters(self):
+        for i in range(12):
+            setattr(self.config.confirmatron.redis, f'secret_{i}', f'{{SECRET_{i}}}')
+        keys = [f'confirmatron.redis.secret_{i}' for i in range(12)] + ['confirmatron.auth_zero.test.grant_type']
+
+        secrets = self.secrets_manager.get_secrets(keys)
+
+        self.assertEqual(secrets['confirmatron.redis.secret_11'], 'value-of-SECRET_11')
+        self.assertEqual(secrets['confirmatron.auth_zero.test.grant_type'], 'client_credentials')
+        # 12 placeholders, 10 names per GetParameters call
+        self.assertEqual(self.ssm_mock.get_parameters.call_count, 2)
+
+        self.secrets_manager.get_secrets(keys)
+        self.assertEqual(self.ssm_mock.get_parameters.call_count, 2)
+
+    def test_get_secrets_keeps_order_when_partly_cached(self):
+        keys = [f'confirmatron.auth_zero.test.{name}'
+                for name in ('auth_url', 'client_id', 'client_secret', 'audience', 'grant_type')]
+        self.secrets_manager.get_secrets(keys[2:4])
+
+        secrets = self.secrets_manager.get_secrets(keys)
+
+        self.assertEqual(list(secrets), keys)
+        self.assertEqual(secrets, {key: self.secrets_manager.get_secret(key) for key in keys})
+
+    def test_get_secrets_local(self):
+        with patch.dict('os.environ', {'ENVIRONMENT': 'LOCAL', 'CONFIRMATRON_AUTH_ZERO_TEST_CLIENT_SECRET': 'local'}):
+            secrets = self.secrets_manager.get_secrets(['confirmatron.auth_zero.test.client_secret'])
+
+        self.assertEqual(secrets, {'confirmatron.auth_zero.test.client_secret': 'local'})
+        self.ssm_mock.get_parameters.assert_not_called()
+
+    def test_get_secrets_unknown_key(self):
+        with self.assertRaises(ValueError):
+            self.secrets_manager.get_secrets(['confirmatron.nope'])
+
+    def test_get_secret_of_api(self):
+        api = Api('apiTwo')
+        api.app_id = '{APP_ID}'
+        self.config.test_apis.add_api('apiTwo', api)
+
+        self.assertEqual(self.secrets_manager.get_secret('app_id', api_name='apiTwo'), 'value-of-APP_ID')
+
+    def test_missing_parameter(self):
+        with self.assertRaises(ValueError):
+            self.secrets_manager.get_parameters(['MISSING_SECRET'])
+
+    def test_get_parameters_from_generator(self):
+        self.assertEqual(self.secrets_manager.get_parameters(name for name in ['GEN_A', 'GEN_B']),
+                         {'GEN_A': 'value-of-GEN_A', 'GEN_B': 'value-of-GEN_B'})
+        with self.assertRaises(ValueError):
+            self.secrets_manager.get_parameters(name for name in ['GEN_C', 'MISSING_GEN'])
+
+    def test_concurrent_misses_fetch_once(self):
+        def slow_get_parameters(**kwargs):
+            time.sleep(0.1)
+            return _get_parameters_stub(**kwargs)
+        self.ssm_mock.get_parameters.side_effect = slow_get_parameters
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.secrets_manager.get_parameters(['SHARED'])))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [{'SHARED': 'value-of-SHARED'}] * 5)
+        self.ssm_mock.get_parameters.assert_called_once()
+
+    def test_prefetch(self):
+        self.secrets_manager.prefetch(self.config)
+
+        names = {name for call in self.ssm_mock.get_parameters.call_args_list for name in call.kwargs['Names']}
+        self.assertEqual(names, {
+            'CONFIRMATRON_AUTH_ZERO_TEST_CLIENT_SECRET',
+            'CONFIRMATRON_AUTH_ZERO_BETA_CLIENT_SECRET',
+            'CONFIRMATRON_AUTH_ZERO_PROD_CLIENT_SECRET',
+        })
+        self.ssm_mock.get_parameters.reset_mock()
+
+        self.secrets_manager.get_secret('confirmatron.auth_zero.beta.client_secret')
+        self.ssm_mock.get_parameters.assert_not_called()
+
+    def test_stale_secret_served_while_refreshing(self):
+        versions = iter(['old', 'new'])
+        self.ssm_mock.get_parameters.side_effect = lambda Names, WithDecryption: {
+            'Parameters': [{'Name': Names[0], 'Value': next(versions)}]}
+
+        with patch('src.modules.secrets_manager.secret_cache', SecretCache(ttl=0.05, max_stale=60)) as cache:
+            key = 'confirmatron.auth_zero.test.client_secret'
+            self.assertEqual(self.secrets_manager.get_secret(key), 'old')
+            time.sleep(0.1)
+
+            # The stale value is returned at once and the refresh happens in the background
+            self.assertEqual(self.secrets_manager.get_secret(key), 'old')
+            for _ in range(50):
+                if cache.stats()['refreshes']:
+                    break
+                time.sleep(0.01)
+
+            self.assertEqual(self.secrets_manager.get_secret(key), 'new')
+            self.assertEqual(self.ssm_mock.get_parameters.call_count, 2)
+            self.assertEqual(cache.stats()['stale_hits'], 1)
+
+    def test_missing_secrets_cached(self):
+        self.config.confirmatron.redis.secret = '{MISSING_SECRET}'
+
+        for key in ['confirmatron.nope', 'confirmatron.redis.secret']:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.secrets_manager.get_secret(key)
+        self.ssm_mock.get_parameters.assert_called_once()
+
+        stats = self.secrets_manager.cache_stats()
+        self.assertEqual(stats['negative_hits'], 2)
+        self.assertTrue(stats['entries']['confirmatron.nope']['missing'])
+
+    def test_cache_stats(self):
+        key = 'confirmatron.auth_zero.test.grant_type'
+        for _ in range(4):
+            self.secrets_manager.get_secret(key)
+
+        stats = self.secrets_manager.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+        self.assertEqual(stats['hit_rate'], 0.75)
+        self.assertEqual(stats['size'], 1)
+        self.assertFalse(stats['entries'][key]['missing'])
+        self.assertGreaterEqual(stats['entries'][key]['age_seconds'], 0)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = SecretCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.lookup('a')
+        cache.put('c', 3)
+
+        self.assertEqual(cache.lookup('b'), (SecretCache.MISS, None))
+        self.assertEqual(cache.lookup('a'), (SecretCache.FRESH, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask_restx import Api
+from src import admin_api
+from src.modules.suite_runner import SuiteRunner, TestStatus
+
+
+def _wait_for(run, timeout=5):
+    deadline = time.monotonic() + timeout
+    while run.status != "finished" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestSuiteRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.results_mock = MagicMock()
+        self.runner = SuiteRunner(self.results_mock, max_workers=4, case_timeout=0.5)
+        self.test_key = "test-api:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+
+    def test_runs_all_cases(self):
+        cases = (lambda i=i: (TestStatus.PASS if i % 2 else TestStatus.FAIL, {"i": i}, {}, "") for i in range(20))
+
+        run_id = self.runner.submit(self.test_key, cases)
+        run = self.runner.get_run(run_id)
+        _wait_for(run)
+
+        self.assertEqual(run.status, "finished")
+        self.assertEqual(run.completed, 20)
+        self.assertEqual(run.passed, 10)
+        self.assertEqual(run.failed, 10)
+        self.assertEqual(self.results_mock.add_result.call_count, 20)
+        fields = {call.args[1] for call in self.results_mock.add_result.call_args_list}
+        self.assertEqual(len(fields), 20)
+
+    def test_case_timeout_and_errors(self):
+        def slow():
+            time.sleep(2)
+            return TestStatus.PASS, {}, {}, ""
+
+        def broken():
+            raise RuntimeError("boom")
+
+        run = self.runner.get_run(self.runner.submit(self.test_key, [slow, broken]))
+        _wait_for(run)
+
+        self.assertEqual(run.timed_out, 1)
+        self.assertEqual(run.errors, 1)
+        self.assertEqual(run.failed, 2)
+        contexts = [call.args[5] for call in self.results_mock.add_result.call_args_list]
+        self.assertTrue(any("timed out" in context for context in contexts))
+        self.assertTrue(any("boom" in context for context in contexts))
+
+    def test_queued_cases_do_not_time_out(self):
+        runner = SuiteRunner(self.results_mock, max_workers=2, case_timeout=0.15)
+
+        def fast():
+            time.sleep(0.1)
+            return TestStatus.PASS, {}, {}, ""
+
+        # Three runs share two workers, so cases wait behind the other runs' before they start
+        runs = [runner.get_run(runner.submit(self.test_key, [fast] * 6)) for _ in range(3)]
+        for run in runs:
+            _wait_for(run)
+
+        self.assertEqual([run.timed_out for run in runs], [0, 0, 0])
+        self.assertEqual([run.passed for run in runs], [6, 6, 6])
+
+    def test_submit_returns_immediately(self):
+        def slow():
+            time.sleep(0.3)
+            return TestStatus.PASS, {}, {}, ""
+
+        start = time.perf_counter()
+        run_id = self.runner.submit(self.test_key, [slow] * 4)
+        self.assertLess(time.perf_counter() - start, 0.1)
+        _wait_for(self.runner.get_run(run_id))
+
+    def test_finished_runs_expire(self):
+        runner = SuiteRunner(self.results_mock, max_workers=2, run_ttl=0.05)
+        run_id = runner.submit(self.test_key, [lambda: (TestStatus.PASS, {}, {}, "")])
+        _wait_for(runner.get_run(run_id))
+        self.assertIsNotNone(runner.get_run(run_id))
+
+        time.sleep(0.1)
+        runner.submit(self.test_key, [])
+        self.assertIsNone(runner.get_run(run_id))
+        self.assertEqual(len(runner._runs), 1)
+
+
+class TestSuiteRunEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        Api(app).add_namespace(admin_api.admin_ns)
+        self.client = app.test_client()
+        self.runner = SuiteRunner(MagicMock(), max_workers=2)
+
+    def test_run_progress(self):
+        run_id = self.runner.submit("test-api:1", [lambda: (TestStatus.FAIL, {}, {}, "bad")])
+        _wait_for(self.runner.get_run(run_id))
+
+        with patch.object(admin_api, "get_suite_runner", return_value=self.runner):
+            response = self.client.get(f"/testAdmin/runs/{run_id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["status"], "finished")
+        self.assertEqual(response.json["failed"], 1)
+
+    def test_unknown_run(self):
+        with patch.object(admin_api, "get_suite_runner", return_value=self.runner):
+            self.assertEqual(self.client.get("/testAdmin/runs/missing").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
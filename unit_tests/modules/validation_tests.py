@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import Flask, g
+from flask_restx import Api
+from marshmallow import Schema, ValidationError, fields, post_load, validate
+from src import admin_api
+from src.modules.validation import CompiledSchema, compile_validator, get_compiled_schema
+from src.test_suite.api1.schemas import Api1ModelSchema, FuzzPayloadSchema, FUZZ_MAX_CASES
+
+PAYLOAD = {
+    "name": "Ada",
+    "age": 36,
+    "addresses": [
+        {"type": "home", "info": {"street": "1 Main St", "city": "Springfield", "zip_code": "12345"}},
+    ],
+}
+
+
+class ScoreSchema(Schema):
+    score = fields.Float(allow_none=True)
+    tags = fields.List(fields.String())
+
+
+class ValidatedSchema(Schema):
+    name = fields.String(validate=validate.Length(max=3))
+
+
+class HookSchema(Schema):
+    name = fields.String()
+
+    @post_load
+    def upper(self, data, **kwargs):
+        return {"name": data["name"].upper()}
+
+
+class TestValidation(unittest.TestCase):
+
+    def test_fast_path_matches_schema_load(self):
+        compiled = CompiledSchema(Api1ModelSchema())
+
+        self.assertIsNotNone(compiled.fast_path)
+        self.assertTrue(compiled.fast_path(PAYLOAD))
+        self.assertEqual(compiled.load(PAYLOAD), Api1ModelSchema().load(PAYLOAD))
+
+    def test_invalid_payload_raises_schema_messages(self):
+        payload = {"name": "Ada", "addresses": [{"type": "home"}]}
+        compiled = CompiledSchema(Api1ModelSchema())
+
+        with self.assertRaises(ValidationError) as expected:
+            Api1ModelSchema().load(payload)
+        with self.assertRaises(ValidationError) as actual:
+            compiled.load(payload)
+
+        self.assertEqual(actual.exception.messages, expected.exception.messages)
+
+    def test_coercible_payload_falls_back_to_schema(self):
+        payload = dict(PAYLOAD, age="5")
+        compiled = CompiledSchema(Api1ModelSchema())
+
+        self.assertFalse(compiled.fast_path(payload))
+        self.assertEqual(compiled.load(payload)["age"], 5)
+
+    def test_unknown_field_falls_back_to_schema(self):
+        compiled = CompiledSchema(Api1ModelSchema())
+
+        with self.assertRaises(ValidationError) as context:
+            compiled.load(dict(PAYLOAD, extra=1))
+
+        self.assertIn("extra", context.exception.messages)
+
+    def test_bool_is_not_an_integer(self):
+        compiled = CompiledSchema(Api1ModelSchema())
+
+        self.assertFalse(compiled.fast_path(dict(PAYLOAD, age=True)))
+        with self.assertRaises(ValidationError):
+            compiled.load(dict(PAYLOAD, age=True))
+
+    def test_float_list_and_none(self):
+        check = compile_validator(ScoreSchema())
+
+        self.assertTrue(check({"score": 1.5, "tags": ["a", "b"]}))
+        self.assertTrue(check({"score": None}))
+        self.assertFalse(check({"score": float("nan")}))
+        self.assertFalse(check({"tags": ["a", 1]}))
+
+    def test_unsupported_schemas_have_no_fast_path(self):
+        self.assertIsNone(compile_validator(ValidatedSchema()))
+        self.assertIsNone(compile_validator(HookSchema()))
+        self.assertEqual(CompiledSchema(HookSchema()).load({"name": "ada"}), {"name": "ADA"})
+
+    def test_fast_path_can_be_disabled(self):
+        with patch.dict("os.environ", {"VALIDATION_FAST_PATH": "false"}):
+            compiled = CompiledSchema(Api1ModelSchema())
+
+        self.assertIsNone(compiled.fast_path)
+        self.assertEqual(compiled.load(PAYLOAD), PAYLOAD)
+
+    def test_many(self):
+        compiled = get_compiled_schema(Api1ModelSchema, many=True)
+
+        self.assertIs(compiled.load([PAYLOAD, PAYLOAD])[0], PAYLOAD)
+        self.assertEqual(compiled.load([dict(PAYLOAD, age="5")])[0]["age"], 5)
+        with self.assertRaises(ValidationError):
+            compiled.load(PAYLOAD)
+
+    def test_compiled_schema_is_shared(self):
+        compiled = get_compiled_schema(Api1ModelSchema)
+
+        self.assertIs(get_compiled_schema(Api1ModelSchema), compiled)
+        self.assertIsNot(get_compiled_schema(Api1ModelSchema, many=True), compiled)
+        self.assertFalse(compiled.schema.many)
+
+
+    def test_fuzz_payload(self):
+        compiled = get_compiled_schema(FuzzPayloadSchema)
+
+        self.assertEqual(compiled.load({}), {"count": 100, "seed": None, "constraints": True})
+        self.assertEqual(compiled.load({"count": "20", "seed": 3})["count"], 20)
+        for count in (0, FUZZ_MAX_CASES + 1, "many", None):
+            with self.subTest(count=count), self.assertRaises(ValidationError):
+                compiled.load({"count": count})
+
+    def test_dataclass_schema_has_no_fast_path(self):
+        compiled = CompiledSchema(admin_api.TestKeyPayload.Schema())
+
+        self.assertIsNone(compiled.fast_path)
+        self.assertEqual(compiled.load({"api_name": "api1"}), admin_api.TestKeyPayload(api_name="api1"))
+
+
+class TestLoadBody(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        Api(app).add_namespace(admin_api.admin_ns)
+
+        @app.route("/payload", methods=["POST"])
+        @admin_api.load_body(admin_api.TestKeyPayload.Schema)
+        def payload():
+            return {"type": type(g.payload).__name__, "api_name": g.payload.api_name}
+
+        self.client = app.test_client()
+
+    def test_load_body_returns_the_dataclass(self):
+        response = self.client.post("/payload", json={"api_name": "api1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {"type": "TestKeyPayload", "api_name": "api1"})
+
+    def test_create_key(self):
+        store = MagicMock()
+        store.create_key.return_value = "api1:32a4a415-5027-48e7-bec3-5a1c6b328b71"
+        with patch.object(admin_api, "get_result_store", return_value=store):
+            response = self.client.post("/testAdmin/createKey", json={"api_name": "api1"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["api_name"], "api1")
+        store.create_key.assert_called_once_with("api1")
+
+    def test_invalid_body(self):
+        response = self.client.post("/testAdmin/createKey", json={"name": "api1"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("api_name", response.json["messages"])
+
+
+if __name__ == '__main__':
+    unittest.main()